@@ -18,8 +18,9 @@
 
 from __future__ import nested_scopes, generators, division, absolute_import, with_statement, print_function, unicode_literals
 from tempfile import mkstemp
-import platform, os, subprocess 
-from numpy import ceil, concatenate, floor, float32, int16, int32, mean, sqrt, transpose, zeros
+import atexit, platform, os, subprocess, threading
+from numpy import asarray, ceil, clip, concatenate, copyto, floor, float32, int16, int32, mean, multiply, rint, sqrt, transpose, zeros
+import numpy
 from .pyqtver import*
 if pyqtversion == 4:
     from PyQt4.QtCore import QThread
@@ -41,6 +42,10 @@ try:
     import pyaudio
 except ImportError:
     pass
+try:
+    import fcntl
+except ImportError: #not available on Windows
+    fcntl = None
 
 def decimalToBinary(x, n):
     """Convert an integer in decimal format to binary string representation
@@ -54,6 +59,432 @@ def decimalToBinary(x, n):
 
     return res
 
+class pcmConverter():
+    """
+    Convert floating point sounds, with samples between -1 and 1, to
+    integer PCM.
+
+    The conversion goes through staging buffers allocated once, with
+    the given shape, so that converting a sound block by block does not
+    allocate memory. The samples are scaled, optionally TPDF dithered,
+    rounded and clipped to the PCM range in place.
+
+    Parameters
+    ----------
+    nbits : int
+        Bit depth of the PCM data, 16 or 32.
+    shape : tuple of ints
+        Shape of the largest block that will be converted, e.g.
+        (periodSize, nChannels).
+    dither : logical
+        If `True` add triangular probability density function dither,
+        with a peak amplitude of 1 LSB, before rounding.
+    """
+    def __init__(self, nbits, shape, dither=False):
+        if nbits == 16:
+            self.pcmType = int16
+        elif nbits == 32:
+            self.pcmType = int32
+        else:
+            raise TypeError("nbits must be 16 or 32")
+        self.scale = 2.**(nbits-1)
+        self.pcmMin = -2.**(nbits-1)
+        self.pcmMax = 2.**(nbits-1) - 1
+        self.dither = dither
+        self.work = zeros(shape)
+        self.ditherWork = zeros(shape)
+        self.out = zeros(shape, dtype=self.pcmType)
+        self.rng = numpy.random.default_rng()
+
+    def convert(self, snd):
+        """
+        Convert 'snd' to PCM. The result is a view on the staging
+        buffer, it is overwritten by the next call.
+        """
+        n = snd.shape[0]
+        work = self.work[:n]
+        multiply(snd, self.scale, out=work)
+        if self.dither == True:
+            #the difference of two uniform variates has a triangular
+            #distribution between -1 and 1 LSB
+            ditherWork = self.ditherWork[:n]
+            work += self.rng.random(out=ditherWork)
+            work -= self.rng.random(out=ditherWork)
+        rint(work, out=work)
+        clip(work, self.pcmMin, self.pcmMax, out=work)
+        out = self.out[:n]
+        copyto(out, work, casting='unsafe')
+        return out
+
+#number of frames written to the device at a time by an outputStream
+#when the 'bufferSize' preference is not set
+defaultPeriodSize = 1024
+#number of frames of the ring buffer of an outputStream
+ringBufferSize = 2**16
+#number of periods buffered by the external players fed through a pipe:
+#aplay is told to use this buffer size, other players are assumed to
+#buffer about as much
+pipeBufferPeriods = 4
+#commands reading raw PCM from stdin, used for these play commands when
+#the 'pipePCM' preference is set; custom commands can use the same fields
+pipePlayCommands = {"aplay": "aplay -q -t raw -f S{nbits}_LE -r {fs} -c {nChannels} --period-size={periodSize} --buffer-size={bufferSize} --start-delay=1",
+                    "play": "play -q -t raw -e signed-integer -b {nbits} -r {fs} -c {nChannels} -"}
+
+class outputStream():
+    """
+    A playback stream that stays open for the whole session.
+
+    The device is opened once, and a writer thread feeds it from a ring
+    buffer one period at a time. When there is nothing to play the
+    writer feeds the device with silence, so that the sounds queued with
+    `write` start within about one period, without the delay and the
+    jitter caused by opening and closing the device for each sound.
+    The writer keeps an estimate of when the frames it has written will
+    have been played, from the times of its writes and the `latency` of
+    the device, see `framesPlayed` and `waitPlayed`.
+    Silence is never inserted in the middle of a sound: once data has
+    been queued, the writer waits for whole periods until the end of the
+    sound is marked with `endSound` (or `drain`). If the data is not
+    queued fast enough, the wait is reported as an underrun and counted
+    in `nUnderruns`.
+
+    With playCmd "pipe" the device is an external player, started once
+    with the shell command 'pipeCmd', that reads raw PCM from its stdin.
+    The pipe is shrunk to about one period where possible, and the
+    player is not fed silence between sounds, so that the only data
+    buffered ahead of playback is that of the sound being played.
+
+    The writing methods take an optional 'nDiscards' argument, the value
+    of the `nDiscards` attribute when the caller started playing the
+    sound: they return without queuing anything once the sound has been
+    dropped by `discard`.
+    """
+    def __init__(self, playCmd, fs, nbits, nChannels, periodSize, alsaaudioDevice=None, pyaudioDevice=None, pipeCmd=None):
+        self.playCmd = playCmd
+        self.fs = fs
+        self.nChannels = nChannels
+        self.periodSize = periodSize
+        if nbits == 16:
+            self.pcmType = int16
+        elif nbits == 32:
+            self.pcmType = int32
+        if playCmd == "alsaaudio":
+            try:
+                self.device = alsaaudio.PCM(type=alsaaudio.PCM_PLAYBACK, mode=alsaaudio.PCM_NORMAL, card=alsaaudioDevice)
+            except:
+                self.device = alsaaudio.PCM(type=alsaaudio.PCM_PLAYBACK, mode=alsaaudio.PCM_NORMAL, card=alsaaudio.cards()[0])
+            self.device.setchannels(nChannels)
+            self.device.setrate(fs)
+            self.device.setperiodsize(periodSize)
+            if nbits == 16:
+                self.device.setformat(alsaaudio.PCM_FORMAT_S16_LE)
+            elif nbits == 32:
+                self.device.setformat(alsaaudio.PCM_FORMAT_S32_LE)
+        elif playCmd == "pyaudio":
+            if nbits == 16:
+                sampleFormat = pyaudio.paInt16
+            elif nbits == 32:
+                sampleFormat = pyaudio.paInt32
+            self.paManager = pyaudio.PyAudio()
+            self.device = self.paManager.open(format=sampleFormat,
+                                              channels = nChannels,
+                                              rate = fs,
+                                              output = True,
+                                              input_device_index = pyaudioDevice,
+                                              output_device_index=None,
+                                              frames_per_buffer=periodSize)
+            self.latency = self.device.get_output_latency()
+        elif playCmd == "pipe":
+            self.device = subprocess.Popen(pipeCmd, shell=True, stdin=subprocess.PIPE, bufsize=0)
+            #the frames held by the pipe are played after those buffered
+            #by the player, keep as few of them as possible
+            frameBytes = nChannels * nbits // 8
+            try:
+                fd = self.device.stdin.fileno()
+                fcntl.fcntl(fd, fcntl.F_SETPIPE_SZ, periodSize*frameBytes)
+                pipeFrames = fcntl.fcntl(fd, fcntl.F_GETPIPE_SZ) // frameBytes
+            except (AttributeError, OSError): #not Linux, or Python < 3.10
+                pipeFrames = 65536 // frameBytes #default size of a pipe on Linux
+            #the player holds its buffer and the period it is reading
+            self.latency = (pipeFrames + (pipeBufferPeriods+1)*periodSize) / fs
+        if playCmd == "alsaaudio":
+            #time taken to play the frames buffered by the device
+            try:
+                self.latency = self.device.info()["buffer_size"] / fs
+            except (AttributeError, KeyError):
+                self.latency = 4*periodSize / fs #default number of periods of pyalsaaudio
+
+        self.ring = zeros((max(ringBufferSize, 2*periodSize), nChannels), dtype=self.pcmType)
+        #each thread writing to the stream gets its own converter
+        self.nbits = nbits
+        self.converters = threading.local()
+        self.silence = zeros((periodSize, nChannels), dtype=self.pcmType)
+        self.readPos = 0
+        self.nQueued = 0 #frames in the ring buffer
+        self.nSubmitted = 0 #frames queued since the stream was opened
+        self.nWritten = 0 #queued frames written to the device
+        self.playEnd = time.time() #when the frames written to the device will have been played
+        self.writtenPlayEnd = self.playEnd #when the nWritten queued frames will have been played
+        self.nDiscards = 0
+        self.inSound = False #a sound is being queued
+        self.nUnderruns = 0
+        self.cond = threading.Condition()
+        self.running = True
+        self.writer = threading.Thread(target=self._writeLoop, daemon=True)
+        self.writer.start()
+
+    def _deviceWrite(self, seg):
+        if self.playCmd == "alsaaudio":
+            self.device.write(seg)
+        elif self.playCmd == "pyaudio":
+            self.device.write(seg, num_frames=self.periodSize)
+        elif self.playCmd == "pipe":
+            self.device.stdin.write(seg)
+
+    def _writeLoop(self):
+        ringLen = self.ring.shape[0]
+        seg = zeros((self.periodSize, self.nChannels), dtype=self.pcmType)
+        #the periods are handed to the device as views on these buffers
+        segView = memoryview(seg)
+        silenceView = memoryview(self.silence)
+        while True:
+            with self.cond:
+                underrun = False
+                #external players are not fed silence, it would pile up
+                #in the pipe ahead of the next sound
+                while self.running == True and self.nQueued < self.periodSize and (self.inSound == True or self.playCmd == "pipe"):
+                    #the data of the sound is late, wait for the next period
+                    #instead of splicing silence into the sound
+                    if self.inSound == True and underrun == False:
+                        underrun = True
+                        self.nUnderruns += 1
+                        print("Output stream underrun: the sound was not queued fast enough")
+                    self.cond.wait()
+                if self.running == False:
+                    return
+                if self.nQueued >= self.periodSize:
+                    n1 = min(self.periodSize, ringLen - self.readPos)
+                    seg[:n1] = self.ring[self.readPos:self.readPos+n1]
+                    seg[n1:] = self.ring[:self.periodSize-n1]
+                    self.readPos = (self.readPos + self.periodSize) % ringLen
+                    self.nQueued -= self.periodSize
+                    thisSeg = segView
+                    self.cond.notify_all()
+                else:
+                    thisSeg = silenceView
+            writeStart = time.time()
+            try:
+                self._deviceWrite(thisSeg)
+            except (IOError, OSError) as e: #e.g. the player exited
+                print("Error writing to the output stream: " + str(e))
+                with self.cond:
+                    self.running = False
+                    self.cond.notify_all()
+                return
+            writeEnd = time.time()
+            with self.cond:
+                #a write that had to wait for room found the device buffer
+                #full, otherwise the period is played after the frames left
+                #in the buffer, or right away if the buffer had run dry
+                if writeEnd - writeStart >= self.periodSize / (2*self.fs):
+                    self.playEnd = writeEnd + self.latency
+                else:
+                    self.playEnd = min(max(self.playEnd, writeEnd) + self.periodSize/self.fs, writeEnd + self.latency)
+                if thisSeg is segView:
+                    self.nWritten += self.periodSize
+                    self.writtenPlayEnd = self.playEnd
+                    self.cond.notify_all()
+
+    def write(self, data, nDiscards=None):
+        """
+        Queue PCM 'data', with dimensions (nFrames, nChannels), for playback.
+        Block while the ring buffer is full.
+        """
+        data = asarray(data)
+        ringLen = self.ring.shape[0]
+        if nDiscards is None:
+            nDiscards = self.nDiscards
+        n = 0
+        while n < data.shape[0]:
+            with self.cond:
+                while self.running == True and self.nDiscards == nDiscards and self.nQueued == ringLen:
+                    self.cond.wait()
+                if self.running == False or self.nDiscards != nDiscards:
+                    return
+                nFrames = min(ringLen - self.nQueued, data.shape[0] - n)
+                writePos = (self.readPos + self.nQueued) % ringLen
+                n1 = min(nFrames, ringLen - writePos)
+                self.ring[writePos:writePos+n1] = data[n:n+n1]
+                self.ring[:nFrames-n1] = data[n+n1:n+nFrames]
+                self.nQueued += nFrames
+                self.nSubmitted += nFrames
+                self.inSound = True
+                n += nFrames
+                self.cond.notify_all()
+
+    def writeSound(self, snd, dither=False, nDiscards=None):
+        """
+        Convert the floating point sound 'snd', with dimensions
+        (nFrames, nChannels), to PCM one period at a time and queue it
+        for playback.
+        """
+        if nDiscards is None:
+            nDiscards = self.nDiscards
+        converter = getattr(self.converters, "converter", None)
+        if converter is None:
+            converter = pcmConverter(self.nbits, (self.periodSize, self.nChannels))
+            self.converters.converter = converter
+        converter.dither = dither
+        for i in range(0, snd.shape[0], self.periodSize):
+            if self.running == False or self.nDiscards != nDiscards:
+                return
+            self.write(converter.convert(snd[i:i+self.periodSize]), nDiscards)
+
+    def writeSilence(self, nFrames, nDiscards=None):
+        if nDiscards is None:
+            nDiscards = self.nDiscards
+        for i in range(0, nFrames, self.periodSize):
+            if self.running == False or self.nDiscards != nDiscards:
+                return
+            self.write(self.silence[:min(self.periodSize, nFrames-i)], nDiscards)
+
+    def framesSubmitted(self):
+        with self.cond:
+            return self.nSubmitted
+
+    def framesWritten(self):
+        with self.cond:
+            return self.nWritten
+
+    def framesPlayed(self):
+        """
+        Estimate the number of frames, counted from the opening of the
+        stream, that have been played so far.
+        """
+        with self.cond:
+            return self.nWritten - max(0, int((self.writtenPlayEnd - time.time()) * self.fs))
+
+    def waitPlayed(self, nFrames, nDiscards=None):
+        """
+        Wait until 'nFrames' frames (counted from the opening of the
+        stream) have been played, that is until they have been written
+        to the device and the device has played them.
+        """
+        if nDiscards is None:
+            nDiscards = self.nDiscards
+        with self.cond:
+            while self.running == True and self.nDiscards == nDiscards and self.nWritten < nFrames:
+                self.cond.wait()
+            if self.running == False or self.nDiscards != nDiscards:
+                return
+            playedTime = self.writtenPlayEnd - (self.nWritten - nFrames) / self.fs
+        time.sleep(max(0, playedTime - time.time()))
+
+    def waitWritten(self, nFrames):
+        """
+        Wait until 'nFrames' frames (counted from the opening of the
+        stream) have been written to the device.
+        """
+        with self.cond:
+            nDiscards = self.nDiscards
+            while self.running == True and self.nDiscards == nDiscards and self.nWritten < nFrames:
+                self.cond.wait()
+
+    def endSound(self, nDiscards=None):
+        """
+        Mark the end of the sound being queued, padding it with silence
+        to a whole number of periods, so that the writer plays its last
+        period and feeds the device with silence after it.
+        """
+        if nDiscards is None:
+            nDiscards = self.nDiscards
+        with self.cond:
+            #the writer takes whole periods, so this is the size of the
+            #incomplete period at the end of the queue
+            padSize = (-self.nQueued) % self.periodSize
+        if padSize > 0:
+            self.writeSilence(padSize, nDiscards)
+        with self.cond:
+            if self.nDiscards == nDiscards:
+                self.inSound = False
+                self.cond.notify_all()
+
+    def drain(self, nDiscards=None):
+        """
+        Mark the end of the sound being queued (see `endSound`) and wait
+        until it has been played, that is until it has been written
+        to the device and the device has played its buffer.
+        """
+        if nDiscards is None:
+            nDiscards = self.nDiscards
+        self.endSound(nDiscards)
+        self.waitPlayed(self.framesSubmitted(), nDiscards)
+
+    def discard(self):
+        """
+        Drop the data that has not been written to the device yet,
+        and stop the writes that are in progress.
+        """
+        with self.cond:
+            self.nDiscards += 1
+            self.nWritten += self.nQueued
+            self.nQueued = 0
+            self.readPos = 0
+            self.inSound = False
+            self.cond.notify_all()
+
+    def close(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        self.writer.join()
+        if self.playCmd == "alsaaudio":
+            self.device.close()
+        elif self.playCmd == "pyaudio":
+            self.device.stop_stream()
+            self.device.close()
+            self.paManager.terminate()
+        elif self.playCmd == "pipe":
+            #the player exits after playing what is left in the pipe
+            try:
+                self.device.stdin.close()
+            except (IOError, OSError):
+                pass
+            self.device.wait()
+
+#output streams shared by all the audioManagers, one for each
+#combination of device, sample rate and format
+_outputStreams = {}
+_outputStreamsLock = threading.Lock()
+
+def getOutputStream(playCmd, fs, nbits, nChannels, bufferSize, alsaaudioDevice=None, pyaudioDevice=None, pipeCmd=None):
+    """
+    Return the outputStream for the given device, sample rate and format,
+    opening it the first time it is needed, or if it has stopped.
+    """
+    if bufferSize < 1:
+        bufferSize = defaultPeriodSize
+    key = (playCmd, fs, nbits, nChannels, bufferSize, alsaaudioDevice, pyaudioDevice, pipeCmd)
+    with _outputStreamsLock:
+        if key in _outputStreams and _outputStreams[key].running == False:
+            _outputStreams.pop(key).close()
+        if key not in _outputStreams:
+            if playCmd == "alsaaudio": #a card can be opened by one stream at a time
+                for otherKey in [k for k in _outputStreams if k[0] == "alsaaudio" and k[5] == alsaaudioDevice]:
+                    _outputStreams.pop(otherKey).close()
+            elif playCmd == "pipe": #the players may not share the device
+                for otherKey in [k for k in _outputStreams if k[0] == "pipe"]:
+                    _outputStreams.pop(otherKey).close()
+            _outputStreams[key] = outputStream(playCmd, fs, nbits, nChannels, bufferSize, alsaaudioDevice, pyaudioDevice, pipeCmd)
+        return _outputStreams[key]
+
+def closeOutputStreams():
+    with _outputStreamsLock:
+        while len(_outputStreams) > 0:
+            _outputStreams.popitem()[1].close()
+
+atexit.register(closeOutputStreams)
+
 class audioManager():
     def __init__(self, parent):
         self.parent = parent
@@ -62,180 +493,177 @@ class audioManager():
         if self.prm["pref"]["sound"]["wavmanager"] == "scipy":
             from scipy.io import wavfile
             self.wavfile = wavfile
-        self.initializeAudio()
+        #the output streams are shared between audioManagers and stay
+        #open, they are closed only when the audio is reinitialized
+        self.playCmd = self.prm['pref']['sound']['playCommand']
             
     def initializeAudio(self):
         print("Initializing audio")
         self.playCmd = self.prm['pref']['sound']['playCommand']
         
-        try: #if alsaaudio device was open close it
-            print("Trying to close alsaaudio device")
-            self.device.close()
-            print("Closing alsaaudio device")
-        except:
-            print(sys.exc_info())
+        #the device, sample rate or format may have changed, the
+        #output streams are reopened when they are next needed
+        closeOutputStreams()
 
-        try: #if paManager was open close it
-            self.paManager.terminate() #actually closing the stream introduces offset clicks!
-        except:
-            pass
+    def playsThroughStream(self):
+        #alsaaudio and pyaudio, and external players fed raw PCM through
+        #a pipe, play through a persistent output stream
+        if self.playCmd in ['alsaaudio', 'pyaudio']:
+            return True
+        elif self.playCmd != "winsound" and self.prm["pref"]["sound"]["pipePCM"] == True:
+            return True
+        else:
+            return False
 
-        if self.playCmd == "alsaaudio":
-            try:
-                self.device = alsaaudio.PCM(type=alsaaudio.PCM_PLAYBACK, mode=alsaaudio.PCM_NORMAL, card=self.prm["pref"]["sound"]["alsaaudioDevice"])
-                print("Opening preferred alsaaudio device")
-            except:
-                self.device = alsaaudio.PCM(type=alsaaudio.PCM_PLAYBACK, mode=alsaaudio.PCM_NORMAL, card=self.listAlsaaudioPlaybackCards()[0])
-                print("Opening first alsaaudio device")
-        elif self.playCmd == "pyaudio":
-            self.paManager = pyaudio.PyAudio()
+    def getOutputStream(self, fs, nbits, nChannels):
+        if self.playCmd in ['alsaaudio', 'pyaudio']:
+            return getOutputStream(self.playCmd, fs, nbits, nChannels,
+                                   self.prm["pref"]["sound"]["bufferSize"],
+                                   self.prm["pref"]["sound"].get("alsaaudioDevice", None),
+                                   self.prm["pref"]["sound"].get("pyaudioDevice", None))
+        else:
+            playCmd = str(self.playCmd).strip()
+            periodSize = self.prm["pref"]["sound"]["bufferSize"]
+            if periodSize < 1:
+                periodSize = defaultPeriodSize
+            pipeCmd = pipePlayCommands.get(playCmd, playCmd).format(fs=fs, nbits=nbits, nChannels=nChannels,
+                                                                    periodSize=periodSize,
+                                                                    bufferSize=pipeBufferPeriods*periodSize)
+            return getOutputStream("pipe", fs, nbits, nChannels, periodSize, pipeCmd=pipeCmd)
             
-    def playSound(self, snd, fs, nbits, writewav, fname):
+    def playSound(self, snd, fs, nbits, writewav, fname, events=None, nDiscards=None):
+        #events is an optional list of (sample, function) pairs, each
+        #function is called when playback reaches the given sample;
+        #nDiscards is passed to the writes to the output stream, see
+        #outputStream
+        snd = asarray(snd) #sndlib.monoSound objects are expanded to stereo here
         wavmanager = self.prm["pref"]["sound"]["wavmanager"]
         playCmd = str(self.playCmd)
         enc = "pcm"+ str(nbits)
+        throughStream = self.playsThroughStream()
         if writewav == True:
             fname = fname
-        else:
+        elif throughStream == False: #the player needs a wav file
             (hnl, fname) = mkstemp("tmp_snd.wav")
 
-        if playCmd in ['alsaaudio', 'pyaudio']:#write wav before appending zeros in this case
+        if throughStream == True:#write wav before appending zeros in this case
             if writewav == True:
                 if wavmanager == "scipy":
                     self.scipy_wavwrite(fname, fs, nbits, snd)
-        if self.prm["pref"]["sound"]["appendSilence"] > 0:
-            duration = self.prm["pref"]["sound"]["appendSilence"]/1000 #convert from ms to sec
-            nSamples = int(round(duration * fs))
-            silenceToAppend = zeros((nSamples, 2))
-            snd = concatenate((snd, silenceToAppend), axis=0)
-        #alsaaudio
-        if playCmd in ['alsaaudio', 'pyaudio']:
-            nSamples = snd.shape[0]
-            nChannels = snd.shape[1]
-            bufferSize = self.prm["pref"]["sound"]["bufferSize"]
-            if bufferSize < 1:
-                bufferSize = nSamples
-                nSeg = 1
+        nSilence = int(round(self.prm["pref"]["sound"]["appendSilence"]/1000 * fs)) #convert from ms to sec
+        #the sound is converted to PCM one period at a time and
+        #written to the persistent output stream
+        if throughStream == True:
+            stream = self.getOutputStream(fs, nbits, snd.shape[1])
+            if events is None:
+                stream.writeSound(snd, self.prm["pref"]["sound"]["dither"], nDiscards)
             else:
-                nSeg = int(ceil(nSamples/bufferSize))
-                padSize = (nSeg*bufferSize) - nSamples
-                pad = zeros((padSize, nChannels))
-                snd = concatenate((snd, pad), axis=0)
-            
-        if playCmd == "alsaaudio":
-            device = self.device
-            device.setchannels(nChannels)
-            device.setrate(fs)
-            device.setperiodsize(bufferSize)
-            if nbits == 16:
-                data = snd*(2.**15)
-                data = data.astype(int16)
-                device.setformat(alsaaudio.PCM_FORMAT_S16_LE)
-            elif nbits == 32:
-                data = snd*(2.**31)
-                data = data.astype(int32)
-                device.setformat(alsaaudio.PCM_FORMAT_S32_LE)
-            for i in range(nSeg):
-                thisData = data[i*bufferSize:((i*bufferSize)+bufferSize)][:]
-                device.write(thisData)
-            
-        elif playCmd == "pyaudio":
-            
-            if nbits == 16:
-                data = snd*(2.**15)
-                data = data.astype(int16)
-                sampleFormat = pyaudio.paInt16
-            elif nbits == 32:
-                data = snd*(2.**31)
-                data = data.astype(int32)
-                sampleFormat = pyaudio.paInt32
-
-            # try:
-            #     self.stream
-            # except:
-            stream = self.paManager.open(format=sampleFormat,
-                                              channels = nChannels,
-                                              rate = fs,
-                                              output = True,
-                                              input_device_index = self.prm["pref"]["sound"]["pyaudioDevice"],
-                                              output_device_index=None,
-                                              frames_per_buffer=bufferSize)
-
-            for i in range(nSeg):
-                thisData = data[i*bufferSize:((i*bufferSize)+bufferSize)][:]
-                stream.write(thisData, num_frames=bufferSize)
-            stream.stop_stream()
-            stream.close()
-            #time.sleep((bufferSize/fs)+0.02)
-            #self.stream.close() #stream seems to close before sound finished playing
-          
+                self.writeWithEvents(stream, snd, events, nDiscards)
+            stream.writeSilence(nSilence, nDiscards)
+            stream.drain(nDiscards)
 
         else:
+            if nSilence > 0:
+                snd = concatenate((snd, zeros((nSilence, snd.shape[1]))), axis=0)
             if wavmanager == "scipy":
                 self.scipy_wavwrite(fname, fs, nbits, snd)
          
             if platform.system() == "Windows":
                 if playCmd == "winsound":
-                    winsound.PlaySound(fname, winsound.SND_FILENAME)
+                    if events is None:
+                        winsound.PlaySound(fname, winsound.SND_FILENAME)
+                    else:
+                        winsound.PlaySound(fname, winsound.SND_FILENAME | winsound.SND_ASYNC)
+                        self.runTimedEvents(events, fs)
+                        time.sleep(max(0, snd.shape[0]/fs - (time.time() - self.eventsStart)))
                 else:
-                    subprocess.call(playCmd + " " + fname, shell=True)
+                    self.callPlayCmd(playCmd + " " + fname, events, fs)
                 if writewav == False:
                     os.close(hnl)
                     os.remove(fname)
             else:
-                subprocess.call(playCmd + " " + fname, shell=True)
+                self.callPlayCmd(playCmd + " " + fname, events, fs)
                 if writewav == False:
                     os.close(hnl)
                     os.remove(fname)
         return
 
-    def playSoundWithTrigger(self, snd, fs, nbits, writewav, fname, triggerNumber):
-        if writewav == True:
-            fname = fname
+    def writeWithEvents(self, stream, snd, events, nDiscards=None):
+        #queue the data one period at a time, and call the event
+        #functions once the device has played their sample
+        events = sorted(events, key=lambda ev: ev[0])
+        start = stream.framesSubmitted()
+        e = 0
+        for i in range(0, snd.shape[0], stream.periodSize):
+            stream.writeSound(snd[i:i+stream.periodSize], self.prm["pref"]["sound"]["dither"], nDiscards)
+            played = stream.framesPlayed() - start
+            while e < len(events) and events[e][0] < played:
+                events[e][1]()
+                e = e+1
+        #the writer takes whole periods only, so the last, incomplete,
+        #period must be padded before waiting for the remaining events
+        stream.endSound(nDiscards)
+        for ev in events[e:]:
+            #events after the end of the sound are called at its end
+            stream.waitPlayed(start + min(ev[0]+1, snd.shape[0]), nDiscards)
+            ev[1]()
+
+    def runTimedEvents(self, events, fs):
+        #external players do not report their position, the events
+        #are called at their time from the start of the player
+        self.eventsStart = time.time()
+        for ev in sorted(events, key=lambda ev: ev[0]):
+            time.sleep(max(0, ev[0]/fs - (time.time() - self.eventsStart)))
+            ev[1]()
+
+    def callPlayCmd(self, cmd, events, fs):
+        if events is None:
+            subprocess.call(cmd, shell=True)
         else:
-            (hnl, fname) = mkstemp("tmp_snd.wav")
+            proc = subprocess.Popen(cmd, shell=True)
+            self.runTimedEvents(events, fs)
+            proc.wait()
+
+    def playStream(self, blocks, fs, nbits):
+        #play a sound generated block by block (e.g. by the sndlib
+        #streaming generators), writing each block to the device as soon
+        #as it is ready, so that playback starts after the first block
+        if self.playsThroughStream() == False:
+            #external players need the whole sound in a wav file
+            snd = concatenate([asarray(block) for block in blocks], axis=0)
+            self.playSound(snd, fs, nbits, False, "")
+            return
+        nChannels = 2
+        stream = self.getOutputStream(fs, nbits, nChannels)
+        for block in blocks:
+            stream.writeSound(asarray(block), self.prm["pref"]["sound"]["dither"])
+        stream.writeSilence(int(round(self.prm["pref"]["sound"]["appendSilence"]/1000 * fs))) #convert from ms to sec
+        stream.drain()
+        return
 
-        (hnl1, snd_fname) = mkstemp("snd.wav")
-        (hnl2, trigon_fname) = mkstemp("trig-on.wav")
-        (hnl3, trigoff_fname) = mkstemp("trig-off.wav")
-            
-        self.scipy_wavwrite(snd_fname, fs, nbits, snd)
-        playCmd = self.playCmd
-        if playCmd == "winsound": #does not really play with trigger for the moment
-            winsound.PlaySound(snd_fname, winsound.SND_FILENAME)
-        else:
-            nSamp = snd.shape[0]
-            triggerDur = self.prm["pref"]["general"]["triggerDur"] 
-            nSamplesTrigger = ceil(triggerDur * fs) 
-            chOff = zeros((nSamp, 1))
-            chOn  = zeros((nSamp, 1)) 
-            chOn[0:nSamplesTrigger,:] = 0.5
-            self.scipy_wavwrite(trigoff_fname, fs, nbits, chOff)
-            self.scipy_wavwrite(trigon_fname, fs, nbits, chOn)
-            triggerCode = decimalToBinary(triggerNumber, 8)
-            triggerCode = triggerCode[::-1] #reverse it
-            soxCmd = "sox -M " + snd_fname
-            for i in range(6):
-                if triggerCode[i] == '1':
-                    wavToCat = " " + trigoff_fname 
-                else:
-                    wavToCat = " " + trigon_fname 
-                soxCmd = soxCmd + wavToCat
-      
-            
-            soxCmd = soxCmd + " " + fname
-            subprocess.call(soxCmd, shell=True)
-            os.close(hnl1)
-            os.close(hnl2)
-            os.close(hnl3)
-            os.remove(trigoff_fname)
-            os.remove(trigon_fname)
-            os.remove(snd_fname)
-            subprocess.call(playCmd + " " + fname, stdout=self.prm['cmdOutFileHandle'], stderr=self.prm['cmdOutFileHandle'], shell=True)
-            if writewav == False:
-                os.close(hnl)
-                os.remove(fname)
+    def addTriggerChannels(self, snd, fs, triggerNumber):
+        #append six trigger channels to the sound: the bits of the 8-bit
+        #triggerNumber code, starting from the least significant one,
+        #select for each channel either silence (bit set) or a pulse
+        #of 'triggerDur' ms at the onset of the sound (bit not set)
+        snd = asarray(snd)
+        if self.playCmd == "winsound": #does not really play with trigger for the moment
+            return snd
+        nChannels = snd.shape[1]
+        nSamplesTrigger = int(ceil(self.prm["pref"]["general"]["triggerDur"]/1000 * fs))
+        triggerCode = decimalToBinary(triggerNumber, 8)
+        triggerCode = triggerCode[::-1] #reverse it
+        trigSnd = zeros((snd.shape[0], nChannels+6))
+        trigSnd[:, 0:nChannels] = snd
+        for i in range(6):
+            if triggerCode[i] != '1':
+                trigSnd[0:nSamplesTrigger, nChannels+i] = 0.5
+        return trigSnd
 
+    def playSoundWithTrigger(self, snd, fs, nbits, writewav, fname, triggerNumber):
+        #the sound and the trigger channels are played together
+        #through the same (multichannel) stream or wav file
+        self.playSound(self.addTriggerChannels(snd, fs, triggerNumber), fs, nbits, writewav, fname)
 
     def loadWavFile(self, fName, desiredLevel, maxLevel, channel):
         wavmanager = self.prm["pref"]["sound"]["wavmanager"]
@@ -281,14 +709,11 @@ class audioManager():
 
 
     def scipy_wavwrite(self, fname, fs, nbits, data):
-        if nbits == 16:
-            data = data*(2.**15)
-            data = data.astype(int16)
-        elif nbits == 24:
+        data = asarray(data)
+        if nbits == 24:
             print("error, cannot save 24 bits at the moment")
-        elif nbits == 32:
-            data = data*(2.**31)
-            data = data.astype(int32)
+        else:
+            data = pcmConverter(nbits, data.shape, self.prm["pref"]["sound"]["dither"]).convert(data)
 
         if nbits != 24:
            self.wavfile.write(fname, fs, data)
@@ -311,7 +736,7 @@ class threadedAudioPlayer(QThread):
         self.audioManager = audioManager(self)
         self.exiting = False
     def playThreadedSound(self, snd, sampRate, nbits, playCmd, writewav, fName):
-        self.snd = snd
+        self.snd = asarray(snd)
         self.sampRate = sampRate
         self.nbits = nbits
         self.playCmd = playCmd
@@ -319,77 +744,31 @@ class threadedAudioPlayer(QThread):
         if writewav == True: #write the sound before appending zeros
             if wavmanager == "scipy":
                 self.audioManager.scipy_wavwrite(fName, sampRate, nbits, snd)
-        if self.prm["pref"]["sound"]["appendSilence"] > 0:
-            duration = self.prm["pref"]["sound"]["appendSilence"]/1000 #convert from ms to sec
-            nSamples = int(round(duration * sampRate))
-            silenceToAppend = zeros((nSamples, 2))
-            self.snd = concatenate((self.snd, silenceToAppend), axis=0)
-       
-        #self.playCmd = str(self.playCmd)
-
-        if self.playCmd in ['alsaaudio', 'pyaudio']:
-            nSamples = self.snd.shape[0]
-            nChannels = self.snd.shape[1]
-            self.bufferSize = self.prm["pref"]["sound"]["bufferSize"]
-            if self.bufferSize < 1:
-                self.bufferSize = nSamples
-                self.nSeg = 1
-            else:
-                self.nSeg = int(ceil(nSamples/self.bufferSize))
-                padSize = (self.nSeg*self.bufferSize) - nSamples
-                pad = zeros((padSize, nChannels))
-                self.snd = concatenate((self.snd, pad), axis=0)
-
-        if playCmd == "alsaaudio":
-            self.device = alsaaudio.PCM(type=alsaaudio.PCM_PLAYBACK, mode=alsaaudio.PCM_NORMAL, card=self.prm["pref"]["sound"]["alsaaudioDevice"])
-            self.device.setchannels(nChannels)
-            self.device.setrate(sampRate)
-            self.device.setperiodsize(self.bufferSize)
-            if self.nbits == 16:
-                self.data = self.snd*(2.**15)
-                self.data = self.data.astype(int16)
-                self.device.setformat(alsaaudio.PCM_FORMAT_S16_LE)
-            elif self.nbits == 32:
-                self.data = self.snd*(2.**31)
-                self.data = self.data.astype(int32)
-                self.device.setformat(alsaaudio.PCM_FORMAT_S32_LE)
-
-        elif playCmd == "pyaudio":
-            paManager = pyaudio.PyAudio()
-            if self.nbits == 16:
-                self.data = self.snd*(2.**15)
-                self.data = self.data.astype(int16)
-                sampleFormat = pyaudio.paInt16
-            elif nbits == 32:
-                self.data = self.snd*(2.**31)
-                self.data = self.data.astype(int32)
-                sampleFormat = pyaudio.paInt32
-            
-            self.stream = paManager.open(format =sampleFormat,
-                channels = nChannels,
-                rate = sampRate,
-                output = True,
-                input_device_index = self.prm["pref"]["sound"]["pyaudioDevice"],
-                output_device_index=None,
-                frames_per_buffer=self.bufferSize)
+        self.nSilence = int(round(self.prm["pref"]["sound"]["appendSilence"]/1000 * sampRate)) #convert from ms to sec
+        self.dither = self.prm["pref"]["sound"]["dither"]
+        #the sound is played through the persistent output stream
+        #instead of opening the device for each sound
+        self.audioManager.playCmd = playCmd
+        self.stream = self.audioManager.getOutputStream(sampRate, nbits, self.snd.shape[1])
+        #terminate drops the sound by discarding the stream data
+        #queued since here
+        self.nDiscards = self.stream.nDiscards
                 
         #QThread.start(self)
         self.start()
         
     def run(self):
-        i = 0
-        while self.exiting == False and self.nSeg > 0:
-            if self.playCmd == "alsaaudio":
-                thisData = self.data[i*self.bufferSize:((i*self.bufferSize)+self.bufferSize)][:]
-                self.device.write(thisData)
-            elif self.playCmd == "pyaudio":
-                thisData = self.data[i*self.bufferSize:((i*self.bufferSize)+self.bufferSize)][:]
-                self.stream.write(thisData, num_frames=self.bufferSize)
-            i = i+1
-            self.nSeg = self.nSeg -1
-
-            #stream.close()
-            #paManager.terminate() #actually closing the stream introduces offset clicks!
+        self.stream.writeSound(self.snd, self.dither, self.nDiscards)
+        self.stream.writeSilence(self.nSilence, self.nDiscards)
+        self.stream.drain(self.nDiscards)
+
+    def terminate(self):
+        #drop what is left of the sound, the stream stays open; run
+        #returns as soon as its writes see the discard, so the thread
+        #does not need to be killed in the middle of a write
+        if self.isRunning() == True and self.stream.nDiscards == self.nDiscards:
+            self.stream.discard()
+        self.wait()
 
     def __del__(self):
         #the thread will finish before being terminated
@@ -412,10 +791,31 @@ class threadedExternalAudioPlayer(QThread):
         self.cmd = cmd
         self.writewav = writewav
         self.fName = fName
+        #with the 'pipePCM' preference the sound is played through the
+        #persistent output stream, terminate drops it by discarding the
+        #stream data queued since here
+        if self.audioManager.playsThroughStream() == True:
+            self.stream = self.audioManager.getOutputStream(sampRate, bits, asarray(sound).shape[1])
+            self.nDiscards = self.stream.nDiscards
+        else:
+            self.stream = None
+            self.nDiscards = None
         
         self.start()
     def run(self):
-        self.audioManager.playSound(self.sound, self.sampRate, self.bits, self.writewav, self.fName)
+        self.audioManager.playSound(self.sound, self.sampRate, self.bits, self.writewav, self.fName, nDiscards=self.nDiscards)
+
+    def terminate(self):
+        if self.stream is None:
+            #the player is reading a wav file, it can only be stopped
+            #by killing the thread
+            QThread.terminate(self)
+        else:
+            #the stream is shared, so the thread must not be killed
+            #in the middle of a write, see threadedAudioPlayer
+            if self.isRunning() == True and self.stream.nDiscards == self.nDiscards:
+                self.stream.discard()
+            self.wait()
      
     def __del__(self):
         #the thread will finish before being terminated
@@ -251,6 +251,14 @@ class preferencesDialog(QDialog):
         self.writeSndSeqSegments.setChecked(self.tmpPref["pref"]["sound"]["writeSndSeqSegments"])
         soundPrefGrid.addWidget(self.writeSndSeqSegments, n, 0)
         n = n+1
+        self.dither = QCheckBox(self.tr('Dither when converting to PCM'))
+        self.dither.setChecked(self.tmpPref["pref"]["sound"]["dither"])
+        soundPrefGrid.addWidget(self.dither, n, 0)
+        n = n+1
+        self.pipePCM = QCheckBox(self.tr('Pipe raw PCM to the play command'))
+        self.pipePCM.setChecked(self.tmpPref["pref"]["sound"]["pipePCM"])
+        soundPrefGrid.addWidget(self.pipePCM, n, 0)
+        n = n+1
 
         self.appendSilenceLabel = QLabel(self.tr('Append silence to each sound (ms):'))
         soundPrefGrid.addWidget(self.appendSilenceLabel, n, 0)
@@ -533,6 +541,16 @@ class preferencesDialog(QDialog):
         else:
             self.tmpPref['pref']['sound']['writeSndSeqSegments'] = False
 
+        if self.dither.isChecked():
+            self.tmpPref['pref']['sound']['dither'] = True
+        else:
+            self.tmpPref['pref']['sound']['dither'] = False
+
+        if self.pipePCM.isChecked():
+            self.tmpPref['pref']['sound']['pipePCM'] = True
+        else:
+            self.tmpPref['pref']['sound']['pipePCM'] = False
+
         if self.dpCorrCheckBox.isChecked():
             self.tmpPref['pref']['general']['dprimeCorrection'] = True
         else:
@@ -628,6 +646,8 @@ class preferencesDialog(QDialog):
             self.playCommandWidget.setReadOnly(True)
         self.writewav.setChecked(self.tmpPref["pref"]["sound"]["writewav"])
         self.writeSndSeqSegments.setChecked(self.tmpPref["pref"]["sound"]["writeSndSeqSegments"])
+        self.dither.setChecked(self.tmpPref["pref"]["sound"]["dither"])
+        self.pipePCM.setChecked(self.tmpPref["pref"]["sound"]["pipePCM"])
         self.dpCorrCheckBox.setChecked(self.tmpPref["pref"]["general"]["dprimeCorrection"])
         self.listenerNameWarnCheckBox.setChecked(self.tmpPref["pref"]["general"]["listenerNameWarn"])
         self.sessionLabelWarnCheckBox.setChecked(self.tmpPref["pref"]["general"]["sessionLabelWarn"])
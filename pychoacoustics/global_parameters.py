@@ -305,6 +305,8 @@ def def_pref(prm):
     prm["pref"]["sound"]["wavmanager"] = "scipy"
     prm["pref"]["sound"]["bufferSize"] = 1024
     prm["pref"]["sound"]["appendSilence"] = 0
+    prm["pref"]["sound"]["dither"] = False
+    prm["pref"]["sound"]["pipePCM"] = False
     
     if platform.system() == 'Windows':
         prm["pref"]["sound"]["playCommand"] = "winsound"
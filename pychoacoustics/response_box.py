@@ -48,7 +48,7 @@ elif pyqtversion == 5:
     
 from numpy.fft import rfft, irfft, fft, ifft
 import base64, fnmatch, copy, numpy, os, platform, random, string, smtplib, sys, time     
-from numpy import abs, array, concatenate, float64, log10, nan, mean, repeat, std
+from numpy import abs, array, concatenate, float64, log10, nan, mean, repeat, std, zeros
 from .utils_general import*
 from .stats_utils import*
 from .pysdt import*
@@ -461,40 +461,58 @@ class responseBox(QMainWindow):
                 foo = stimulusIncorrect.pop()
                 soundList.append(foo)
 
-        nLight = 0
+        #lay out the whole trial, with the ISIs, in a single sound
+        trialItems = []
         if self.prm["warningInterval"] == True:
-            self.intervalLight[nLight].setStatus('on')
-            time.sleep(self.prm[currBlock]['warningIntervalDur']/1000)
-            self.intervalLight[nLight].setStatus('off')
-            nLight = nLight+1
-            time.sleep(self.prm[currBlock]['warningIntervalISI']/1000)
-
+            trialItems.append((None, self.prm[currBlock]['warningIntervalDur'], self.prm[currBlock]['warningIntervalISI'], None))
         if self.prm["preTrialInterval"] == True:
-            self.intervalLight[nLight].setStatus('on')
-            self.audioManager.playSound(preTrialStim, self.prm['allBlocks']['sampRate'], self.prm['allBlocks']['nBits'], self.prm['pref']['sound']['writewav'], 'pre-trial_interval' +'.wav')
-            self.intervalLight[nLight].setStatus('off')
-            nLight = nLight+1
-            time.sleep(self.prm[currBlock]['preTrialIntervalISI']/1000)
-
+            trialItems.append((preTrialStim, None, self.prm[currBlock]['preTrialIntervalISI'], 'pre-trial_interval' +'.wav'))
         for i in range(nIntervals):
             if self.prm["precursorInterval"] == True:
-                self.intervalLight[nLight].setStatus('on')
-                self.audioManager.playSound(precursorStim, self.prm['allBlocks']['sampRate'], self.prm['allBlocks']['nBits'], self.prm['pref']['sound']['writewav'], 'precursor_interval'+str(i+1) +'.wav')
-                self.intervalLight[nLight].setStatus('off')
-                nLight = nLight+1
-                time.sleep(self.prm[currBlock]['precursorIntervalISI']/1000)
-            self.intervalLight[nLight].setStatus('on')
-            self.audioManager.playSound(soundList[i], self.prm['allBlocks']['sampRate'], self.prm['allBlocks']['nBits'], self.prm['pref']['sound']['writewav'], 'interval'+str(i+1) +'.wav')
-            self.intervalLight[nLight].setStatus('off')
-            nLight = nLight+1
+                trialItems.append((precursorStim, None, self.prm[currBlock]['precursorIntervalISI'], 'precursor_interval'+str(i+1) +'.wav'))
             if self.prm["postcursorInterval"] == True:
-                self.intervalLight[nLight].setStatus('on')
-                self.audioManager.playSound(postcursorStim, self.prm['allBlocks']['sampRate'], self.prm['allBlocks']['nBits'], self.prm['pref']['sound']['writewav'], 'postcursor_interval'+str(i+1) +'.wav')
-                self.intervalLight[nLight].setStatus('off')
-                nLight = nLight+1
-                time.sleep(self.prm[currBlock]['postcursorIntervalISI']/1000)
+                trialItems.append((soundList[i], None, 0, 'interval'+str(i+1) +'.wav'))
+                trialItems.append((postCursorStim, None, self.prm[currBlock]['postcursorIntervalISI'], 'postcursor_interval'+str(i+1) +'.wav'))
+            else:
+                trialItems.append((soundList[i], None, 0, 'interval'+str(i+1) +'.wav'))
             if i < nIntervals-1:
-                time.sleep(self.prm['isi']/1000.)
+                lastItem = trialItems.pop()
+                trialItems.append(lastItem[0:2] + (lastItem[2]+self.prm['isi'],) + lastItem[3:])
+        self.playTrial(trialItems, self.prm['allBlocks']['sampRate'], self.prm['allBlocks']['nBits'])
+
+    def playTrial(self, trialItems, fs, nBits, trigNum=None):
+        #trialItems is a list of (sound, duration, ISI, wavName) tuples,
+        #one for each interval of the trial, in order. For silent intervals
+        #(e.g. the warning interval) the sound is None and the duration in
+        #ms is given. The intervals and the ISIs (in ms) that follow them are
+        #laid out in a single sound, played with one write to the device;
+        #the interval lights are driven by the playback position, so that
+        #the timing of the trial does not depend on the scheduler.
+        #If trigNum is given, the trigger channels for it are added
+        #to each sound
+        timeline = soundTimeline(fs)
+        events = []
+        offset = 0
+        nChannels = 2
+        for nLight in range(len(trialItems)):
+            snd, duration, ISI, wavName = trialItems[nLight]
+            if snd is None:
+                nSamples = int(round(duration/1000 * fs))
+            else:
+                if trigNum != None:
+                    snd = self.audioManager.addTriggerChannels(snd, fs, trigNum)
+                nChannels = snd.shape[1]
+                nSamples = snd.shape[0]
+                timeline.addAtSample(snd, offset)
+                if self.prm['pref']['sound']['writewav'] == True and self.prm["pref"]["sound"]["wavmanager"] == "scipy":
+                    self.audioManager.scipy_wavwrite(wavName, fs, nBits, snd)
+            light = self.intervalLight[nLight]
+            events.append((offset, lambda light=light: light.setStatus('on')))
+            events.append((offset+nSamples, lambda light=light: light.setStatus('off')))
+            offset = offset + nSamples + int(round(ISI/1000 * fs))
+        if offset > timeline.nSamples: #keep the silence after the last interval
+            timeline.addAtSample(zeros((offset - timeline.nSamples, nChannels)), timeline.nSamples)
+        self.audioManager.playSound(timeline.mix(), fs, nBits, False, 'trial.wav', events=events)
 
     def playSequentialIntervals(self, sndList, ISIList=[], trigNum=None):
         currBlock = 'b'+ str(self.prm['currentBlock'])
@@ -502,31 +520,35 @@ class responseBox(QMainWindow):
         for i in range(len(sndList)):
             if self.prm['pref']['sound']['writeSndSeqSegments'] == True:
                 self.audioManager.scipy_wavwrite("sndSeq%i.wav"%(i+1), self.prm['allBlocks']['sampRate'], self.prm['allBlocks']['nBits'], sndList[i])
-        nLight = 0
+        #lay out the whole sequence, with the ISIs, in a single sound
+        trialItems = []
         if self.prm["warningInterval"] == True:
-            self.intervalLight[nLight].setStatus('on')
-            time.sleep(self.prm[currBlock]['warningIntervalDur']/1000)
-            self.intervalLight[nLight].setStatus('off')
-            nLight = nLight+1
-            time.sleep(self.prm[currBlock]['warningIntervalISI']/1000)
+            trialItems.append((None, self.prm[currBlock]['warningIntervalDur'], self.prm[currBlock]['warningIntervalISI'], None))
         for i in range(len(sndList)):
-            self.intervalLight[nLight].setStatus('on')
-            if trigNum != None:
-                self.audioManager.playSoundWithTrigger(sndList[i], self.prm['allBlocks']['sampRate'], self.prm['allBlocks']['nBits'], self.prm['pref']['sound']['writewav'], 'soundSequence.wav', trigNum)
-            else:
-                self.audioManager.playSound(sndList[i], self.prm['allBlocks']['sampRate'], self.prm['allBlocks']['nBits'], self.prm['pref']['sound']['writewav'], 'soundSequence.wav')
-            self.intervalLight[nLight].setStatus('off')
-            nLight = nLight+1
-
             if i < (len(sndList) - 1):
-                time.sleep(ISIList[i]/1000)
-
+                trialItems.append((sndList[i], None, ISIList[i], 'soundSequence.wav'))
+            else:
+                trialItems.append((sndList[i], None, 0, 'soundSequence.wav'))
+        self.playTrial(trialItems, self.prm['allBlocks']['sampRate'], self.prm['allBlocks']['nBits'], trigNum)
 
     def playSoundsWavComp(self, soundList, fsList, nBitsList):
         currBlock = 'b'+ str(self.prm['currentBlock'])
         nIntervals = self.prm['nIntervals']
         #cmd = self.prm['pref']['sound']['playCommand']
 
+        if len(set(fsList[0:nIntervals])) == 1 and len(set(nBitsList[0:nIntervals])) == 1:
+            #lay out the whole trial, with the ISIs, in a single sound
+            trialItems = []
+            if self.prm["warningInterval"] == True:
+                trialItems.append((None, self.prm[currBlock]['warningIntervalDur'], self.prm[currBlock]['warningIntervalISI'], None))
+            for i in range(nIntervals):
+                if i < nIntervals-1:
+                    trialItems.append((soundList[i], None, self.prm['isi'], 'interval'+str(i+1) +'.wav'))
+                else:
+                    trialItems.append((soundList[i], None, 0, 'interval'+str(i+1) +'.wav'))
+            self.playTrial(trialItems, fsList[0], nBitsList[0])
+            return
+        #the wavs have different sampling rates or formats
         nLight = 0
         if self.prm["warningInterval"] == True:
             self.intervalLight[nLight].setStatus('on')
@@ -21,10 +21,834 @@ A module for generating sounds in python.
 """
 
 from __future__ import nested_scopes, generators, division, absolute_import, with_statement, print_function, unicode_literals
-import copy, numpy, multiprocessing, warnings
-from numpy import abs, angle, arange, array, asarray, ceil, concatenate, convolve, cos, cumsum, floor, int_, int64, log, log2, log10, linspace, logspace, mean, ones, pi, real, repeat, sin, sqrt, where, zeros
+import atexit, collections, copy, functools, inspect, numpy, multiprocessing, os, threading, warnings
+from numpy import abs, angle, arange, array, asarray, ceil, concatenate, convolve, cos, cumsum, exp, floor, int_, int64, log, log2, log10, linspace, logspace, mean, ones, pi, real, repeat, sin, sqrt, where, zeros
 from numpy.fft import fft, ifft, irfft, rfft
 from scipy.signal import firwin2
+try:
+    from scipy.signal import oaconvolve
+except ImportError: #scipy < 1.4
+    oaconvolve = None
+try:
+    from multiprocessing import shared_memory
+except ImportError: #python < 3.8
+    shared_memory = None
+
+#floating point type of the sounds returned by the generators, it can be set
+#to numpy.float32 to halve their memory footprint; phases and frequency
+#trajectories are always computed in double precision
+sndDtype = numpy.float64
+
+def _sndDtype(dtype):
+    """
+    Return 'dtype', or the module-level `sndDtype` setting if 'dtype' is None.
+
+    """
+    if dtype is None:
+        dtype = sndDtype
+
+    return dtype
+
+def _floatDtype(sig):
+    """
+    Return the dtype of 'sig' if it is a floating point type, float64 otherwise.
+
+    """
+    if asarray(sig).dtype.kind == 'f':
+        return asarray(sig).dtype
+    else:
+        return numpy.dtype(float)
+
+#if True, sounds that are played in one ear only, or that are identical
+#in the two ears, are returned by the generators as monoSound objects
+#instead of (nSamples, 2) arrays, see monoSound
+monoFirst = False
+
+#maximum number of elements (partials x samples) held in the temporary
+#arrays of the additive synthesis engine
+synthBlockSize = 2**20
+
+def _sumPartials(baseAng, mults, phases, phaseWeights=None, out=None, amps=None, angOffset=None):
+    """
+    Sum a set of sinusoidal partials sharing a common phase trajectory.
+
+    Each partial `k` is computed as amps[k]*sin(mults[k]*baseAng + phases[k]*phaseWeights + angOffset),
+    so that `baseAng` can be either a time vector in seconds (with 'mults'
+    being the angular frequencies of the partials) or the instantaneous
+    phase of the fundamental (with 'mults' being the harmonic numbers). The partials are evaluated in blocks
+    of at most `synthBlockSize` elements, so that memory usage does not grow
+    with the number of partials.
+
+    Several sums sharing the same 'baseAng' (e.g. a batch of stimuli) can
+    be computed at once by giving 'mults', 'phases' and 'amps' with
+    dimensions (nSums, nPartials), the output having dimensions
+    (nSums, nSamples).
+
+    Parameters
+    ----------
+    baseAng : array of floats
+        Common phase trajectory.
+    mults : array of floats
+        Multiplier of 'baseAng' for each partial.
+    phases : array of floats
+        Starting phase of each partial in radians.
+    phaseWeights : array of floats or None
+        If not None, the starting phases are multiplied by this array.
+    out : array of floats or None
+        If not None, the sum of the partials is added to this array.
+    amps : array of floats or None
+        If not None, the amplitude of each partial.
+    angOffset : array of floats or None
+        If not None, a phase trajectory added to that of every partial.
+
+    Returns
+    -------
+    out : array of floats
+
+    """
+    nTot = len(baseAng)
+    mults = asarray(mults, dtype=float)
+    phases = numpy.broadcast_to(asarray(phases, dtype=float), mults.shape)
+    if amps is not None:
+        amps = numpy.broadcast_to(asarray(amps, dtype=float), mults.shape)
+    if out is None:
+        out = zeros(mults.shape[:-1] + (nTot,))
+    nPartials = mults.shape[-1]
+    if nPartials == 0:
+        return out
+    #partials on the first axis and sums on the second, so that the
+    #blocks span whole rows of samples whenever they fit
+    mults = mults.reshape(-1, nPartials).T
+    phases = phases.reshape(-1, nPartials).T
+    if amps is not None:
+        amps = amps.reshape(-1, nPartials).T
+    sums = out.reshape(-1, nTot)
+    nSums = mults.shape[1]
+    partStep = max(1, min(nPartials, synthBlockSize))
+    sampStep = max(1, synthBlockSize // partStep)
+    sumStep = max(1, synthBlockSize // (partStep * min(nTot, sampStep)))
+    for p in range(0, nPartials, partStep):
+        for i in range(0, nSums, sumStep):
+            thisMults = mults[p:p+partStep, i:i+sumStep, numpy.newaxis]
+            thisPhases = phases[p:p+partStep, i:i+sumStep, numpy.newaxis]
+            for s in range(0, nTot, sampStep):
+                block = thisMults * baseAng[s:s+sampStep]
+                if phaseWeights is None:
+                    block += thisPhases
+                else:
+                    block += thisPhases * phaseWeights[s:s+sampStep]
+                if angOffset is not None:
+                    block += angOffset[s:s+sampStep]
+                sin(block, out=block)
+                if amps is None:
+                    sums[i:i+sumStep, s:s+sampStep] += block.sum(axis=0)
+                else:
+                    sums[i:i+sumStep, s:s+sampStep] += numpy.einsum("pi,pis->is", amps[p:p+partStep, i:i+sumStep], block)
+
+    return out
+    #partials on the first axis, so that they are summed over whole
+    #(nSums, nSamples) slices
+    mults = numpy.moveaxis(mults, -1, 0)
+    phases = numpy.moveaxis(phases, -1, 0)
+    if amps is not None:
+        amps = numpy.moveaxis(amps, -1, 0)
+    sumBlockSize = max(1, synthBlockSize // max(1, out[..., 0].size))
+    partStep = max(1, min(nPartials, sumBlockSize))
+    sampStep = max(1, sumBlockSize // partStep)
+    for p in range(0, nPartials, partStep):
+        thisMults = mults[p:p+partStep, ..., numpy.newaxis]
+        thisPhases = phases[p:p+partStep, ..., numpy.newaxis]
+        for s in range(0, nTot, sampStep):
+            block = thisMults * baseAng[s:s+sampStep]
+            if phaseWeights is None:
+                block += thisPhases
+            else:
+                block += thisPhases * phaseWeights[s:s+sampStep]
+            if angOffset is not None:
+                block += angOffset[s:s+sampStep]
+            sin(block, out=block)
+            if amps is None:
+                out[..., s:s+sampStep] += block.sum(axis=0)
+            else:
+                out[..., s:s+sampStep] += numpy.einsum("p...,p...s->...s", amps[p:p+partStep], block)
+
+    return out
+
+#number of samples processed at a time by the oscillators
+oscBlockSize = 2**15
+
+def _oscPhase(nTot, phaseFunc, integrate=False, startPhase=0, out=None):
+    """
+    Compute the instantaneous phase of an oscillator in blocks of
+    `oscBlockSize` samples.
+
+    Parameters
+    ----------
+    nTot : int
+        Number of samples.
+    phaseFunc : function
+        Function called with an array of sample numbers. If 'integrate'
+        is False it must return the instantaneous phase in radians of
+        those samples. If 'integrate' is True it must return the
+        instantaneous angular frequency in radians per sample, which
+        is cumulatively summed to obtain the phase.
+    integrate : bool
+        Whether the output of 'phaseFunc' should be integrated.
+    startPhase : float
+        Phase added to the integrated phase.
+    out : array of floats or None
+        If not None, the phase is written in this array.
+
+    Returns
+    -------
+    out : array of floats
+
+    """
+    if out is None:
+        out = zeros(nTot)
+    acc = startPhase
+    for s in range(0, nTot, oscBlockSize):
+        block = out[s:s+oscBlockSize]
+        n = arange(s, s+len(block))
+        if integrate == True:
+            cumsum(phaseFunc(n), out=block)
+            block += acc
+            acc = block[-1]
+        else:
+            block[:] = phaseFunc(n)
+
+    return out
+
+def _oscillator(nTot, phaseFunc, amp, integrate=False, startPhase=0):
+    """
+    Synthetise a sinusoid of amplitude 'amp' with the instantaneous phase
+    described by 'phaseFunc', see _oscPhase. The phase and the sinusoid
+    share the same buffer.
+
+    """
+    tone = _oscPhase(nTot, phaseFunc, integrate, startPhase)
+    sin(tone, out=tone)
+    tone *= amp
+
+    return tone
+
+def _sinesFromSpectrum(nTot, bins, phases, amps=1):
+    """
+    Sum sinusoids lying on the frequency grid of an 'nTot' points FFT
+    with a single inverse real FFT.
+
+    The output is equal to the sum of amps[k]*sin(2*pi*bins[k]*n/nTot + phases[k]),
+    where 'n' is the sample number. Bins occurring more than once are summed.
+
+    Parameters
+    ----------
+    nTot : int
+        Number of samples of the output.
+    bins : array of ints
+        FFT bins of the sinusoids, between 0 and nTot//2.
+    phases : array of floats
+        Starting phases of the sinusoids in radians.
+    amps : float or array of floats
+        Amplitudes of the sinusoids.
+
+    Returns
+    -------
+    sig : array of floats
+
+    """
+    bins = asarray(bins, dtype=int); phases = asarray(phases, dtype=float)
+    amps = numpy.broadcast_to(asarray(amps, dtype=float), bins.shape)
+    spectrum = zeros(nTot//2+1, dtype=complex)
+    #DC and Nyquist bins are real
+    edge = (bins == 0) | (2*bins == nTot)
+    numpy.add.at(spectrum, bins[~edge], amps[~edge] * (nTot/2) * exp(1j*(phases[~edge]-pi/2)))
+    numpy.add.at(spectrum, bins[edge], amps[edge] * nTot * sin(phases[edge]))
+    sig = irfft(spectrum, nTot)
+
+    return sig
+
+def _steepNoiseComponents(frequency1, frequency2, level, totDur, nTot, fs, maxLevel):
+    """
+    Compute the amplitude of the sinusoidal components of a steepNoise
+    band, and the FFT bins on which they lie.
+
+    Parameters
+    ----------
+    frequency1 : float
+        Start frequency of the noise.
+    frequency2 : float
+        End frequency of the noise.
+    level : float
+        Noise spectrum level.
+    totDur : float
+        Total duration of the noise in seconds.
+    nTot : int
+        Total number of samples of the noise.
+    fs : int
+        Samplig frequency in Hz.
+    maxLevel : float
+        Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+
+    Returns
+    -------
+    amp : float
+        Amplitude of each component.
+    bins : array of ints
+        FFT bins of the components.
+
+    Notes
+    -----
+    Rounding the band edges to the FFT grid can change the number of
+    components with respect to the 1 + floor((frequency2-frequency1)*totDur)
+    sinusoids of the time-domain synthesis, so the amplitude is computed
+    from the number of bins, keeping the power of the band, and hence
+    its spectrum level, equal to that of the time-domain synthesis.
+
+    """
+    binSpacing = fs / nTot
+    bins = arange(int(round(frequency1/binSpacing)), min(int(round(frequency2/binSpacing)), nTot//2)+1)
+    # SL = 10*log10(A^2/NHz) 
+    # SL/10 = log10(A^2/NHz)
+    # 10^(SL/10) = A^2/NHz
+    # A^2 = 10^(SL/10) * NHz
+    # RMS = 10^(SL/20) * sqrt(NHz) where NHz is the spacing between harmonics
+    amp =  10**((level - maxLevel) / 20) * sqrt((frequency2 - frequency1) / max(len(bins), 1))
+
+    return amp, bins
+
+@functools.lru_cache(maxsize=32)
+def _rfftFreqs(fftPoints, fs):
+    """
+    Return the frequencies in hertz of the bins of an 'fftPoints' real FFT.
+    The arrays are cached and read-only.
+
+    """
+    freqs = numpy.fft.rfftfreq(fftPoints, 1/fs)
+    freqs.flags.writeable = False
+
+    return freqs
+
+@functools.lru_cache(maxsize=32)
+def _pinkWeights(nSamples, fs, refHz):
+    """
+    Return the amplitude weights that turn the real FFT of an 'nSamples'
+    white noise into that of a pink noise with the same spectrum level
+    at 'refHz'. The arrays are cached and read-only.
+
+    """
+    ref = 1 + (refHz * nSamples/fs)
+    weights = ones(nSamples//2+1)
+    weights[1:] = sqrt(ref/arange(1, len(weights)))
+    weights.flags.writeable = False
+
+    return weights
+
+def _dichoticPhaseMask(freqs, shiftLo, shiftHi, dichoticDifference, dichoticDifferenceValue):
+    """
+    Build the phase shift to apply to each frequency of an FFT in order
+    to decorrelate a set of frequency regions.
+
+    Parameters
+    ----------
+    freqs : array of floats
+        Frequencies of the FFT bins in hertz.
+    shiftLo : array of floats
+        Start frequency of each region to be shifted.
+    shiftHi : array of floats
+        End frequency of each region to be shifted.
+    dichoticDifference : string ('IPD Linear', 'IPD Stepped', 'IPD Random', 'ITD')
+        Type of shift, see makeHugginsPitch.
+    dichoticDifferenceValue : float
+        Amount of shift, see makeHugginsPitch.
+
+    Returns
+    -------
+    mask : array of floats
+        Phase shift in radians for each frequency. The shifts of
+        overlapping regions are summed.
+
+    """
+    mask = zeros(len(freqs))
+    for i in range(len(shiftLo)):
+        sh = where((freqs>shiftLo[i]) & (freqs<shiftHi[i]))[0]
+        if dichoticDifference == "IPD Linear":
+            mask[sh] += linspace(0, dichoticDifferenceValue, len(sh))
+        elif dichoticDifference == "IPD Stepped":
+            mask[sh] += dichoticDifferenceValue
+        elif dichoticDifference == "IPD Random":
+            mask[sh] += numpy.random.uniform(0, dichoticDifferenceValue, len(sh))
+        elif dichoticDifference == "ITD":
+            mask[sh] += itdtoipd(dichoticDifferenceValue/1000000, freqs[sh])
+
+    return mask
+
+def _rotatePhases(sig, mask, fftPoints):
+    """
+    Add a phase shift to each frequency of a signal with a single
+    forward/inverse real FFT pair.
+
+    Parameters
+    ----------
+    sig : array of floats
+        Input signal, of one or more channels along the last axis.
+    mask : array of floats
+        Phase shift in radians for each of the fftPoints//2+1 FFT bins,
+        or an array of such shifts, one for each channel.
+    fftPoints : int
+        Number of points of the FFT (the signal is zero-padded).
+
+    Returns
+    -------
+    out : array of floats
+        The shifted signal, with the same shape as 'sig'.
+
+    """
+    nSamples = sig.shape[0]
+    x = rfft(sig, fftPoints, axis=0)
+    mask = asarray(mask).T
+    if x.ndim > mask.ndim: #same shift for all channels
+        mask = mask[:, numpy.newaxis]
+    x *= exp(1j*mask)
+    out = irfft(x, fftPoints, axis=0)[0:nSamples]
+
+    return out
+
+#minimum number of samples for which fir2Filt switches from direct
+#to FFT (overlap-add) convolution
+fir2FFTMinSamples = 2**16
+
+#onset and offset ramps are cached by number of samples, this is the
+#maximum number of ramp pairs kept in the cache
+rampCacheSize = 32
+_rampCache = collections.OrderedDict()
+
+def _getRamps(nRamp):
+    """
+    Return the raised-cosine onset and offset ramps for 'nRamp' samples.
+
+    The ramps are read-only arrays shared between calls.
+
+    """
+    try:
+        ramps = _rampCache.pop(nRamp)
+    except KeyError:
+        timeRamp = arange(0., nRamp)
+        rampOn = (1-cos(pi * timeRamp/nRamp))/2
+        rampOff = (1+cos(pi * timeRamp/nRamp))/2
+        rampOn.setflags(write=False); rampOff.setflags(write=False)
+        ramps = (rampOn, rampOff)
+        while len(_rampCache) >= rampCacheSize > 0:
+            _rampCache.popitem(last=False)
+    if rampCacheSize > 0:
+        _rampCache[nRamp] = ramps
+    return ramps
+
+def _applyRamps(sig, nRamp):
+    """
+    Impose onset and offset ramps of 'nRamp' samples in place.
+
+    'sig' can be either a 1-dimensional array or a 2-dimensional
+    array with samples on the first axis, in which case the ramps
+    are applied to all channels.
+
+    """
+    if nRamp < 1:
+        return sig
+    rampOn, rampOff = _getRamps(nRamp)
+    if sig.ndim > 1:
+        rampOn = rampOn[:, numpy.newaxis]; rampOff = rampOff[:, numpy.newaxis]
+    nTot = sig.shape[0]
+    sig[0:nRamp] *= rampOn
+    sig[nTot-nRamp:nTot] *= rampOff
+    return sig
+
+#maximum number of bytes of sounds kept in the cache of the deterministic
+#generators (pureTone, complexTone, etc...), 0 disables the cache. When the
+#cache is enabled the sounds returned by these generators are read-only and
+#shared between calls with the same arguments, see sndCacheInfo
+sndCacheSize = 0
+_sndCache = collections.OrderedDict()
+_sndCacheStats = {"hits": 0, "misses": 0, "evictions": 0, "bytes": 0}
+_sndCacheLock = threading.RLock()
+_sndCacheState = threading.local()
+
+def _sndNBytes(snd):
+    if isinstance(snd, monoSound):
+        return snd.sig.nbytes
+    return snd.nbytes
+
+def _setReadOnly(snd):
+    if isinstance(snd, monoSound):
+        snd.sig.setflags(write=False)
+    else:
+        snd.setflags(write=False)
+    return snd
+
+def _cachedSnd(randomArgs=None):
+    """
+    Decorator that memoizes the sounds returned by a deterministic generator.
+
+    The cache is keyed by the full set of arguments of the generator,
+    together with the output dtype and the `monoFirst` setting, and
+    holds at most `sndCacheSize` bytes of sounds, the least recently
+    used sounds being evicted first. Calls made while another cached
+    generator is running (e.g. `glide` calling `chirp`) are not cached.
+
+    Parameters
+    ----------
+    randomArgs : dict or None
+        Maps argument names to the values for which the generator
+        is not deterministic (e.g. {"harmPhase": "Random"}). These calls
+        are never cached.
+
+    """
+    if randomArgs is None:
+        randomArgs = {}
+    def decorator(func):
+        sig = inspect.signature(func)
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if sndCacheSize <= 0 or getattr(_sndCacheState, "depth", 0) > 0:
+                return func(*args, **kwargs)
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            prm = bound.arguments
+            for argName in randomArgs:
+                if prm[argName] == randomArgs[argName]:
+                    return func(*args, **kwargs)
+            key = (func.__name__, tuple(prm.items()), numpy.dtype(_sndDtype(prm.get("dtype"))), monoFirst)
+            try:
+                with _sndCacheLock:
+                    snd = _sndCache.pop(key)
+                    _sndCache[key] = snd
+                    _sndCacheStats["hits"] += 1
+                return snd
+            except KeyError:
+                pass
+            except TypeError: #unhashable arguments
+                return func(*args, **kwargs)
+            _sndCacheState.depth = 1
+            try:
+                snd = func(*args, **kwargs)
+            finally:
+                _sndCacheState.depth = 0
+            nBytes = _sndNBytes(snd)
+            with _sndCacheLock:
+                _sndCacheStats["misses"] += 1
+                if nBytes <= sndCacheSize and key not in _sndCache:
+                    while _sndCacheStats["bytes"] + nBytes > sndCacheSize:
+                        oldSnd = _sndCache.popitem(last=False)[1]
+                        _sndCacheStats["bytes"] -= _sndNBytes(oldSnd)
+                        _sndCacheStats["evictions"] += 1
+                    _sndCache[key] = _setReadOnly(snd)
+                    _sndCacheStats["bytes"] += nBytes
+            return snd
+        return wrapper
+    return decorator
+
+def _monoToStereo(x, channel, dtype=None):
+    """
+    Place a 1-dimensional signal in the 'Right', 'Left' or 'Both' channels
+    of a 2-dimensional (nSamples, 2) array.
+
+    """
+    snd = zeros((len(x), 2), dtype=_sndDtype(dtype))
+    if channel == "Right":
+        snd[:,1] = x
+    elif channel == "Left":
+        snd[:,0] = x
+    elif channel == "Both":
+        snd[:,0] = x
+        snd[:,1] = x
+    else:
+        raise TypeError("Invalid channel argument. Channel must be one of 'Right', 'Left' or 'Both'")
+    return snd
+
+def _makeSnd(x, channel, dtype=None):
+    """
+    Return the 1-dimensional signal 'x' routed to the 'Right', 'Left' or
+    'Both' channels, either as a monoSound if the module-level `monoFirst`
+    setting is True, or as a (nSamples, 2) array otherwise.
+
+    """
+    if monoFirst == True:
+        snd = monoSound(asarray(x, dtype=_sndDtype(dtype)), channel)
+    else:
+        snd = _monoToStereo(x, channel, dtype)
+    return snd
+
+#if set to a noiseTokenPool, broadbandNoise and expAMNoise draw their
+#noise from it when it runs at the sampling frequency of the sound
+noisePool = None
+
+def _runningNoise(nTot, rng=numpy.random):
+    """
+    Generate 'nTot' samples of un-normalized running noise.
+
+    """
+    #random is a numpy module
+    noise = (rng.random(nTot) + rng.random(nTot)) - (rng.random(nTot) + rng.random(nTot))
+    return noise
+
+def _normalizeNoise(noise):
+    """
+    Scale 'noise' in place so that its peak-equivalent amplitude is 1.
+
+    """
+    RMS = sqrt(mean(noise*noise))
+    #scale the noise so that the maxAmplitude goes from -1 to 1
+    #since A = RMS*sqrt(2)
+    noise /= (RMS * sqrt(2))
+    return noise
+
+def _unitNoise(nTot, fs):
+    """
+    Return 'nTot' samples of running noise with a peak-equivalent
+    amplitude of 1, drawn from `noisePool` if it is set and runs at the
+    sampling frequency 'fs', or generated on the spot otherwise.
+
+    """
+    if noisePool is not None and noisePool.fs == fs:
+        noise = noisePool.getNoise(nTot)
+    else:
+        noise = _normalizeNoise(_runningNoise(nTot))
+    return noise
+
+def _batchParams(*prms):
+    """
+    Broadcast the per-stimulus parameters of a batch generator
+    against each other and return them as 1-dimensional float arrays.
+
+    """
+    prms = numpy.broadcast_arrays(*[numpy.atleast_1d(asarray(prm, dtype=float)) for prm in prms])
+    if prms[0].ndim > 1:
+        raise TypeError("The parameters of batch generators must be scalars or 1-dimensional arrays")
+    return prms
+
+def _batchToStereo(tones, channel, dtype=None):
+    """
+    Route a (nStim, nSamples) array of signals to the 'Right', 'Left'
+    or 'Both' channels of a (nStim, nSamples, 2) array.
+
+    """
+    snd = zeros(tones.shape + (2,), dtype=_sndDtype(dtype))
+    if channel == "Right":
+        snd[:,:,1] = tones
+    elif channel == "Left":
+        snd[:,:,0] = tones
+    elif channel == "Both":
+        snd[:,:,0] = tones
+        snd[:,:,1] = tones
+    else:
+        raise TypeError("Invalid channel argument. Channel must be one of 'Right', 'Left' or 'Both'")
+    return snd
+
+def _batchTimes(duration, ramp, fs):
+    """
+    Return the number of ramp samples and the time vector shared
+    by all the stimuli of a batch generator.
+
+    """
+    duration = duration / 1000 #convert from ms to sec
+    ramp = ramp / 1000
+    nSamples = int(round(duration * fs))
+    nRamp = int(round(ramp * fs))
+    nTot = nSamples + (nRamp * 2)
+    timeAll = arange(0, nTot) / fs
+    return nRamp, timeAll
+
+#number of samples of the stereo blocks yielded by the streaming
+#generators (pureToneStream, broadbandNoiseStream, etc...)
+streamBlockSize = 2**14
+
+def _rampBlock(block, start, nRamp, nTot):
+    """
+    Impose, in place, the part of the onset and offset ramps of an
+    'nTot' samples sound that falls within a block starting at
+    sample 'start'.
+
+    """
+    if nRamp < 1:
+        return block
+    rampOn, rampOff = _getRamps(nRamp)
+    if block.ndim > 1:
+        rampOn = rampOn[:, numpy.newaxis]; rampOff = rampOff[:, numpy.newaxis]
+    stop = start + block.shape[0]
+    if start < nRamp:
+        block[0:min(stop, nRamp)-start] *= rampOn[start:min(stop, nRamp)]
+    offStart = nTot - nRamp
+    if stop > offStart:
+        s = max(start, offStart)
+        block[s-start:stop-start] *= rampOff[s-offStart:stop-offStart]
+    return block
+
+def _streamBlocks(nTot, nRamp, channel, blockFunc, blockSize, dtype):
+    """
+    Return a generator of gated (blockSize, 2) blocks of an 'nTot'
+    samples sound. 'blockFunc' is called with the array of the sample
+    numbers of each block, and returns the corresponding samples of the
+    un-gated mono signal. The last block can be shorter.
+
+    """
+    if channel not in ["Right", "Left", "Both"]:
+        raise TypeError("Invalid channel argument. Channel must be one of 'Right', 'Left' or 'Both'")
+    if blockSize is None:
+        blockSize = streamBlockSize
+    def blocks():
+        for s in range(0, nTot, blockSize):
+            x = blockFunc(arange(s, min(s+blockSize, nTot)))
+            _rampBlock(x, s, nRamp, nTot)
+            yield _monoToStereo(x, channel, dtype)
+    return blocks()
+
+#process pool used by complexToneParallel, it is created the first time
+#it is needed and kept alive for the rest of the session
+_workerPool = None
+
+def _getWorkerPool():
+    """
+    Return the session-wide process pool, creating it if needed.
+
+    """
+    global _workerPool
+    if _workerPool is None:
+        if os.name == "posix":
+            #start the resource tracker before the workers, so that they
+            #share it instead of each starting their own
+            from multiprocessing import resource_tracker
+            resource_tracker.ensure_running()
+        _workerPool = multiprocessing.Pool()
+        atexit.register(_closeWorkerPool)
+    return _workerPool
+
+def _closeWorkerPool():
+    """
+    Shut down the session-wide process pool.
+
+    """
+    global _workerPool
+    if _workerPool is not None:
+        _workerPool.close()
+        _workerPool.join()
+        _workerPool = None
+
+def _attachSharedMemory(name):
+    """
+    Attach to an existing shared memory block owned by the parent process.
+
+    The pool workers share the resource tracker of the parent process
+    (see _getWorkerPool), where the block is already registered, so
+    attaching must not unregister it, otherwise the tracker complains
+    when the parent unlinks the block.
+
+    """
+    try:
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError: #python < 3.13, registering again is harmless
+        shm = shared_memory.SharedMemory(name=name)
+    return shm
+
+def _partialsWorker(shmName, nTot, start, stop, fs, chanRadFreqs, chanPhases):
+    """
+    Compute samples 'start' to 'stop' of a sum of partials directly into
+    a (nTot, 2) float array stored in the shared memory block 'shmName'.
+
+    """
+    shm = _attachSharedMemory(shmName)
+    try:
+        buf = numpy.ndarray((nTot, 2), dtype=float, buffer=shm.buf)
+        timeAll = arange(start, stop) / fs
+        for chan in range(2):
+            if len(chanRadFreqs[chan]) > 0:
+                _sumPartials(timeAll, chanRadFreqs[chan], chanPhases[chan], out=buf[start:stop, chan])
+        del buf
+    finally:
+        shm.close()
+
+def _harmPhases(harmPhase, harms, highHarm):
+    """
+    Compute the starting phases of a set of harmonics.
+
+    Parameters
+    ----------
+    harmPhase : one of 'Sine', 'Cosine', 'Alternating', 'Random', 'Schroeder'
+        Phase relationship between the harmonics.
+    harms : array of ints
+        Harmonic numbers.
+    highHarm : int
+        Highest harmonic number (used for Schroeder phase).
+
+    Returns
+    -------
+    phases : array of floats
+
+    """
+    harms = asarray(harms)
+    if harmPhase == "Sine":
+        phases = zeros(len(harms))
+    elif harmPhase == "Cosine":
+        phases = repeat(pi/2, len(harms))
+    elif harmPhase == "Alternating":
+        phases = where(harms%2 > 0, pi/2, 0)
+    elif harmPhase == "Schroeder":
+        phases = -pi * harms * (harms - 1) / float(highHarm)
+    elif harmPhase == "Random":
+        phases = numpy.random.random(len(harms)) * 2 * pi
+    else:
+        raise TypeError("Invalid 'harmPhase' argument. 'harmPhase' must be one of 'Sine', 'Cosine', 'Alternating', 'Random' or 'Schroeder'")
+
+    return phases
+
+def _synthHarmonics(baseAng, harms, mults, phases, channel, phaseWeights=None, dtype=None, angOffset=None):
+    """
+    Synthetise the partials of a complex tone and route them to the output channels.
+
+    Parameters
+    ----------
+    baseAng : array of floats
+        Common phase trajectory, see `_sumPartials`.
+    harms : array of ints
+        Harmonic numbers, used to route odd and even harmonics.
+    mults : array of floats
+        Multiplier of 'baseAng' for each partial.
+    phases : array of floats
+        Starting phase of each partial in radians.
+    channel : 'Right', 'Left', 'Both', 'Odd Right' or 'Odd Left'
+        Channel in which the partials will be generated.
+    phaseWeights : array of floats or None
+        See `_sumPartials`.
+    angOffset : array of floats or None
+        See `_sumPartials`.
+
+    Returns
+    -------
+    tone : 2-dimensional array of floats
+        The un-scaled and un-gated partials, with dimensions (nSamples, 2).
+
+    """
+    harms = asarray(harms); mults = asarray(mults, dtype=float); phases = asarray(phases, dtype=float)
+    if monoFirst == True and channel in ["Right", "Left", "Both"]:
+        return _makeSnd(_sumPartials(baseAng, mults, phases, phaseWeights, angOffset=angOffset), channel, dtype)
+    tone = zeros((len(baseAng), 2), dtype=_sndDtype(dtype))
+    if channel == "Right":
+        tone[:,1] = _sumPartials(baseAng, mults, phases, phaseWeights, angOffset=angOffset)
+    elif channel == "Left":
+        tone[:,0] = _sumPartials(baseAng, mults, phases, phaseWeights, angOffset=angOffset)
+    elif channel == "Both":
+        tone[:,0] = _sumPartials(baseAng, mults, phases, phaseWeights, angOffset=angOffset)
+        tone[:,1] = tone[:,0]
+    elif channel == "Odd Left" or channel == "Odd Right":
+        odd = harms%2 > 0
+        if channel == "Odd Left":
+            oddChan = 0; evenChan = 1
+        else:
+            oddChan = 1; evenChan = 0
+        tone[:,oddChan] = _sumPartials(baseAng, mults[odd], phases[odd], phaseWeights, angOffset=angOffset)
+        tone[:,evenChan] = _sumPartials(baseAng, mults[~odd], phases[~odd], phaseWeights, angOffset=angOffset)
+    else:
+        raise TypeError("Invalid channel argument. Channel must be one of 'Right', 'Left', 'Both', 'Odd Right' or 'Odd Left'")
+
+    return tone
 
 
 def addSounds(snd1, snd2, delay, fs):
@@ -55,50 +879,16 @@ def addSounds(snd1, snd2, delay, fs):
     >>> snd = addSounds(snd1=snd1, snd2=snd2, delay=100, fs=48000)
     """
   
-    #delay in ms
-    delay = delay / 1000 #convert from ms to sec
-
-    nSnd1 = len(snd1[:,1])
-    nSnd2 = len(snd2[:,1])
-    snd1Duration = nSnd1/fs
-    snd2Duration = nSnd2/fs
-
-    #------------------------
-    #            ...............................
-
-    # Seg1           Seg2              Seg3
-    
-    nSampSeg1 = round(delay * fs)
-    if nSampSeg1 < nSnd1:
-        nSampSeg2 = nSnd1 - nSampSeg1
-        nSampSeg3 = nSnd2 - nSampSeg2
-        seg1 = snd1[0:nSampSeg1,:]
-        seg2a = snd1[nSampSeg1:nSnd1,:]
-        if nSampSeg2 > nSnd2: # snd2 shorter than seg2, fill with zeros
-            ldiff = nSampSeg2 - nSnd2
-            diffSeg = zeros((ldiff, 2))
-            seg2b = concatenate((snd2, diffSeg), axis=0)
-        else:
-            seg2b = snd2[0:nSampSeg2,:]
-            seg3 = snd2[nSampSeg2:nSnd2,:]
-
-        seg2 = seg2a+seg2b
-        snd = concatenate((seg1, seg2), axis=0)
-
-        if nSampSeg2 < nSnd2:
-            snd = concatenate((snd, seg3), axis=0)
-            
-    else:
-        seg1 = snd1
-        seg2 = makeSilence((delay - snd1Duration)*1000, fs)
-        seg3 = snd2
-        snd = concatenate((seg1, seg2), axis=0)
-        snd = concatenate((snd, seg3), axis=0)
+    tl = soundTimeline(fs)
+    tl.addAtSample(snd1, 0)
+    tl.add(snd2, delay) #delay in ms
+    snd = tl.mix()
         
     return snd
 
 
-def AMTone(frequency, AMFreq, AMDepth, phase, AMPhase, level, duration, ramp, channel, fs, maxLevel):
+@_cachedSnd()
+def AMTone(frequency, AMFreq, AMDepth, phase, AMPhase, level, duration, ramp, channel, fs, maxLevel, dtype=None):
     """
     Generate an amplitude modulated tone.
 
@@ -128,6 +918,9 @@ def AMTone(frequency, AMFreq, AMDepth, phase, AMPhase, level, duration, ramp, ch
         Samplig frequency in Hz.
     maxLevel : float
         Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
 
     Returns
     -------
@@ -149,28 +942,167 @@ def AMTone(frequency, AMFreq, AMDepth, phase, AMPhase, level, duration, ramp, ch
     nTot = nSamples + (nRamp * 2)
 
     timeAll = arange(0, nTot) / fs
-    timeRamp = arange(0, nRamp) 
-
-    snd = zeros((nTot, 2))
 
-    if channel == "Right":
-        snd[0:nRamp, 1] = amp * (1 + AMDepth*sin(2*pi*AMFreq*timeAll[0:nRamp]+AMPhase)) * ((1-cos(pi * timeRamp/nRamp))/2) * sin(2*pi*frequency * timeAll[0:nRamp] + phase)
-        snd[nRamp:nRamp+nSamples, 1] = amp * (1 + AMDepth*sin(2*pi*AMFreq*timeAll[nRamp:nRamp+nSamples]+AMPhase)) * sin(2*pi*frequency * timeAll[nRamp:nRamp+nSamples] + phase)
-        snd[nRamp+nSamples:nTot, 1] = amp * (1 + AMDepth*sin(2*pi*AMFreq*timeAll[nRamp+nSamples:nTot]+AMPhase)) * ((1+cos(pi * timeRamp/nRamp))/2) * sin(2*pi*frequency * timeAll[nRamp+nSamples:nTot] + phase)
-    elif channel == "Left":
-        snd[0:nRamp, 0] = amp * (1 + AMDepth*sin(2*pi*AMFreq*timeAll[0:nRamp]+AMPhase)) * ((1-cos(pi * timeRamp/nRamp))/2) * sin(2*pi*frequency * timeAll[0:nRamp] + phase)
-        snd[nRamp:nRamp+nSamples, 0] = amp * (1 + AMDepth*sin(2*pi*AMFreq*timeAll[nRamp:nRamp+nSamples]+AMPhase)) * sin(2*pi*frequency * timeAll[nRamp:nRamp+nSamples] + phase)
-        snd[nRamp+nSamples:nTot, 0] = amp * (1 + AMDepth*sin(2*pi*AMFreq*timeAll[nRamp+nSamples:nTot]+AMPhase)) * ((1+cos(pi * timeRamp/nRamp))/2) * sin(2*pi*frequency * timeAll[nRamp+nSamples:nTot] + phase)
-    elif channel == "Both":
-        snd[0:nRamp, 0] = amp * (1 + AMDepth*sin(2*pi*AMFreq*timeAll[0:nRamp]+AMPhase)) * ((1-cos(pi * timeRamp/nRamp))/2) * sin(2*pi*frequency * timeAll[0:nRamp] + phase)
-        snd[nRamp:nRamp+nSamples, 0] = amp * (1 + AMDepth*sin(2*pi*AMFreq*timeAll[nRamp:nRamp+nSamples]+AMPhase)) * sin(2*pi*frequency * timeAll[nRamp:nRamp+nSamples] + phase)
-        snd[nRamp+nSamples:nTot, 0] = amp * (1 + AMDepth*sin(2*pi*AMFreq*timeAll[nRamp+nSamples:nTot]+AMPhase)) * ((1+cos(pi * timeRamp/nRamp))/2) * sin(2*pi*frequency * timeAll[nRamp+nSamples:nTot] + phase)
-        snd[:, 1] = snd[:, 0] 
+    tone = amp * (1 + AMDepth*sin(2*pi*AMFreq*timeAll+AMPhase)) * sin(2*pi*frequency * timeAll + phase)
+    _applyRamps(tone, nRamp)
+    snd = _makeSnd(tone, channel, dtype)
        
     return snd
 
 
-def binauralPureTone(frequency, phase, level, duration, ramp, channel, itd, itdRef, ild, ildRef, fs, maxLevel):
+def AMToneBatch(frequency, AMFreq, AMDepth, phase, AMPhase, level, duration, ramp, channel, fs, maxLevel, dtype=None):
+    """
+    Synthetise a batch of amplitude modulated tones differing in
+    any of their carrier or modulation parameters, see `AMTone`.
+
+    All the stimuli share the same duration, ramps and channel, so
+    that the time vector and the ramps are computed only once, and
+    the stimuli are synthetised together in blocks of at most
+    `synthBlockSize` elements.
+
+    Parameters
+    ----------
+    frequency : float or array of floats
+        Carrier frequencies in hertz.
+    AMFreq : float or array of floats
+        Amplitude modulation frequencies in Hz.
+    AMDepth : float or array of floats
+        Amplitude modulation depths (a value between 0 and 1).
+    phase : float or array of floats
+        Starting phases of the carriers in radians.
+    AMPhase : float or array of floats
+        Starting phases of the amplitude modulation in radians.
+    level : float or array of floats
+        Tone levels in dB SPL.
+    duration : float
+        Tone duration (excluding ramps) in milliseconds.
+    ramp : float
+        Duration of the onset and offset ramps in milliseconds.
+        The total duration of the sound will be duration+ramp*2.
+    channel : string ('Right', 'Left' or 'Both')
+        Channel in which the tones will be generated.
+    fs : int
+        Samplig frequency in Hz.
+    maxLevel : float
+        Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
+
+    Returns
+    -------
+    snd : 3-dimensional array of floats
+        The array has dimensions (nStim, nSamples, 2), where nStim is
+        the length of the broadcast per-stimulus parameters.
+
+    Examples
+    --------
+    >>> ams = AMToneBatch(frequency=1000, AMFreq=20,
+    ...     AMDepth=numpy.linspace(0, 1, 11), phase=0, AMPhase=1.5*pi,
+    ...     level=65, duration=180, ramp=10, channel='Both', fs=48000,
+    ...     maxLevel=100)
+    >>> ams.shape
+    (11, 9600, 2)
+
+    """
+    frequency, AMFreq, AMDepth, phase, AMPhase, level = _batchParams(frequency, AMFreq, AMDepth, phase, AMPhase, level)
+    nRamp, timeAll = _batchTimes(duration, ramp, fs)
+    nTot = len(timeAll)
+    amp = 10**((level - maxLevel) / 20)
+
+    tones = zeros((len(frequency), nTot))
+    stimStep = max(1, synthBlockSize // max(1, nTot))
+    for i in range(0, len(frequency), stimStep):
+        sl = slice(i, i+stimStep)
+        block = tones[sl]
+        env = sin(numpy.multiply.outer(2*pi*AMFreq[sl], timeAll) + AMPhase[sl, numpy.newaxis])
+        env *= AMDepth[sl, numpy.newaxis]
+        env += 1
+        env *= amp[sl, numpy.newaxis]
+        numpy.multiply.outer(2*pi*frequency[sl], timeAll, out=block)
+        block += phase[sl, numpy.newaxis]
+        sin(block, out=block)
+        block *= env
+    _applyRamps(tones.T, nRamp)
+    snd = _batchToStereo(tones, channel, dtype)
+
+    return snd
+
+
+def AMToneStream(frequency, AMFreq, AMDepth, phase, AMPhase, level, duration, ramp, channel, fs, maxLevel, blockSize=None, dtype=None):
+    """
+    Generate an amplitude modulated tone block by block.
+
+    Instead of returning the whole sound, the generator yields it in
+    consecutive stereo blocks as it is synthetised, so that memory
+    usage does not grow with the duration of the sound and playback
+    (see `audioManager.playStream`) can start as soon as the first
+    block is ready. The phase of the signal is continuous across
+    blocks, the samples are the same as those of `AMTone`.
+
+    Parameters
+    ----------
+    frequency : float
+        Carrier frequency in hertz.
+    AMFreq : float
+        Amplitude modulation frequency in Hz.
+    AMDepth : float
+        Amplitude modulation depth (a value of 1
+        corresponds to 100% modulation). 
+    phase : float
+        Starting phase in radians.
+    AMPhase : float
+        Starting AM phase in radians.
+    level : float
+        Tone level in dB SPL. 
+    duration : float
+        Sound duration (excluding ramps) in milliseconds.
+    ramp : float
+        Duration of the onset and offset ramps in milliseconds.
+        The total duration of the sound will be duration+ramp*2.
+    channel : string ('Right', 'Left' or 'Both')
+        Channel in which the sound will be generated.
+    fs : int
+        Samplig frequency in Hz.
+    maxLevel : float
+        Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+    blockSize : int or None
+        Number of samples of each block. If None, the module-level
+        `streamBlockSize` setting is used.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
+
+    Returns
+    -------
+    blocks : generator
+        Generator of 2-dimensional arrays of floats with dimensions
+        (blockSize, 2). The last block can be shorter.
+
+    Examples
+    --------
+    >>> blocks = AMToneStream(frequency=1000, AMFreq=20, AMDepth=1, phase=0,
+    ...     AMPhase=1.5*pi, level=65, duration=60000, ramp=10, channel='Both',
+    ...     fs=48000, maxLevel=100)
+    
+    """
+    amp = 10**((level - maxLevel) / 20)
+    duration = duration / 1000 #convert from ms to sec
+    ramp = ramp / 1000
+
+    nSamples = int(round(duration * fs))
+    nRamp = int(round(ramp * fs))
+    nTot = nSamples + (nRamp * 2)
+
+    def blockFunc(n):
+        timeAll = n / fs
+        return amp * (1 + AMDepth*sin(2*pi*AMFreq*timeAll+AMPhase)) * sin(2*pi*frequency * timeAll + phase)
+
+    return _streamBlocks(nTot, nRamp, channel, blockFunc, blockSize, dtype)
+
+
+@_cachedSnd()
+def binauralPureTone(frequency, phase, level, duration, ramp, channel, itd, itdRef, ild, ildRef, fs, maxLevel, dtype=None):
     """
     Generate a pure tone with an optional interaural time or level difference.
 
@@ -207,6 +1139,9 @@ def binauralPureTone(frequency, phase, level, duration, ramp, channel, itd, itdR
         Samplig frequency in Hz.
     maxLevel : float
         Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
 
     Returns
     -------
@@ -269,33 +1204,21 @@ def binauralPureTone(frequency, phase, level, duration, ramp, channel, itd, itdR
     nTot = nSamples + (nRamp * 2)
 
     timeAll = arange(0., nTot) / fs
-    timeRamp = arange(0., nRamp) 
-
-    snd = zeros((nTot, 2))
-
 
+    snd = zeros((nTot, 2), dtype=_sndDtype(dtype))
     if channel == "Right":
-        snd[0:nRamp, 1] = amp * ((1-cos(pi * timeRamp/nRamp))/2) * sin(2*pi*frequency * timeAll[0:nRamp] + phase)
-        snd[nRamp:nRamp+nSamples, 1] = amp* sin(2*pi*frequency * timeAll[nRamp:nRamp+nSamples] + phase)
-        snd[nRamp+nSamples:len(timeAll), 1] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * sin(2*pi*frequency * timeAll[nRamp+nSamples:len(timeAll)] + phase)
+        snd[:, 1] = amp * sin(2*pi*frequency * timeAll + phase)
     elif channel == "Left":
-        snd[0:nRamp, 0] = amp * ((1-cos(pi * timeRamp/nRamp))/2) * sin(2*pi*frequency * timeAll[0:nRamp] + phase)
-        snd[nRamp:nRamp+nSamples, 0] = amp* sin(2*pi*frequency * timeAll[nRamp:nRamp+nSamples] + phase)
-        snd[nRamp+nSamples:len(timeAll), 0] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * sin(2*pi*frequency * timeAll[nRamp+nSamples:len(timeAll)] + phase)
+        snd[:, 0] = amp * sin(2*pi*frequency * timeAll + phase)
     elif channel == "Both":
-        snd[0:nRamp, 0] = ampLeft * ((1-cos(pi * timeRamp/nRamp))/2) * sin(2*pi*frequency * timeAll[0:nRamp] + phaseLeft)
-        snd[nRamp:nRamp+nSamples, 0] = ampLeft* sin(2*pi*frequency * timeAll[nRamp:nRamp+nSamples] + phaseLeft)
-        snd[nRamp+nSamples:len(timeAll), 0] = ampLeft * ((1+cos(pi * timeRamp/nRamp))/2) * sin(2*pi*frequency * timeAll[nRamp+nSamples:len(timeAll)] + phaseLeft)
-
-        snd[0:nRamp, 1] = ampRight * ((1-cos(pi * timeRamp/nRamp))/2) * sin(2*pi*frequency * timeAll[0:nRamp] + phaseRight)
-        snd[nRamp:nRamp+nSamples, 1] = ampRight* sin(2*pi*frequency * timeAll[nRamp:nRamp+nSamples] + phaseRight)
-        snd[nRamp+nSamples:len(timeAll), 1] = ampRight * ((1+cos(pi * timeRamp/nRamp))/2) * sin(2*pi*frequency * timeAll[nRamp+nSamples:len(timeAll)] + phaseRight)
-
+        snd[:, 0] = ampLeft * sin(2*pi*frequency * timeAll + phaseLeft)
+        snd[:, 1] = ampRight * sin(2*pi*frequency * timeAll + phaseRight)
+    _applyRamps(snd, nRamp)
 
     return snd
 
 
-def broadbandNoise(spectrumLevel, duration, ramp, channel, fs, maxLevel):
+def broadbandNoise(spectrumLevel, duration, ramp, channel, fs, maxLevel, dtype=None):
     """
     Synthetise a broadband noise.
 
@@ -314,6 +1237,9 @@ def broadbandNoise(spectrumLevel, duration, ramp, channel, fs, maxLevel):
         Samplig frequency in Hz.
     maxLevel : float
         Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
 
     Returns
     -------
@@ -346,37 +1272,144 @@ def broadbandNoise(spectrumLevel, duration, ramp, channel, fs, maxLevel):
     nRamp = int(round(ramp * fs))
     nTot = nSamples + (nRamp * 2)
 
-    timeAll = arange(0, nTot) / fs
-    timeRamp = arange(0, nRamp) 
+    scaled_noise = _unitNoise(nTot, fs)
 
-    snd = zeros((nTot, 2))
-    #random is a numpy module
-    noise = (numpy.random.random(nTot) + numpy.random.random(nTot)) - (numpy.random.random(nTot) + numpy.random.random(nTot))
-    RMS = sqrt(mean(noise*noise))
-    #scale the noise so that the maxAmplitude goes from -1 to 1
-    #since A = RMS*sqrt(2)
-    scaled_noise = noise / (RMS * sqrt(2))
+    noise = amp * scaled_noise
+    _applyRamps(noise, nRamp)
+    snd = _makeSnd(noise, channel, dtype)
 
+    return snd
+
+
+def broadbandNoiseBatch(spectrumLevel, duration, ramp, channel, fs, maxLevel, dtype=None):
+    """
+    Synthetise a batch of independent broadband noises, see `broadbandNoise`.
+
+    All the stimuli share the same duration, ramps and channel, so
+    that the time vector and the ramps are computed only once, and
+    the stimuli are synthetised together in blocks of at most
+    `synthBlockSize` elements.
+
+    Parameters
+    ----------
+    spectrumLevel : float or array of floats
+        Intensity spectrum levels of the noises in dB SPL,
+        one noise is generated for each level.
+    duration : float
+        Noise duration (excluding ramps) in milliseconds.
+    ramp : float
+        Duration of the onset and offset ramps in milliseconds.
+        The total duration of the sound will be duration+ramp*2.
+    channel : string ('Right', 'Left' or 'Both')
+        Channel in which the noises will be generated.
+    fs : int
+        Samplig frequency in Hz.
+    maxLevel : float
+        Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
+
+    Returns
+    -------
+    snd : 3-dimensional array of floats
+        The array has dimensions (nStim, nSamples, 2), where nStim is
+        the length of the broadcast per-stimulus parameters.
+
+    Examples
+    --------
+    >>> noises = broadbandNoiseBatch(spectrumLevel=repeat(40, 20),
+    ...     duration=180, ramp=10, channel='Both', fs=48000, maxLevel=100)
+    >>> noises.shape
+    (20, 9600, 2)
+
+    """
+    spectrumLevel, = _batchParams(spectrumLevel)
+    nRamp, timeAll = _batchTimes(duration, ramp, fs)
+    nTot = len(timeAll)
+    amp = sqrt(fs/2)*(10**((spectrumLevel - maxLevel) / 20))
+
+    tones = zeros((len(spectrumLevel), nTot))
+    for i in range(len(spectrumLevel)):
+        tones[i] = _unitNoise(nTot, fs)
+        tones[i] *= amp[i]
+    _applyRamps(tones.T, nRamp)
+    snd = _batchToStereo(tones, channel, dtype)
 
-    if channel == "Right":
-        snd[0:nRamp, 1] = amp * ((1-cos(pi * timeRamp/nRamp))/2) * scaled_noise[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 1] = amp * scaled_noise[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:len(timeAll), 1] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * scaled_noise[nRamp+nSamples:len(timeAll)]
-    elif channel == "Left":
-        snd[0:nRamp, 0] = amp * ((1-cos(pi * timeRamp/nRamp))/2) * scaled_noise[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 0] = amp * scaled_noise[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:len(timeAll), 0] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * scaled_noise[nRamp+nSamples:len(timeAll)]
-    elif channel == "Both":
-        snd[0:nRamp, 1] = amp * ((1-cos(pi * timeRamp/nRamp))/2) * scaled_noise[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 1] = amp * scaled_noise[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:len(timeAll), 1] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * scaled_noise[nRamp+nSamples:len(timeAll)]
-        snd[0:nRamp, 0] = amp * ((1-cos(pi * timeRamp/nRamp))/2) * scaled_noise[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 0] = amp * scaled_noise[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:len(timeAll), 0] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * scaled_noise[nRamp+nSamples:len(timeAll)]
     return snd
 
 
-def chirp(freqStart, ftype, rate, level, duration, phase, ramp, channel, fs, maxLevel):
+def broadbandNoiseStream(spectrumLevel, duration, ramp, channel, fs, maxLevel, blockSize=None, dtype=None):
+    """
+    Synthetise a broadband noise block by block.
+
+    Instead of returning the whole sound, the generator yields it in
+    consecutive stereo blocks as it is synthetised, so that memory
+    usage does not grow with the duration of the sound and playback
+    (see `audioManager.playStream`) can start as soon as the first
+    block is ready. The noise is drawn from the same distribution as
+    that of `broadbandNoise`, with the random number generator state
+    carried across blocks. Since the RMS of the whole noise is not
+    known in advance, the noise is scaled by its expected RMS rather
+    than by its measured RMS, the difference being negligible for the
+    long durations for which streaming is useful.
+
+    Parameters
+    ----------
+    spectrumLevel : float
+        Intensity spectrum level of the noise in dB SPL.
+    duration : float
+        Sound duration (excluding ramps) in milliseconds.
+    ramp : float
+        Duration of the onset and offset ramps in milliseconds.
+        The total duration of the sound will be duration+ramp*2.
+    channel : string ('Right', 'Left' or 'Both')
+        Channel in which the sound will be generated.
+    fs : int
+        Samplig frequency in Hz.
+    maxLevel : float
+        Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+    blockSize : int or None
+        Number of samples of each block. If None, the module-level
+        `streamBlockSize` setting is used.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
+
+    Returns
+    -------
+    blocks : generator
+        Generator of 2-dimensional arrays of floats with dimensions
+        (blockSize, 2). The last block can be shorter.
+
+    Examples
+    --------
+    >>> blocks = broadbandNoiseStream(spectrumLevel=40, duration=60000,
+    ...     ramp=10, channel='Both', fs=96000, maxLevel=100)
+    
+    """
+    amp = sqrt(fs/2)*(10**((spectrumLevel - maxLevel) / 20))
+    duration = duration / 1000 #convert from ms to sec
+    ramp = ramp / 1000
+
+    nSamples = int(round(duration * fs))
+    nRamp = int(round(ramp * fs))
+    nTot = nSamples + (nRamp * 2)
+
+    #the running noise is the sum of four uniform variables, with
+    #an RMS of sqrt(4/12); scale it so that the maxAmplitude goes
+    #from -1 to 1 since A = RMS*sqrt(2)
+    noiseScale = amp / (sqrt(4/12) * sqrt(2))
+    def blockFunc(n):
+        noise = _runningNoise(len(n))
+        noise *= noiseScale
+        return noise
+
+    return _streamBlocks(nTot, nRamp, channel, blockFunc, blockSize, dtype)
+
+
+@_cachedSnd()
+def chirp(freqStart, ftype, rate, level, duration, phase, ramp, channel, fs, maxLevel, dtype=None):
     """
     Synthetize a chirp, that is a tone with frequency changing linearly or
     exponentially over time with a give rate.
@@ -405,6 +1438,9 @@ def chirp(freqStart, ftype, rate, level, duration, phase, ramp, channel, fs, max
         Samplig frequency in Hz.
     maxLevel : float
         Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
 
     Returns
     -------
@@ -426,35 +1462,40 @@ def chirp(freqStart, ftype, rate, level, duration, phase, ramp, channel, fs, max
     nSamples = int(round(duration * fs))
     nRamp = int(round(ramp * fs))
     nTot = nSamples + (nRamp * 2)
-    timeAll = arange(0, nTot) / fs
-    timeRamp = arange(0, nRamp)
     if ftype == "exponential":
         k = 2**(rate/1200)
-        frequency = freqStart*( ( ( (k**timeAll) - 1) /log(k) + phase) )
+        def phaseFunc(n):
+            timeAll = n / fs
+            return 2*pi*(freqStart*( ( ( (k**timeAll) - 1) /log(k) + phase) ))
     elif ftype == "linear":
-        frequency = freqStart*timeAll + (rate/2)*timeAll**2 + phase
+        def phaseFunc(n):
+            timeAll = n / fs
+            return 2*pi*(freqStart*timeAll + (rate/2)*timeAll**2 + phase)
         
+    tone = _oscillator(nTot, phaseFunc, amp)
+    _applyRamps(tone, nRamp)
+    snd = _makeSnd(tone, channel, dtype)
 
-    snd = zeros((nTot, 2))
+    return snd
 
-    if channel == "Right":
-        snd[0:nRamp, 1] = amp * ((1-cos(pi * timeRamp/nRamp))/2) * sin(2*pi*frequency[0:nRamp] )
-        snd[nRamp:nRamp+nSamples, 1] = amp* sin(2*pi*frequency[nRamp:nRamp+nSamples])
-        snd[nRamp+nSamples:len(timeAll), 1] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * sin(2*pi*frequency[nRamp+nSamples:len(timeAll)])
-    elif channel == "Left":
-        snd[0:nRamp, 0] = amp * ((1-cos(pi * timeRamp/nRamp))/2) * sin(2*pi*frequency[0:nRamp] )
-        snd[nRamp:nRamp+nSamples, 0] = amp* sin(2*pi*frequency[nRamp:nRamp+nSamples])
-        snd[nRamp+nSamples:len(timeAll), 0] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * sin(2*pi*frequency[nRamp+nSamples:len(timeAll)])
-    elif channel == "Both":
-        snd[0:nRamp, 0] = amp * ((1-cos(pi * timeRamp/nRamp))/2) * sin(2*pi*frequency[0:nRamp] )
-        snd[nRamp:nRamp+nSamples, 0] = amp* sin(2*pi*frequency[nRamp:nRamp+nSamples])
-        snd[nRamp+nSamples:len(timeAll), 0] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * sin(2*pi*frequency[nRamp+nSamples:len(timeAll)])
-        snd[:, 1] = snd[:, 0] 
 
-    return snd
+def clearSndCache():
+    """
+    Empty the cache of the deterministic generators and reset its counters.
+
+    Examples
+    --------
+    >>> clearSndCache()
+
+    """
+    with _sndCacheLock:
+        _sndCache.clear()
+        for k in _sndCacheStats:
+            _sndCacheStats[k] = 0
 
 
-def complexTone(F0, harmPhase, lowHarm, highHarm, stretch, level, duration, ramp, channel, fs, maxLevel):
+@_cachedSnd(randomArgs={"harmPhase": "Random"})
+def complexTone(F0, harmPhase, lowHarm, highHarm, stretch, level, duration, ramp, channel, fs, maxLevel, dtype=None):
     """
     Synthetise a complex tone.
 
@@ -488,6 +1529,9 @@ def complexTone(F0, harmPhase, lowHarm, highHarm, stretch, level, duration, ramp
         Samplig frequency in Hz.
     maxLevel : float
         Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
 
     Returns
     -------
@@ -502,118 +1546,131 @@ def complexTone(F0, harmPhase, lowHarm, highHarm, stretch, level, duration, ramp
     
     """
     amp = 10**((level - maxLevel) / 20)
-    duration = duration / 1000. #convert from ms to sec
-    ramp = ramp / 1000
+    sDuration = duration / 1000. #convert from ms to sec
+    sRamp = ramp / 1000
     stretchHz = (F0*stretch)/100
     
-    nSamples = int(round(duration * fs))
-    nRamp = int(round(ramp * fs))
+    nSamples = int(round(sDuration * fs))
+    nRamp = int(round(sRamp * fs))
     nTot = nSamples + (nRamp * 2)
     
     timeAll = arange(0, nTot) / fs
-    timeRamp = arange(0, nRamp) 
 
-    snd = zeros((nTot, 2))
-    if channel == "Right" or channel == "Left" or channel == "Both":
-        tone = zeros(nTot)
-    elif channel == "Odd Left" or channel == "Odd Right":
-        toneOdd = zeros(nTot)
-        toneEven = zeros(nTot)
+    harms = arange(lowHarm, highHarm+1)
+    radFreqs = 2 * pi * ((F0 * harms) + stretchHz)
+    phases = _harmPhases(harmPhase, harms, highHarm)
+    tone = _synthHarmonics(timeAll, harms, radFreqs, phases, channel, dtype=dtype)
+    snd = gate(ramp, amp * tone, fs)
 
-    if harmPhase == "Sine":
-        for i in range(lowHarm, highHarm+1):
-            if channel == "Right" or channel == "Left" or channel == "Both":
-                tone =  tone + sin(2 * pi * ((F0 * i) + stretchHz) * timeAll)
-            elif channel == "Odd Left" or channel == "Odd Right":
-                if i%2 > 0: #odd harmonic
-                    toneOdd = toneOdd + sin(2 * pi * ((F0 * i)+stretchHz) * timeAll)
-                else:
-                    toneEven = toneEven + sin(2 * pi * ((F0 * i)+stretchHz) * timeAll)
-    elif harmPhase == "Cosine":
-        for i in range(lowHarm, highHarm+1):
-            if channel == "Right" or channel == "Left" or channel == "Both":
-                tone = tone + cos(2 * pi * ((F0 * i)+stretchHz) * timeAll)
-            elif channel == "Odd Left" or channel == "Odd Right":
-                if i%2 > 0: #odd harmonic
-                    toneOdd = toneOdd + cos(2 * pi * ((F0 * i)+stretchHz) * timeAll)
-                else:
-                    toneEven = toneEven + cos(2 * pi * ((F0 * i)+stretchHz) * timeAll)
-    elif harmPhase == "Alternating":
-        for i in range(lowHarm, highHarm+1):
-            if i%2 > 0: #odd harmonic
-                if channel == "Right" or channel == "Left" or channel == "Both":
-                    tone = tone + cos(2 * pi * ((F0 * i)+stretchHz) * timeAll)
-                elif channel == "Odd Left" or channel == "Odd Right":
-                    toneOdd = toneOdd + cos(2 * pi * ((F0 * i)+stretchHz) * timeAll)
-            else: #even harmonic
-                if channel == "Right" or channel == "Left" or channel == "Both":
-                    tone = tone + sin(2 * pi * ((F0 * i)+stretchHz) * timeAll)
-                elif channel == "Odd Left" or channel == "Odd Right":
-                    toneEven = toneEven + sin(2 * pi * ((F0 * i)+stretchHz) * timeAll)
-    elif harmPhase == "Schroeder":
-        for i in range(lowHarm, highHarm+1):
-            phase = -pi * i * (i - 1) / float(highHarm)
-            if channel == "Right" or channel == "Left" or channel == "Both":
-                tone = tone + sin(2 * pi * ((F0 * i)+stretchHz) * timeAll + phase)
-            elif channel == "Odd Left" or channel == "Odd Right":
-                if i%2 > 0: #odd harmonic
-                    toneOdd = toneOdd + sin(2 * pi * ((F0 * i)+stretchHz) * timeAll + phase)
-                else:
-                    toneEven = toneEven + sin(2 * pi * ((F0 * i)+stretchHz) * timeAll + phase)
-    elif harmPhase == "Random":
-        for i in range(lowHarm, highHarm+1):
-            phase = numpy.random.random() * 2 * pi
-            if channel == "Right" or channel == "Left" or channel == "Both":
-                tone = tone + sin(2 * pi * ((F0 * i)+stretchHz) * timeAll + phase)
-            elif channel == "Odd Left" or channel == "Odd Right":
-                if i%2 > 0: #odd harmonic
-                    toneOdd = toneOdd + sin(2 * pi * ((F0 * i)+stretchHz) * timeAll + phase)
-                else:
-                    toneEven = toneEven + sin(2 * pi * ((F0 * i)+stretchHz) * timeAll + phase)
+    return snd
+
+
+def complexToneBatch(F0, harmPhase, lowHarm, highHarm, stretch, level, duration, ramp, channel, fs, maxLevel, dtype=None):
+    """
+    Synthetise a batch of complex tones differing in F0, stretch
+    and/or level, see `complexTone`.
+
+    All the stimuli share the same duration, ramps and channel, so
+    that the time vector and the ramps are computed only once, and
+    the partials of the whole batch are summed together, in blocks of
+    at most `synthBlockSize` elements, directly into the output array.
+
+    Parameters
+    ----------
+    F0 : float or array of floats
+        Tone fundamental frequencies in hertz.
+    harmPhase : one of 'Sine', 'Cosine', 'Alternating', 'Random', 'Schroeder'
+        Phase relationship between the partials of the complex tones.
+        If 'Random', each tone gets its own random phases.
+    lowHarm : int
+        Lowest harmonic component number.
+    highHarm : int
+        Highest harmonic component number.
+    stretch : float or array of floats
+        Harmonic stretch in %F0, see `complexTone`.
+    level : float or array of floats
+        The level of each partial in dB SPL.
+    duration : float
+        Tone duration (excluding ramps) in milliseconds.
+    ramp : float
+        Duration of the onset and offset ramps in milliseconds.
+        The total duration of the sound will be duration+ramp*2.
+    channel : string ('Right', 'Left', 'Both', 'Odd Right' or 'Odd Left')
+        Channel in which the tones will be generated, see `complexTone`.
+    fs : int
+        Samplig frequency in Hz.
+    maxLevel : float
+        Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
+
+    Returns
+    -------
+    snd : 3-dimensional array of floats
+        The array has dimensions (nStim, nSamples, 2), where nStim is
+        the length of the broadcast per-stimulus parameters.
+
+    Examples
+    --------
+    >>> cts = complexToneBatch(F0=numpy.linspace(200, 220, 50),
+    ...     harmPhase='Sine', lowHarm=1, highHarm=10, stretch=0,
+    ...     level=55, duration=180, ramp=10, channel='Both',
+    ...     fs=48000, maxLevel=100)
+    >>> cts.shape
+    (50, 9600, 2)
 
+    """
+    F0, stretch, level = _batchParams(F0, stretch, level)
+    nRamp, timeAll = _batchTimes(duration, ramp, fs)
+    amp = 10**((level - maxLevel) / 20)
+    stretchHz = (F0*stretch)/100
 
+    harms = arange(lowHarm, highHarm+1)
+    #(nStim, nHarms) matrices of the frequencies and phases of all the
+    #partials of the batch, with random phases drawn for each stimulus
+    radFreqs = 2 * pi * ((F0[:, numpy.newaxis] * harms) + stretchHz[:, numpy.newaxis])
+    phases = _harmPhases(harmPhase, numpy.tile(harms, len(F0)), highHarm).reshape(len(F0), len(harms))
     if channel == "Right":
-        snd[0:nRamp, 1]                     = amp * ((1-cos(pi * timeRamp/nRamp))/2) * tone[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 1]        = amp * tone[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:len(timeAll), 1] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * tone[nRamp+nSamples:len(timeAll)]
-    elif channel == "Left":
-        snd[0:nRamp, 0]                     = amp * ((1-cos(pi * timeRamp/nRamp))/2) *  tone[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 0]        = amp * tone[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:len(timeAll), 0] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * tone[nRamp+nSamples:len(timeAll)]
-    elif channel == "Both":
-        snd[0:nRamp, 0]                     = amp * ((1-cos(pi * timeRamp/nRamp))/2) *  tone[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 0]        = amp * tone[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:len(timeAll), 0] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * tone[nRamp+nSamples:len(timeAll)]
-        snd[:, 1] = snd[:, 0]
-    elif channel == "Odd Left":
-        snd[0:nRamp, 0]                     = amp * ((1-cos(pi * timeRamp/nRamp))/2) *  toneOdd[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 0]        = amp * toneOdd[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:len(timeAll), 0] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * toneOdd[nRamp+nSamples:len(timeAll)]
-        snd[0:nRamp, 1]                     = amp * ((1-cos(pi * timeRamp/nRamp))/2) * toneEven[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 1]        = amp * toneEven[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:len(timeAll), 1] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * toneEven[nRamp+nSamples:len(timeAll)]
-    elif channel == "Odd Right":
-        snd[0:nRamp, 1]                     = amp * ((1-cos(pi * timeRamp/nRamp))/2) *  toneOdd[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 1]        = amp * toneOdd[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:len(timeAll), 1] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * toneOdd[nRamp+nSamples:len(timeAll)]
-        snd[0:nRamp, 0]                     = amp * ((1-cos(pi * timeRamp/nRamp))/2) * toneEven[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 0]        = amp * toneEven[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:len(timeAll), 0] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * toneEven[nRamp+nSamples:len(timeAll)]
-        
+        chans = [(1, slice(None))]
+    elif channel == "Left" or channel == "Both":
+        chans = [(0, slice(None))]
+    elif channel == "Odd Left" or channel == "Odd Right":
+        #the odd and the even harmonics are summed in separate channels
+        odd = harms%2 > 0
+        if channel == "Odd Left":
+            chans = [(0, odd), (1, ~odd)]
+        else:
+            chans = [(1, odd), (0, ~odd)]
+    else:
+        raise TypeError("Invalid channel argument. Channel must be one of 'Right', 'Left', 'Both', 'Odd Right' or 'Odd Left'")
+    snd = zeros((len(F0), len(timeAll), 2), dtype=_sndDtype(dtype))
+    for chan, sel in chans:
+        #the partials are summed directly in the output channel
+        tones = snd[:,:,chan]
+        _sumPartials(timeAll, radFreqs[:,sel], phases[:,sel], out=tones)
+        tones *= amp[:, numpy.newaxis]
+        _applyRamps(tones.T, nRamp)
+    if channel == "Both":
+        snd[:,:,1] = snd[:,:,0]
 
     return snd
 
 
-def complexToneParallel(F0, harmPhase, lowHarm, highHarm, stretch, level, duration, ramp, channel, fs, maxLevel):
+@_cachedSnd(randomArgs={"harmPhase": "Random"})
+def complexToneParallel(F0, harmPhase, lowHarm, highHarm, stretch, level, duration, ramp, channel, fs, maxLevel, dtype=None):
     """
     Synthetise a complex tone.
 
     This function produces the same results of complexTone. The only difference
     is that it uses the multiprocessing Python module to exploit multicore
-    processors and compute the partials in a parallel fashion. Notice that
-    there is a substantial overhead in setting up the parallel computations.
-    This means that for relatively short sounds (in the order of seconds),
-    this function will actually be *slower* than complexTone.
+    processors. The sound is split in time segments that are computed in
+    parallel by a pool of worker processes. The pool is created the first
+    time the function is called and reused for the rest of the session;
+    the workers write their output directly into a shared memory buffer.
+    For short sounds the overhead of dispatching the work may still make
+    this function slower than complexTone. If shared memory is not available
+    (Python < 3.8) the tone is computed by complexTone.
 
     Parameters
     ----------
@@ -645,6 +1702,9 @@ def complexToneParallel(F0, harmPhase, lowHarm, highHarm, stretch, level, durati
         Samplig frequency in Hz.
     maxLevel : float
         Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
 
     Returns
     -------
@@ -658,55 +1718,54 @@ def complexToneParallel(F0, harmPhase, lowHarm, highHarm, stretch, level, durati
     ...     fs=48000, maxLevel=100)
     
     """
+    if shared_memory is None:
+        return complexTone(F0, harmPhase, lowHarm, highHarm, stretch, level, duration, ramp, channel, fs, maxLevel, dtype)
+
     amp = 10**((level - maxLevel) / 20)
-    durationSec = duration / 1000 #convert from ms to sec
-    rampSec = ramp / 1000
+    sDuration = duration / 1000 #convert from ms to sec
+    sRamp = ramp / 1000
     stretchHz = (F0*stretch)/100
     
-    nSamples = int(round(durationSec * fs))
-    nRamp = int(round(rampSec * fs))
+    nSamples = int(round(sDuration * fs))
+    nRamp = int(round(sRamp * fs))
     nTot = nSamples + (nRamp * 2)
-    snd = zeros((nTot, 2))
-    tn = []
-    pool = multiprocessing.Pool()
-    
-    for i in range(lowHarm, highHarm+1):
-        #Select channel
-        if channel == "Right" or channel == "Left" or channel == "Both":
-            thisChan = channel
-        elif channel == "Odd Left" or channel == "Odd Right":
-            if i%2 > 0: #odd harmonic
-                if channel == "Odd Left":
-                    thisChan = "Left"
-                elif channel == "Odd Right":
-                    thisChan = "Right"
-            else: #even harmonic
-                if channel == "Odd Left":
-                    thisChan = "Right"
-                elif channel == "Odd Right":
-                    thisChan = "Left"
-        #Select phase
-        if harmPhase == "Sine":
-            thisPhase = 0
-        elif harmPhase == "Cosine":
-            thisPhase = pi/2
-        elif harmPhase == "Alternating":
-            if i%2 > 0: #odd harmonic
-                thisPhase = 0
-            else:
-                thisPhase = pi/2
-        elif harmPhase == "Schroeder":
-            thisPhase = -pi * i * (i - 1) / highHarm
-        elif harmPhase == "Random":
-            thisPhase =  numpy.random.random() * 2 * pi
-                
-        pool.apply_async(pureTone, (F0*i+stretchHz, thisPhase, level, duration, ramp, thisChan, fs, maxLevel), callback=tn.append)
-
-    pool.close()
-    pool.join()
-    
-    for i in range(len(tn)):
-        snd = snd + tn[i]
+
+    harms = arange(lowHarm, highHarm+1)
+    radFreqs = 2 * pi * ((F0 * harms) + stretchHz)
+    phases = _harmPhases(harmPhase, harms, highHarm)
+    noPartials = array([])
+    if channel == "Right":
+        chanRadFreqs = [noPartials, radFreqs]; chanPhases = [noPartials, phases]
+    elif channel == "Left" or channel == "Both":
+        chanRadFreqs = [radFreqs, noPartials]; chanPhases = [phases, noPartials]
+    elif channel == "Odd Left" or channel == "Odd Right":
+        odd = harms%2 > 0
+        if channel == "Odd Left":
+            chanRadFreqs = [radFreqs[odd], radFreqs[~odd]]; chanPhases = [phases[odd], phases[~odd]]
+        else:
+            chanRadFreqs = [radFreqs[~odd], radFreqs[odd]]; chanPhases = [phases[~odd], phases[odd]]
+    else:
+        raise TypeError("Invalid channel argument. Channel must be one of 'Right', 'Left', 'Both', 'Odd Right' or 'Odd Left'")
+
+    pool = _getWorkerPool()
+    nSegs = max(1, min(multiprocessing.cpu_count(), nTot))
+    segEdges = linspace(0, nTot, nSegs+1).astype(int)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, nTot*2*numpy.dtype(float).itemsize))
+    try:
+        buf = numpy.ndarray((nTot, 2), dtype=float, buffer=shm.buf)
+        buf[:] = 0
+        jobs = [pool.apply_async(_partialsWorker, (shm.name, nTot, segEdges[i], segEdges[i+1], fs, chanRadFreqs, chanPhases)) for i in range(nSegs)]
+        for job in jobs:
+            job.get()
+        snd = numpy.multiply(buf, amp, out=zeros((nTot, 2), dtype=_sndDtype(dtype)))
+        del buf
+    finally:
+        shm.close()
+        shm.unlink()
+
+    if channel == "Both":
+        snd[:,1] = snd[:,0]
+    snd = gate(ramp, snd, fs)
         
     return snd
 
@@ -750,24 +1809,26 @@ def delayAdd(sig, delay, gain, iterations, configuration, fs):
     #delay in seconds
     delayPnt = round(delay * fs)
     nSamples = len(sig[:,0])
-    en_input_right = sqrt(sum(sig[:,1]**2))
-    en_input_left = sqrt(sum(sig[:,0]**2))
-    snd = zeros((nSamples, 2))
-    delayed_sig = zeros((nSamples, 2))
+    en_input_right = sqrt(numpy.sum(sig[:,1]**2))
+    en_input_left = sqrt(numpy.sum(sig[:,0]**2))
+    #each delay-add cycle circularly shifts the signal by 'delayPnt' samples,
+    #so the whole cycle can be applied as a single comb filter on the FFT
+    #of the signal, at a cost that does not depend on the number of iterations
+    gw = gain * exp(2j*pi*arange(nSamples//2+1)*delayPnt/nSamples)
     if configuration == "Add Same":
-        for i in range(iterations):
-            delayed_sig = concatenate((sig[delayPnt:nSamples], sig[0:delayPnt]), axis=0)
-            delayed_sig = delayed_sig * gain
-            sig = sig + delayed_sig
+        #y = (1 + g*w)^n x
+        transfer = (1 + gw)**iterations
     elif configuration == "Add Original":
-        original_sig = copy.copy(sig)
-        for i in range(iterations):
-            delayed_sig = concatenate((sig[delayPnt:nSamples], sig[0:delayPnt]), axis=0)
-            delayed_sig = delayed_sig * gain
-            sig = original_sig + delayed_sig
-    snd = sig
-    en_output_right = sqrt(sum(snd[:,1]**2))
-    en_output_left = sqrt(sum(snd[:,0]**2))
+        #y = (1 + g*w + ... + (g*w)^n) x
+        den = 1 - gw
+        singular = abs(den) < 1e-12
+        den[singular] = 1
+        transfer = where(singular, iterations+1, (1 - gw**(iterations+1)) / den)
+    x = rfft(sig, axis=0)
+    x *= transfer[:, numpy.newaxis]
+    snd = irfft(x, nSamples, axis=0).astype(_floatDtype(sig), copy=False)
+    en_output_right = sqrt(numpy.sum(snd[:,1]**2))
+    en_output_left = sqrt(numpy.sum(snd[:,0]**2))
     scale_right = en_input_right / en_output_right
     scale_left  = en_input_left / en_output_left
 
@@ -779,7 +1840,7 @@ def delayAdd(sig, delay, gain, iterations, configuration, fs):
 def dichoticNoiseFromSin(F0, lowHarm, highHarm, compLevel, narrowBandCompLevel,
                          lowFreq, highFreq, compSpacing, sigBandwidth, distanceUnit,
                          phaseRelationship, dichoticDifference,
-                         dichoticDifferenceValue, duration, ramp, fs, maxLevel):
+                         dichoticDifferenceValue, duration, ramp, fs, maxLevel, dtype=None):
     """
     Generate Huggins pitch or narrow-band noise from random-phase sinusoids.
 
@@ -843,6 +1904,9 @@ def dichoticNoiseFromSin(F0, lowHarm, highHarm, compLevel, narrowBandCompLevel,
         Samplig frequency in Hz.
     maxLevel : float
         Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
 
     Returns
     -------
@@ -871,7 +1935,7 @@ def dichoticNoiseFromSin(F0, lowHarm, highHarm, compLevel, narrowBandCompLevel,
     nTot = nSamples + (nRamp * 2)
     timeAll = arange(0, nTot) / fs
     timeRamp = arange(0, nRamp) 
-    snd = zeros((nTot, 2))
+    snd = zeros((nTot, 2), dtype=_sndDtype(dtype))
 
     if distanceUnit == 'Hz':
         noiseBandwidth = highFreq - lowFreq
@@ -929,35 +1993,34 @@ def dichoticNoiseFromSin(F0, lowHarm, highHarm, compLevel, narrowBandCompLevel,
 
     amps = numpy.repeat(amp, nComponents)
     amps[freqsToShift] = amp2
-    sinArrayRight = zeros((nComponents, nTot))
-    for i in range(0, nComponents):
-        sinArrayRight[i,] = amps[i] * sin(2*pi*freqs[i] * timeAll + phasesR[i])          
-    sinArrayLeft = copy.copy(sinArrayRight)
+    #amplitudes and phases of the components in each ear; the components
+    #are summed in blocks by _sumPartials, so that memory usage does not
+    #grow with the number of components
+    ampsRight = amps; phasesRight = phasesR
+    ampsLeft = copy.copy(amps); phasesLeft = copy.copy(phasesR)
     
     if dichoticDifference == "IPD Stepped":
-        for i in range(0,len(freqsToShift)):
-            sinArrayLeft[freqsToShift[i],] =  amp2* sin(2*pi*freqs[freqsToShift[i]] * timeAll + (phasesR[freqsToShift[i]]+dichoticDifferenceValue))
+        ampsLeft[freqsToShift] = amp2
+        phasesLeft[freqsToShift] = phasesR[freqsToShift] + dichoticDifferenceValue
     if dichoticDifference == "IPD Random":
         phasesL = copy.copy(phasesR)
         phasesL[freqsToShift] = phasesL[freqsToShift] + numpy.random.uniform(0, dichoticDifferenceValue, len(phasesL[freqsToShift]))
-        for i in range(0,len(freqsToShift)):
-            sinArrayLeft[freqsToShift[i],] =  amp2* sin(2*pi*freqs[freqsToShift[i]] * timeAll + phasesL[i])
+        ampsLeft[freqsToShift] = amp2
+        phasesLeft[freqsToShift] = phasesL[arange(len(freqsToShift))]
     elif dichoticDifference == "ITD":
-        for i in range(0,len(freqsToShift)):
-            thisIpd = itdtoipd(dichoticDifferenceValue/1000000, freqs[freqsToShift[i]])
-            sinArrayLeft[freqsToShift[i],] =  amp2* sin(2*pi*freqs[freqsToShift[i]] * timeAll + (phasesR[freqsToShift[i]]+thisIpd))
+        ampsLeft[freqsToShift] = amp2
+        phasesLeft[freqsToShift] = phasesR[freqsToShift] + itdtoipd(dichoticDifferenceValue/1000000, freqs[freqsToShift])
     elif dichoticDifference == "ILD Right" or dichoticDifference == "ILD Left":
         amp3 = 10**((narrowBandCompLevel+dichoticDifferenceValue - maxLevel) / 20) #change amp to the amp of narrow-bands
         if dichoticDifference == "ILD Left":
-            for i in range(0,len(freqsToShift)):
-                sinArrayLeft[freqsToShift[i],]  = amp3* sin(2*pi*freqs[freqsToShift[i]] * timeAll + phasesR[freqsToShift[i]])
+            ampsLeft[freqsToShift] = amp3
         elif dichoticDifference == "ILD Right":
-            for i in range(0,len(freqsToShift)):
-                sinArrayRight[freqsToShift[i],]  = amp3* sin(2*pi*freqs[freqsToShift[i]] * timeAll + phasesR[freqsToShift[i]])
+            ampsRight = copy.copy(amps)
+            ampsRight[freqsToShift] = amp3
 
-    snd[:,0] = sum(sinArrayRight,0)
-    snd[:,1] = sum(sinArrayLeft,0)
-    snd = gate(ramp, snd, fs)
+    _sumPartials(timeAll, 2*pi*freqs, phasesRight, out=snd[:,0], amps=ampsRight)
+    _sumPartials(timeAll, 2*pi*freqs, phasesLeft, out=snd[:,1], amps=ampsLeft)
+    _applyRamps(snd, nRamp)
 
     return snd
     
@@ -992,7 +2055,7 @@ def ERBDistance(f1, f2):
     return deltaERB
 
 
-def expAMNoise(fc, fm, deltaCents, fmPhase, AMDepth, spectrumLevel, duration, ramp, channel, fs, maxLevel):
+def expAMNoise(fc, fm, deltaCents, fmPhase, AMDepth, spectrumLevel, duration, ramp, channel, fs, maxLevel, dtype=None):
     """
     Generate a sinusoidally amplitude-modulated noise with an exponentially
     modulated AM frequency.
@@ -1024,6 +2087,9 @@ def expAMNoise(fc, fm, deltaCents, fmPhase, AMDepth, spectrumLevel, duration, ra
     maxLevel : float
         Level in dB SPL output by the soundcard for a sinusoid of
         amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
 
     Returns
     -------
@@ -1045,47 +2111,23 @@ def expAMNoise(fc, fm, deltaCents, fmPhase, AMDepth, spectrumLevel, duration, ra
     nTot = nSamples + (nRamp * 2)
 
     timeAll = arange(0, nTot) / fs
-    timeRamp = arange(0, nRamp) 
-
-    snd = zeros((nTot, 2))
-    #random is a numpy module
-    noise = (numpy.random.random(nTot) + numpy.random.random(nTot)) - (numpy.random.random(nTot) + numpy.random.random(nTot))
-    RMS = sqrt(mean(noise*noise))
-    #scale the noise so that the maxAmplitude goes from -1 to 1
-    #since A = RMS*sqrt(2)
-    scaled_noise = noise / (RMS * sqrt(2))
 
-    #(1 + AMDepth*sin(2*pi*AMFreq*timeAll[0:nRamp]))
+    scaled_noise = _unitNoise(nTot, fs)
 
     fArr = 2*pi*fc*2**((deltaCents/1200)*cos(2*pi*fm*timeAll+fmPhase))
     ang = (cumsum(fArr)/fs) #+ startPhase
-    #amp* sin(ang[nRamp:nRamp+nSamples])
-    #* (1 + AMDepth*sin(ang[0:nRamp]))
-    #* (1 + AMDepth*sin(ang[nRamp:nRamp+nSamples]))
-    #* (1 + AMDepth*sin(ang[nRamp+nSamples:len(timeAll)]))
-    if channel == "Right":
-        snd[0:nRamp, 1] = amp * (1 + AMDepth*sin(ang[0:nRamp])) * ((1-cos(pi * timeRamp/nRamp))/2) * scaled_noise[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 1] = amp * (1 + AMDepth*sin(ang[nRamp:nRamp+nSamples])) * scaled_noise[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:len(timeAll), 1] = amp * (1 + AMDepth*sin(ang[nRamp+nSamples:len(timeAll)])) * ((1+cos(pi * timeRamp/nRamp))/2) * scaled_noise[nRamp+nSamples:len(timeAll)]
-    elif channel == "Left":
-        snd[0:nRamp, 0] = amp * (1 + AMDepth*sin(ang[0:nRamp])) * ((1-cos(pi * timeRamp/nRamp))/2) * scaled_noise[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 0] = amp * (1 + AMDepth*sin(ang[nRamp:nRamp+nSamples])) * scaled_noise[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:len(timeAll), 0] = amp * (1 + AMDepth*sin(ang[nRamp+nSamples:len(timeAll)])) * ((1+cos(pi * timeRamp/nRamp))/2) * scaled_noise[nRamp+nSamples:len(timeAll)]
-    elif channel == "Both":
-        snd[0:nRamp, 1] = amp * (1 + AMDepth*sin(ang[0:nRamp])) * ((1-cos(pi * timeRamp/nRamp))/2) * scaled_noise[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 1] = amp * (1 + AMDepth*sin(ang[nRamp:nRamp+nSamples])) * scaled_noise[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:len(timeAll), 1] = amp * (1 + AMDepth*sin(ang[nRamp+nSamples:len(timeAll)])) * ((1+cos(pi * timeRamp/nRamp))/2) * scaled_noise[nRamp+nSamples:len(timeAll)]
+    noise = amp * (1 + AMDepth*sin(ang)) * scaled_noise
+    _applyRamps(noise, nRamp)
+    snd = _makeSnd(noise, channel, dtype)
 
-        snd[0:nRamp, 0] = amp * (1 + AMDepth*sin(ang[0:nRamp])) * ((1-cos(pi * timeRamp/nRamp))/2) * scaled_noise[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 0] = amp * (1 + AMDepth*sin(ang[nRamp:nRamp+nSamples])) * scaled_noise[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:len(timeAll), 0] = amp * (1 + AMDepth*sin(ang[nRamp+nSamples:len(timeAll)])) * ((1+cos(pi * timeRamp/nRamp))/2) * scaled_noise[nRamp+nSamples:len(timeAll)]
     return snd
 
 
     return snd
 
 
-def expSinFMComplex(F0, lowHarm, highHarm, harmPhase, fm, deltaCents, fmPhase, level, duration, ramp, channel, fs, maxLevel):
+@_cachedSnd(randomArgs={"harmPhase": "Random"})
+def expSinFMComplex(F0, lowHarm, highHarm, harmPhase, fm, deltaCents, fmPhase, level, duration, ramp, channel, fs, maxLevel, dtype=None):
     """
     Generate a frequency-modulated complex tone with an exponential sinusoid.
 
@@ -1114,6 +2156,9 @@ def expSinFMComplex(F0, lowHarm, highHarm, harmPhase, fm, deltaCents, fmPhase, l
     maxLevel : float
         Level in dB SPL output by the soundcard for a sinusoid of
         amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
 
     Returns
     -------
@@ -1126,25 +2171,33 @@ def expSinFMComplex(F0, lowHarm, highHarm, harmPhase, fm, deltaCents, fmPhase, l
     
     """
 
-    for i in range(int(lowHarm), int(highHarm)+1):
-        if harmPhase == "Sine":
-            startPhase = 0
-        elif harmPhase == "Cosine":
-            startPhase = pi/2
-        elif harmPhase == "Alternating":
-            if i%2 > 0: #odd harmonic
-                startPhase = 0
-            else:
-                startPhase = pi/2
-        if i == lowHarm:
-            snd = expSinFMTone(F0*i, fm, deltaCents, fmPhase, startPhase, level, duration, ramp, channel, fs, maxLevel)
-        else:
-            snd = snd + expSinFMTone(F0*i, fm, deltaCents, fmPhase, startPhase, level, duration, ramp, channel, fs, maxLevel)
-        
+    amp = 10**((level - maxLevel) / 20)
+    sDuration = duration / 1000 #convert from ms to sec
+    sRamp = ramp / 1000
+
+    nSamples = int(round(sDuration * fs))
+    nRamp = int(round(sRamp * fs))
+    nTot = nSamples + (nRamp * 2)
+
+    #the instantaneous frequency of each harmonic is a multiple of that
+    #of the fundamental, so the phase trajectory is computed only once
+    def f0RadFreq(n):
+        return 2*pi*F0*2**((deltaCents/1200)*cos(2*pi*fm*(n/fs)+fmPhase)) / fs
+    f0Ang = _oscPhase(nTot, f0RadFreq, integrate=True)
+
+    harms = arange(int(lowHarm), int(highHarm)+1)
+    if harmPhase == "Alternating": #odd harmonics in sine phase
+        phases = where(harms%2 > 0, 0, pi/2)
+    else:
+        phases = _harmPhases(harmPhase, harms, highHarm)
+    tone = _synthHarmonics(f0Ang, harms, harms, phases, channel, dtype=dtype)
+    snd = gate(ramp, amp * tone, fs)
+
     return snd
 
 
-def expSinFMTone(fc, fm, deltaCents, fmPhase, startPhase, level, duration, ramp, channel, fs, maxLevel):
+@_cachedSnd()
+def expSinFMTone(fc, fm, deltaCents, fmPhase, startPhase, level, duration, ramp, channel, fs, maxLevel, dtype=None):
     """
     Generate a frequency-modulated tone with an exponential sinusoid.
 
@@ -1173,6 +2226,9 @@ def expSinFMTone(fc, fm, deltaCents, fmPhase, startPhase, level, duration, ramp,
     maxLevel : float
         Level in dB SPL output by the soundcard for a sinusoid of
         amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
 
     Returns
     -------
@@ -1193,59 +2249,59 @@ def expSinFMTone(fc, fm, deltaCents, fmPhase, startPhase, level, duration, ramp,
     nRamp = int(round(ramp * fs))
     nTot = nSamples + (nRamp * 2)
 
-    timeAll = arange(0, nTot) / fs
-    timeRamp = arange(0, nRamp)
-    fArr = 2*pi*fc*2**((deltaCents/1200)*cos(2*pi*fm*timeAll+fmPhase))
-    ang = (cumsum(fArr)/fs) + startPhase
-
-    snd = zeros((nTot, 2))
+    def radFreq(n):
+        return 2*pi*fc*2**((deltaCents/1200)*cos(2*pi*fm*(n/fs)+fmPhase)) / fs
 
-    if channel == "Right":
-        snd[0:nRamp, 1] = amp * ((1-cos(pi * timeRamp/nRamp))/2) * sin(ang[0:nRamp])
-        snd[nRamp:nRamp+nSamples, 1] = amp* sin(ang[nRamp:nRamp+nSamples])
-        snd[nRamp+nSamples:len(timeAll), 1] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * sin(ang[nRamp+nSamples:len(timeAll)])
-    elif channel == "Left":
-        snd[0:nRamp, 0] = amp * ((1-cos(pi * timeRamp/nRamp))/2) * sin(ang[0:nRamp])
-        snd[nRamp:nRamp+nSamples, 0] = amp* sin(ang[nRamp:nRamp+nSamples])
-        snd[nRamp+nSamples:len(timeAll), 0] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * sin(ang[nRamp+nSamples:len(timeAll)])
-    elif channel == "Both":
-        snd[0:nRamp, 0] = amp * ((1-cos(pi * timeRamp/nRamp))/2) * sin(ang[0:nRamp])
-        snd[nRamp:nRamp+nSamples, 0] = amp* sin(ang[nRamp:nRamp+nSamples])
-        snd[nRamp+nSamples:len(timeAll), 0] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * sin(ang[nRamp+nSamples:len(timeAll)])
-        snd[:, 1] = snd[:, 0]
+    tone = _oscillator(nTot, radFreq, amp, integrate=True, startPhase=startPhase)
+    _applyRamps(tone, nRamp)
+    snd = _makeSnd(tone, channel, dtype)
        
 
     return snd
 
 
-def camSinFMComplex(F0, lowHarm, highHarm, harmPhase, fm, deltaCams, fmPhase, level, duration, ramp, channel, fs, maxLevel):
+@_cachedSnd(randomArgs={"harmPhase": "Random"})
+def camSinFMComplex(F0, lowHarm, highHarm, harmPhase, fm, deltaCams, fmPhase, level, duration, ramp, channel, fs, maxLevel, dtype=None):
     """
-    Generate a tone frequency modulated with an exponential sinusoid.
+    Generate a complex tone whose harmonics are frequency modulated
+    with an exponential sinusoid on the cam (ERBn number) scale.
 
     Parameters
     ----------
-    fc : float
-        Carrier frequency in hertz. 
+    F0 : float
+        Fundamental frequency in hertz.
+    lowHarm : int
+        Lowest harmonic component number.
+    highHarm : int
+        Highest harmonic component number.
+    harmPhase : one of 'Sine', 'Cosine', 'Alternating', 'Random', 'Schroeder'
+        Phase relationship between the partials of the complex tone.
     fm : float
         Modulation frequency in Hz.
     deltaCams : float
-        Frequency excursion in cam units (ERBn number scale). 
+        Frequency excursion of each harmonic in cam units (ERBn number scale).
     fmPhase : float
         Starting fmPhase in radians.
     level : float
-        Tone level in dB SPL. 
+        Level of each harmonic in dB SPL.
     duration : float
         Tone duration (excluding ramps) in milliseconds.
     ramp : float
         Duration of the onset and offset ramps in milliseconds.
         The total duration of the sound will be duration+ramp*2.
-    channel : 'Right', 'Left' or 'Both'
-        Channel in which the tone will be generated.
+    channel : 'Right', 'Left', 'Both', 'Odd Right' or 'Odd Left'
+        Channel in which the tone will be generated. If 'Odd Right',
+        odd numbered harmonics will be presented to the right channel
+        and even number harmonics to the left channel. The opposite
+        is true if 'Odd Left'.
     fs : int
         Samplig frequency in Hz.
     maxLevel : float
         Level in dB SPL output by the soundcard for a sinusoid of
         amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
 
     Returns
     -------
@@ -1253,29 +2309,46 @@ def camSinFMComplex(F0, lowHarm, highHarm, harmPhase, fm, deltaCams, fmPhase, le
        
     Examples
     --------
-    >>> snd = expSinFMTone(fc=1000, fm=40, deltaCents=1200, fmPhase=0, level=55, 
-    ...     duration=180, ramp=10, channel='Both', fs=48000, maxLevel=100)
+    >>> snd = camSinFMComplex(F0=150, lowHarm=1, highHarm=10, harmPhase='Sine',
+    ...     fm=5, deltaCams=0.5, fmPhase=0, level=50, duration=180, ramp=10,
+    ...     channel='Both', fs=48000, maxLevel=100)
     
     """
-    for i in range(int(lowHarm), int(highHarm)+1):
-        if harmPhase == "Sine":
-            startPhase = 0
-        elif harmPhase == "Cosine":
-            startPhase = pi/2
-        elif harmPhase == "Alternating":
-            if i%2 > 0: #odd harmonic
-                startPhase = 0
-            else:
-                startPhase = pi/2
-        if i == lowHarm:
-            snd = camSinFMTone(F0*i, fm, deltaCams, fmPhase, startPhase, level, duration, ramp, channel, fs, maxLevel)
-        else:
-            snd = snd + camSinFMTone(F0*i, fm, deltaCams, fmPhase, startPhase, level, duration, ramp, channel, fs, maxLevel)
-        
+
+    amp = 10**((level - maxLevel) / 20)
+    sDuration = duration / 1000 #convert from ms to sec
+    sRamp = ramp / 1000
+
+    nSamples = int(round(sDuration * fs))
+    nRamp = int(round(sRamp * fs))
+    nTot = nSamples + (nRamp * 2)
+
+    #shifting a frequency f by d cams multiplies 0.00437*f+1 by
+    #r = 10**(d/21.4), so the instantaneous frequency of harmonic i is
+    #i*F0*r + (r-1)/0.00437: the phase of every harmonic is i times a
+    #common F0 trajectory plus a common offset trajectory
+    def camRatio(n):
+        return 10**((deltaCams*cos(2*pi*fm*(n/fs)+fmPhase))/21.4)
+    def f0RadFreq(n):
+        return 2*pi*F0*camRatio(n) / fs
+    def offsetRadFreq(n):
+        return 2*pi*((camRatio(n)-1)/0.00437) / fs
+    f0Ang = _oscPhase(nTot, f0RadFreq, integrate=True)
+    offsetAng = _oscPhase(nTot, offsetRadFreq, integrate=True)
+
+    harms = arange(int(lowHarm), int(highHarm)+1)
+    if harmPhase == "Alternating": #odd harmonics in sine phase
+        phases = where(harms%2 > 0, 0, pi/2)
+    else:
+        phases = _harmPhases(harmPhase, harms, highHarm)
+    tone = _synthHarmonics(f0Ang, harms, harms, phases, channel, dtype=dtype, angOffset=offsetAng)
+    snd = gate(ramp, amp * tone, fs)
+
     return snd
 
 
-def camSinFMTone(fc, fm, deltaCams, fmPhase, startPhase, level, duration, ramp, channel, fs, maxLevel):
+@_cachedSnd()
+def camSinFMTone(fc, fm, deltaCams, fmPhase, startPhase, level, duration, ramp, channel, fs, maxLevel, dtype=None):
     """
     Generate a tone frequency modulated with an exponential sinusoid.
 
@@ -1303,6 +2376,9 @@ def camSinFMTone(fc, fm, deltaCams, fmPhase, startPhase, level, duration, ramp,
     maxLevel : float
         Level in dB SPL output by the soundcard for a sinusoid of
         amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
 
     Returns
     -------
@@ -1323,33 +2399,19 @@ def camSinFMTone(fc, fm, deltaCams, fmPhase, startPhase, level, duration, ramp,
     nRamp = int(round(ramp * fs))
     nTot = nSamples + (nRamp * 2)
 
-    timeAll = arange(0, nTot) / fs
-    timeRamp = arange(0, nRamp)
-    #fArr = 2*pi*fc*2**((deltaCents/1200)*cos(2*pi*fm*timeAll+fmPhase))
-    fArr = 2*pi*freqFromERBInterval(fc, deltaCams*cos(2*pi*fm*timeAll+fmPhase)) 
-    ang = (cumsum(fArr)/fs) + startPhase
-
-    snd = zeros((nTot, 2))
+    def radFreq(n):
+        return 2*pi*freqFromERBInterval(fc, deltaCams*cos(2*pi*fm*(n/fs)+fmPhase)) / fs
 
-    if channel == "Right":
-        snd[0:nRamp, 1] = amp * ((1-cos(pi * timeRamp/nRamp))/2) * sin(ang[0:nRamp])
-        snd[nRamp:nRamp+nSamples, 1] = amp* sin(ang[nRamp:nRamp+nSamples])
-        snd[nRamp+nSamples:len(timeAll), 1] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * sin(ang[nRamp+nSamples:len(timeAll)])
-    elif channel == "Left":
-        snd[0:nRamp, 0] = amp * ((1-cos(pi * timeRamp/nRamp))/2) * sin(ang[0:nRamp])
-        snd[nRamp:nRamp+nSamples, 0] = amp* sin(ang[nRamp:nRamp+nSamples])
-        snd[nRamp+nSamples:len(timeAll), 0] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * sin(ang[nRamp+nSamples:len(timeAll)])
-    elif channel == "Both":
-        snd[0:nRamp, 0] = amp * ((1-cos(pi * timeRamp/nRamp))/2) * sin(ang[0:nRamp])
-        snd[nRamp:nRamp+nSamples, 0] = amp* sin(ang[nRamp:nRamp+nSamples])
-        snd[nRamp+nSamples:len(timeAll), 0] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * sin(ang[nRamp+nSamples:len(timeAll)])
-        snd[:, 1] = snd[:, 0]
+    tone = _oscillator(nTot, radFreq, amp, integrate=True, startPhase=startPhase)
+    _applyRamps(tone, nRamp)
+    snd = _makeSnd(tone, channel, dtype)
        
 
     return snd
 
 
-def fm_complex1(midF0, harmPhase, lowHarm, highHarm, level, duration, ramp, fmFreq, fmDepth, fmStartPhase, fmStartTime, fmDuration, levelAdj, channel, fs, maxLevel):
+@_cachedSnd(randomArgs={"harmPhase": "Random"})
+def fm_complex1(midF0, harmPhase, lowHarm, highHarm, level, duration, ramp, fmFreq, fmDepth, fmStartPhase, fmStartTime, fmDuration, levelAdj, channel, fs, maxLevel, dtype=None):
     """
     Synthetise a Complex Tone with an embedded FM starting and stopping
     at a chosen time after the tone onset.
@@ -1394,6 +2456,9 @@ def fm_complex1(midF0, harmPhase, lowHarm, highHarm, level, duration, ramp, fmFr
         Samplig frequency in Hz.
     maxLevel : float
         Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
     
     """
     
@@ -1401,20 +2466,13 @@ def fm_complex1(midF0, harmPhase, lowHarm, highHarm, level, duration, ramp, fmFr
     duration = duration / 1000 #convert from ms to sec
     fmStartTime = fmStartTime / 1000  #convert from ms to sec
     fmDuration = fmDuration / 1000  #convert from ms to sec
-    ramp = ramp / 1000
+    sRamp = ramp / 1000
     fmStartPnt = int(round(fmStartTime*fs)) #sample where FM starts
     nFMSamples = int(round(fmDuration*fs)) #number of FM samples
     nSamples = int(round(duration * fs))
-    nRamp = int(round(ramp * fs))
+    nRamp = int(round(sRamp * fs))
     nTot = nSamples + (nRamp * 2)
-    
-    timeAll = arange(0, nTot) / fs
-    timeRamp = arange(0, nRamp)
 
-    timeAllSamp = arange(0, nTot) #time array not scaled by fs
-    time1 = timeAllSamp[0:fmStartPnt]
-    time2 = timeAllSamp[fmStartPnt:fmStartPnt+nFMSamples]
-    time3 = timeAllSamp[fmStartPnt+nFMSamples:nTot]
     fmTime = arange(0, nFMSamples)
 
     fmDepthHz = fmDepth*midF0/100 #convert from % to Hz
@@ -1427,13 +2485,6 @@ def fm_complex1(midF0, harmPhase, lowHarm, highHarm, level, duration, ramp, fmFr
     startF0Rad = 2*pi*(midF0 + fmDepthHz*sin(fmStartPhase))/fs
     endF0Rad = 2*pi*(midF0 + fmDepthHz*sin(fmStartPhase + nFMSamples*fmRadFreq)) / fs
     
-    if channel == "Right" or channel == "Left" or channel == "Both":
-        tone = zeros(nTot)
-    elif channel == "Odd Left" or channel == "Odd Right":
-        toneOdd = zeros(nTot)
-        toneEven = zeros(nTot)
-    snd = zeros((nTot, 2))
-
     #from Hartmann, WM (1997) Signals, sound, and sensation. New York: AIP Press
     #angular frequency is the time derivative of the instantaneous phase
     #if the angular frequency is given by a constant carrier `wc`, plus a
@@ -1449,173 +2500,37 @@ def fm_complex1(midF0, harmPhase, lowHarm, highHarm, level, duration, ramp, fmFr
     #eq.4: PHI(t) = wc*t - (dw/wm)*cos(wm*t+phi)
     #this is what we're actually using below
     
-    if harmPhase == "Sine":
-        for i in range(lowHarm, highHarm+1):
-            if channel == "Right" or channel == "Left" or channel == "Both":
-                tone[0:fmStartPnt] =  tone[0:fmStartPnt] + sin(startF0Rad*i*time1)
-                phaseCorrect1 =  (i*startF0Rad*fmStartPnt) - (i*midF0Rad*fmStartPnt) + (i*B*cos(fmStartPhase)) 
-                tone[fmStartPnt:fmStartPnt+nFMSamples] = tone[fmStartPnt:fmStartPnt+nFMSamples] + sin(midF0Rad*i*time2+phaseCorrect1-(i*B*cos(fmRadFreq*fmTime+fmStartPhase)))
-                phaseCorrect2 = (i*midF0Rad*(fmStartPnt+nFMSamples)) + (phaseCorrect1 - i*B*cos(fmRadFreq*nFMSamples + fmStartPhase)) - (i*endF0Rad*(fmStartPnt+nFMSamples))
-                tone[fmStartPnt+nFMSamples:nTot] =  tone[fmStartPnt+nFMSamples:nTot] + sin(i*endF0Rad*time3 + phaseCorrect2)
-            elif channel == "Odd Left" or channel == "Odd Right":
-                if i%2 > 0: #odd harmonic
-                    toneOdd[0:fmStartPnt] = toneOdd[0:fmStartPnt] + sin(startF0Rad*i*time1)
-                    phaseCorrect1 =  (i*startF0Rad*fmStartPnt) - (i*midF0Rad*fmStartPnt) + (i*B*cos(fmStartPhase)) 
-                    toneOdd[fmStartPnt:fmStartPnt+nFMSamples] = toneOdd[fmStartPnt:fmStartPnt+nFMSamples] + sin(midF0Rad*i*time2+phaseCorrect1-(i*B*cos(fmRadFreq*fmTime+fmStartPhase)))
-                    phaseCorrect2 = (i*midF0Rad*(fmStartPnt+nFMSamples)) + (phaseCorrect1 - i*B*cos(fmRadFreq*nFMSamples + fmStartPhase)) - (i*endF0Rad*(fmStartPnt+nFMSamples))
-                    toneOdd[fmStartPnt+nFMSamples:nTot] =  toneOdd[fmStartPnt+nFMSamples:nTot] + sin(i*endF0Rad*time3 + phaseCorrect2)
-                else:
-                    toneEven[0:fmStartPnt] = toneEven[0:fmStartPnt] + sin(startF0Rad*i*time1)
-                    phaseCorrect1 =  (i*startF0Rad*fmStartPnt) - (i*midF0Rad*fmStartPnt) + (i*B*cos(fmStartPhase)) 
-                    toneEven[fmStartPnt:fmStartPnt+nFMSamples] = toneEven[fmStartPnt:fmStartPnt+nFMSamples] + sin(midF0Rad*i*time2+phaseCorrect1-(i*B*cos(fmRadFreq*fmTime+fmStartPhase)))
-                    phaseCorrect2 = (i*midF0Rad*(fmStartPnt+nFMSamples)) + (phaseCorrect1 - i*B*cos(fmRadFreq*nFMSamples + fmStartPhase)) - (i*endF0Rad*(fmStartPnt+nFMSamples))
-                    toneEven[fmStartPnt+nFMSamples:nTot] =  toneEven[fmStartPnt+nFMSamples:nTot] + sin(i*endF0Rad*time3 + phaseCorrect2)
-    elif harmPhase == "Cosine":
-        for i in range(lowHarm, highHarm+1):
-            if channel == "Right" or channel == "Left" or channel == "Both":
-                tone[0:fmStartPnt] =  tone[0:fmStartPnt] + cos(startF0Rad*i*time1)
-                phaseCorrect1 =  (i*startF0Rad*fmStartPnt) - (i*midF0Rad*fmStartPnt) + (i*B*cos(fmStartPhase)) 
-                tone[fmStartPnt:fmStartPnt+nFMSamples] = tone[fmStartPnt:fmStartPnt+nFMSamples] + cos(midF0Rad*i*time2+phaseCorrect1-(i*B*cos(fmRadFreq*fmTime+fmStartPhase)))
-                phaseCorrect2 = (i*midF0Rad*(fmStartPnt+nFMSamples)) + (phaseCorrect1 - i*B*cos(fmRadFreq*nFMSamples + fmStartPhase)) - (i*endF0Rad*(fmStartPnt+nFMSamples))
-                tone[fmStartPnt+nFMSamples:nTot] =  tone[fmStartPnt+nFMSamples:nTot] + cos(i*endF0Rad*time3 + phaseCorrect2)
-            elif channel == "Odd Left" or channel == "Odd Right":
-                if i%2 > 0: #odd harmonic
-                    toneOdd[0:fmStartPnt] = toneOdd[0:fmStartPnt] + cos(startF0Rad*i*time1)
-                    phaseCorrect1 =  (i*startF0Rad*fmStartPnt) - (i*midF0Rad*fmStartPnt) + (i*B*cos(fmStartPhase)) 
-                    toneOdd[fmStartPnt:fmStartPnt+nFMSamples] = toneOdd[fmStartPnt:fmStartPnt+nFMSamples] + cos(midF0Rad*i*time2+phaseCorrect1-(i*B*cos(fmRadFreq*fmTime+fmStartPhase)))
-                    phaseCorrect2 = (i*midF0Rad*(fmStartPnt+nFMSamples)) + (phaseCorrect1 - i*B*cos(fmRadFreq*nFMSamples + fmStartPhase)) - (i*endF0Rad*(fmStartPnt+nFMSamples))
-                    toneOdd[fmStartPnt+nFMSamples:nTot] =  toneOdd[fmStartPnt+nFMSamples:nTot] + cos(i*endF0Rad*time3 + phaseCorrect2)
-                else:
-                    toneEven[0:fmStartPnt] = toneEven[0:fmStartPnt] + cos(startF0Rad*i*time1)
-                    phaseCorrect1 =  (i*startF0Rad*fmStartPnt) - (i*midF0Rad*fmStartPnt) + (i*B*cos(fmStartPhase)) 
-                    toneEven[fmStartPnt:fmStartPnt+nFMSamples] = toneEven[fmStartPnt:fmStartPnt+nFMSamples] + cos(midF0Rad*i*time2+phaseCorrect1-(i*B*cos(fmRadFreq*fmTime+fmStartPhase)))
-                    phaseCorrect2 = (i*midF0Rad*(fmStartPnt+nFMSamples)) + (phaseCorrect1 - i*B*cos(fmRadFreq*nFMSamples + fmStartPhase)) - (i*endF0Rad*(fmStartPnt+nFMSamples))
-                    toneEven[fmStartPnt+nFMSamples:nTot] =  toneEven[fmStartPnt+nFMSamples:nTot] + cos(i*endF0Rad*time3 + phaseCorrect2)
-
-    elif harmPhase == "Alternating":
-        for i in range(lowHarm, highHarm+1):
-            if i%2 > 0: #odd harmonic
-                if channel == "Right" or channel == "Left" or channel == "Both":
-                    tone[0:fmStartPnt] =  tone[0:fmStartPnt] + cos(startF0Rad*i*time1)
-                    phaseCorrect1 =  (i*startF0Rad*fmStartPnt) - (i*midF0Rad*fmStartPnt) + (i*B*cos(fmStartPhase)) 
-                    tone[fmStartPnt:fmStartPnt+nFMSamples] = tone[fmStartPnt:fmStartPnt+nFMSamples] + cos(midF0Rad*i*time2+phaseCorrect1-(i*B*cos(fmRadFreq*fmTime+fmStartPhase)))
-                    phaseCorrect2 = (i*midF0Rad*(fmStartPnt+nFMSamples)) + (phaseCorrect1 - i*B*cos(fmRadFreq*nFMSamples + fmStartPhase)) - (i*endF0Rad*(fmStartPnt+nFMSamples))
-                    tone[fmStartPnt+nFMSamples:nTot] =  tone[fmStartPnt+nFMSamples:nTot] + cos(i*endF0Rad*time3 + phaseCorrect2)
-                elif channel == "Odd Left" or channel == "Odd Right":
-                    toneOdd[0:fmStartPnt] = toneOdd[0:fmStartPnt] + cos(startF0Rad*i*time1)
-                    phaseCorrect1 =  (i*startF0Rad*fmStartPnt) - (i*midF0Rad*fmStartPnt) + (i*B*cos(fmStartPhase)) 
-                    toneOdd[fmStartPnt:fmStartPnt+nFMSamples] = toneOdd[fmStartPnt:fmStartPnt+nFMSamples] + cos(midF0Rad*i*time2+phaseCorrect1-(i*B*cos(fmRadFreq*fmTime+fmStartPhase)))
-                    phaseCorrect2 = (i*midF0Rad*(fmStartPnt+nFMSamples)) + (phaseCorrect1 - i*B*cos(fmRadFreq*nFMSamples + fmStartPhase)) - (i*endF0Rad*(fmStartPnt+nFMSamples))
-                    toneOdd[fmStartPnt+nFMSamples:nTot] =  toneOdd[fmStartPnt+nFMSamples:nTot] + cos(i*endF0Rad*time3 + phaseCorrect2)
-            else: #even harmonic
-                if channel == "Right" or channel == "Left" or channel == "Both":
-                    tone[0:fmStartPnt] =  tone[0:fmStartPnt] + sin(startF0Rad*i*time1)
-                    phaseCorrect1 =  (i*startF0Rad*fmStartPnt) - (i*midF0Rad*fmStartPnt) + (i*B*cos(fmStartPhase)) 
-                    tone[fmStartPnt:fmStartPnt+nFMSamples] = tone[fmStartPnt:fmStartPnt+nFMSamples] + sin(midF0Rad*i*time2+phaseCorrect1-(i*B*cos(fmRadFreq*fmTime+fmStartPhase)))
-                    phaseCorrect2 = (i*midF0Rad*(fmStartPnt+nFMSamples)) + (phaseCorrect1 - i*B*cos(fmRadFreq*nFMSamples + fmStartPhase)) - (i*endF0Rad*(fmStartPnt+nFMSamples))
-                    tone[fmStartPnt+nFMSamples:nTot] =  tone[fmStartPnt+nFMSamples:nTot] + sin(i*endF0Rad*time3 + phaseCorrect2)
-                elif channel == "Odd Left" or channel == "Odd Right":
-                    toneEven[0:fmStartPnt] = toneEven[0:fmStartPnt] + sin(startF0Rad*i*time1)
-                    phaseCorrect1 =  (i*startF0Rad*fmStartPnt) - (i*midF0Rad*fmStartPnt) + (i*B*cos(fmStartPhase)) 
-                    toneEven[fmStartPnt:fmStartPnt+nFMSamples] = toneEven[fmStartPnt:fmStartPnt+nFMSamples] + sin(midF0Rad*i*time2+phaseCorrect1-(i*B*cos(fmRadFreq*fmTime+fmStartPhase)))
-                    phaseCorrect2 = (i*midF0Rad*(fmStartPnt+nFMSamples)) + (phaseCorrect1 - i*B*cos(fmRadFreq*nFMSamples + fmStartPhase)) - (i*endF0Rad*(fmStartPnt+nFMSamples))
-                    toneEven[fmStartPnt+nFMSamples:nTot] =  toneEven[fmStartPnt+nFMSamples:nTot] + sin(i*endF0Rad*time3 + phaseCorrect2)
-    elif harmPhase == "Schroeder":
-        for i in range(lowHarm, highHarm+1):
-            phase = -pi * i * (i - 1) / float(highHarm)
-            if channel == "Right" or channel == "Left" or channel == "Both":
-                tone[0:fmStartPnt] =  tone[0:fmStartPnt] + sin(startF0Rad*i*time1 + phase)
-                phaseCorrect1 =  (i*startF0Rad*fmStartPnt) - (i*midF0Rad*fmStartPnt) + (i*B*cos(fmStartPhase)) 
-                tone[fmStartPnt:fmStartPnt+nFMSamples] = tone[fmStartPnt:fmStartPnt+nFMSamples] + sin(midF0Rad*i*time2+phaseCorrect1-(i*B*cos(fmRadFreq*fmTime+fmStartPhase)) + phase)
-                phaseCorrect2 = (i*midF0Rad*(fmStartPnt+nFMSamples)) + (phaseCorrect1 - i*B*cos(fmRadFreq*nFMSamples + fmStartPhase)) - (i*endF0Rad*(fmStartPnt+nFMSamples))
-                tone[fmStartPnt+nFMSamples:nTot] =  tone[fmStartPnt+nFMSamples:nTot] + sin(i*endF0Rad*time3 + phaseCorrect2 + phase)
-            elif channel == "Odd Left" or channel == "Odd Right":
-                if i%2 > 0: #odd harmonic
-                    toneOdd[0:fmStartPnt] =  toneOdd[0:fmStartPnt] + sin(startF0Rad*i*time1 + phase)
-                    phaseCorrect1 =  (i*startF0Rad*fmStartPnt) - (i*midF0Rad*fmStartPnt) + (i*B*cos(fmStartPhase)) 
-                    toneOdd[fmStartPnt:fmStartPnt+nFMSamples] = toneOdd[fmStartPnt:fmStartPnt+nFMSamples] + sin(midF0Rad*i*time2+phaseCorrect1-(i*B*cos(fmRadFreq*fmTime+fmStartPhase)) + phase)
-                    phaseCorrect2 = (i*midF0Rad*(fmStartPnt+nFMSamples)) + (phaseCorrect1 - i*B*cos(fmRadFreq*nFMSamples + fmStartPhase)) - (i*endF0Rad*(fmStartPnt+nFMSamples))
-                    toneOdd[fmStartPnt+nFMSamples:nTot] =  toneOdd[fmStartPnt+nFMSamples:nTot] + sin(i*endF0Rad*time3 + phaseCorrect2 + phase)
-                else:
-                    toneEven[0:fmStartPnt] =  toneEven[0:fmStartPnt] + sin(startF0Rad*i*time1 + phase)
-                    phaseCorrect1 =  (i*startF0Rad*fmStartPnt) - (i*midF0Rad*fmStartPnt) + (i*B*cos(fmStartPhase)) 
-                    toneEven[fmStartPnt:fmStartPnt+nFMSamples] = toneEven[fmStartPnt:fmStartPnt+nFMSamples] + sin(midF0Rad*i*time2+phaseCorrect1-(i*B*cos(fmRadFreq*fmTime+fmStartPhase)) + phase)
-                    phaseCorrect2 = (i*midF0Rad*(fmStartPnt+nFMSamples)) + (phaseCorrect1 - i*B*cos(fmRadFreq*nFMSamples + fmStartPhase)) - (i*endF0Rad*(fmStartPnt+nFMSamples))
-                    toneEven[fmStartPnt+nFMSamples:nTot] =  toneEven[fmStartPnt+nFMSamples:nTot] + sin(i*endF0Rad*time3 + phaseCorrect2 + phase)
-    elif harmPhase == "Random":
-        for i in range(lowHarm, highHarm+1):
-            phase = numpy.random.random() * 2 * pi
-            if channel == "Right" or channel == "Left" or channel == "Both":
-                tone[0:fmStartPnt] =  tone[0:fmStartPnt] + sin(startF0Rad*i*time1 + phase)
-                phaseCorrect1 =  (i*startF0Rad*fmStartPnt) - (i*midF0Rad*fmStartPnt) + (i*B*cos(fmStartPhase)) 
-                tone[fmStartPnt:fmStartPnt+nFMSamples] = tone[fmStartPnt:fmStartPnt+nFMSamples] + sin(midF0Rad*i*time2+phaseCorrect1-(i*B*cos(fmRadFreq*fmTime+fmStartPhase)) + phase)
-                phaseCorrect2 = (i*midF0Rad*(fmStartPnt+nFMSamples)) + (phaseCorrect1 - i*B*cos(fmRadFreq*nFMSamples + fmStartPhase)) - (i*endF0Rad*(fmStartPnt+nFMSamples))
-                tone[fmStartPnt+nFMSamples:nTot] =  tone[fmStartPnt+nFMSamples:nTot] + sin(i*endF0Rad*time3 + phaseCorrect2 + phase)
-            elif channel == "Odd Left" or channel == "Odd Right":
-                if i%2 > 0: #odd harmonic
-                    toneOdd[0:fmStartPnt] =  toneOdd[0:fmStartPnt] + sin(startF0Rad*i*time1 + phase)
-                    phaseCorrect1 =  (i*startF0Rad*fmStartPnt) - (i*midF0Rad*fmStartPnt) + (i*B*cos(fmStartPhase)) 
-                    toneOdd[fmStartPnt:fmStartPnt+nFMSamples] = toneOdd[fmStartPnt:fmStartPnt+nFMSamples] + sin(midF0Rad*i*time2+phaseCorrect1-(i*B*cos(fmRadFreq*fmTime+fmStartPhase)) + phase)
-                    phaseCorrect2 = (i*midF0Rad*(fmStartPnt+nFMSamples)) + (phaseCorrect1 - i*B*cos(fmRadFreq*nFMSamples + fmStartPhase)) - (i*endF0Rad*(fmStartPnt+nFMSamples))
-                    toneOdd[fmStartPnt+nFMSamples:nTot] =  toneOdd[fmStartPnt+nFMSamples:nTot] + sin(i*endF0Rad*time3 + phaseCorrect2 + phase)
-                else:
-                    toneEven[0:fmStartPnt] =  toneEven[0:fmStartPnt] + sin(startF0Rad*i*time1 + phase)
-                    phaseCorrect1 =  (i*startF0Rad*fmStartPnt) - (i*midF0Rad*fmStartPnt) + (i*B*cos(fmStartPhase)) 
-                    toneEven[fmStartPnt:fmStartPnt+nFMSamples] = toneEven[fmStartPnt:fmStartPnt+nFMSamples] + sin(midF0Rad*i*time2+phaseCorrect1-(i*B*cos(fmRadFreq*fmTime+fmStartPhase)) + phase)
-                    phaseCorrect2 = (i*midF0Rad*(fmStartPnt+nFMSamples)) + (phaseCorrect1 - i*B*cos(fmRadFreq*nFMSamples + fmStartPhase)) - (i*endF0Rad*(fmStartPnt+nFMSamples))
-                    toneEven[fmStartPnt+nFMSamples:nTot] =  toneEven[fmStartPnt+nFMSamples:nTot] + sin(i*endF0Rad*time3 + phaseCorrect2 + phase)
-            
+    phaseCorrect1 =  (startF0Rad*fmStartPnt) - (midF0Rad*fmStartPnt) + (B*cos(fmStartPhase))
+    phaseCorrect2 = (midF0Rad*(fmStartPnt+nFMSamples)) + (phaseCorrect1 - B*cos(fmRadFreq*nFMSamples + fmStartPhase)) - (endF0Rad*(fmStartPnt+nFMSamples))
+    #instantaneous phase of the F0 before, during, and after the FM
+    def f0Phase(n):
+        ang = startF0Rad*n
+        during = (n >= fmStartPnt) & (n < fmStartPnt+nFMSamples)
+        ang[during] = midF0Rad*n[during] + phaseCorrect1 - B*cos(fmRadFreq*(n[during]-fmStartPnt)+fmStartPhase)
+        after = n >= fmStartPnt+nFMSamples
+        ang[after] = endF0Rad*n[after] + phaseCorrect2
+        return ang
+    f0Ang = _oscPhase(nTot, f0Phase)
+
+    harms = arange(lowHarm, highHarm+1)
+    phases = _harmPhases(harmPhase, harms, highHarm)
+    tone = _synthHarmonics(f0Ang, harms, harms, phases, channel, dtype=dtype)
 
-    #numpy.savetxt('ptone.txt', tone)
     #level correction --------------
     if levelAdj == True:
-        if channel == "Right" or channel == "Left" or channel == "Both":
-            tone[0:fmStartPnt] = tone[0:fmStartPnt] * sqrt(((startF0Rad / (2*pi)) * (fs))/ midF0)
-            tone[fmStartPnt:fmStartPnt+nFMSamples] = tone[fmStartPnt:fmStartPnt+nFMSamples] * sqrt((midF0 + (fmDepthHz * sin (fmStartPhase + (fmTime * fmRadFreq)))) / midF0)
-            tone[fmStartPnt+nFMSamples:nTot] = tone[fmStartPnt+nFMSamples:nTot] * sqrt( ((endF0Rad / (2*pi)) * (fs))/ midF0)
-        else:
-            toneEven[0:fmStartPnt] = toneEven[0:fmStartPnt] * sqrt(((startF0Rad / (2*pi)) * (fs))/ midF0)
-            toneEven[fmStartPnt:fmStartPnt+nFMSamples] = toneEven[fmStartPnt:fmStartPnt+nFMSamples]  * sqrt((midF0 + (fmDepthHz * sin (fmStartPhase + (fmTime * fmRadFreq)))) / midF0)
-            toneEven[fmStartPnt+nFMSamples:nTot] = toneEven[fmStartPnt+nFMSamples:nTot] * sqrt(((endF0Rad / (2*pi)) * (fs))/ midF0)
-
-            toneOdd[0:fmStartPnt] = toneOdd[0:fmStartPnt] * sqrt(((startF0Rad / (2*pi)) * (fs))/ midF0)
-            toneOdd[fmStartPnt:fmStartPnt+nFMSamples] = toneOdd[fmStartPnt:fmStartPnt+nFMSamples] * sqrt((midF0 + (fmDepthHz * sin (fmStartPhase + (fmTime * fmRadFreq)))) / midF0)
-            toneOdd[fmStartPnt+nFMSamples:nTot] = toneOdd[fmStartPnt+nFMSamples:nTot] * sqrt(((endF0Rad / (2*pi)) * (fs))/ midF0)
-
+        levelCorr = ones(nTot)
+        levelCorr[0:fmStartPnt] = sqrt(((startF0Rad / (2*pi)) * (fs))/ midF0)
+        levelCorr[fmStartPnt:fmStartPnt+nFMSamples] = sqrt((midF0 + (fmDepthHz * sin (fmStartPhase + (fmTime * fmRadFreq)))) / midF0)
+        levelCorr[fmStartPnt+nFMSamples:nTot] = sqrt(((endF0Rad / (2*pi)) * (fs))/ midF0)
+        tone *= levelCorr[:, numpy.newaxis]
     #end of level correction -----------    
-    
-    if channel == "Right":
-        snd[0:nRamp, 1]                     = amp * ((1-cos(pi * timeRamp/nRamp))/2) * tone[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 1]        = amp * tone[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:nTot, 1] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * tone[nRamp+nSamples:nTot]
-    elif channel == "Left":
-        snd[0:nRamp, 0]                     = amp * ((1-cos(pi * timeRamp/nRamp))/2) *  tone[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 0]        = amp * tone[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:nTot, 0] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * tone[nRamp+nSamples:nTot]
-    elif channel == "Both":
-        snd[0:nRamp, 0]                     = amp * ((1-cos(pi * timeRamp/nRamp))/2) *  tone[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 0]        = amp * tone[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:nTot, 0] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * tone[nRamp+nSamples:nTot]
-        snd[:, 1] = snd[:, 0]
-    elif channel == "Odd Left":
-        snd[0:nRamp, 0]                     = amp * ((1-cos(pi * timeRamp/nRamp))/2) *  toneOdd[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 0]        = amp * toneOdd[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:nTot, 0] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * toneOdd[nRamp+nSamples:nTot]
-        snd[0:nRamp, 1]                     = amp * ((1-cos(pi * timeRamp/nRamp))/2) * toneEven[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 1]        = amp * toneEven[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:nTot, 1] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * toneEven[nRamp+nSamples:nTot]
-    elif channel == "Odd Right":
-        snd[0:nRamp, 1]                     = amp * ((1-cos(pi * timeRamp/nRamp))/2) *  toneOdd[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 1]        = amp * toneOdd[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:nTot, 1] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * toneOdd[nRamp+nSamples:nTot]
-        snd[0:nRamp, 0]                     = amp * ((1-cos(pi * timeRamp/nRamp))/2) * toneEven[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 0]        = amp * toneEven[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:nTot, 0] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * toneEven[nRamp+nSamples:nTot]
-        
+
+    snd = gate(ramp, amp * tone, fs)
 
     return snd
 
-def fm_complex2(midF0, harmPhase, lowHarm, highHarm, level, duration, ramp, fmFreq, fmDepth, fmStartPhase, fmStartTime, fmDuration, levelAdj, channel, fs, maxLevel):
+@_cachedSnd(randomArgs={"harmPhase": "Random"})
+def fm_complex2(midF0, harmPhase, lowHarm, highHarm, level, duration, ramp, fmFreq, fmDepth, fmStartPhase, fmStartTime, fmDuration, levelAdj, channel, fs, maxLevel, dtype=None):
     """
     Synthetise a Complex Tone with an embedded FM starting and stopping
     at a chosen time after the tone onset.
@@ -1660,6 +2575,9 @@ def fm_complex2(midF0, harmPhase, lowHarm, highHarm, level, duration, ramp, fmFr
         Samplig frequency in Hz.
     maxLevel : float
         Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
     
     """
     
@@ -1667,20 +2585,13 @@ def fm_complex2(midF0, harmPhase, lowHarm, highHarm, level, duration, ramp, fmFr
     duration = duration / 1000 #convert from ms to sec
     fmStartTime = fmStartTime / 1000  #convert from ms to sec
     fmDuration = fmDuration / 1000  #convert from ms to sec
-    ramp = ramp / 1000
+    sRamp = ramp / 1000
     fmStartPnt = int(round(fmStartTime*fs)) #sample where FM starts
     nFMSamples = int(round(fmDuration*fs)) #number of FM samples
     nSamples = int(round(duration * fs))
-    nRamp = int(round(ramp * fs))
+    nRamp = int(round(sRamp * fs))
     nTot = nSamples + (nRamp * 2)
-    
-    timeAll = arange(0, nTot) / fs
-    timeRamp = arange(0, nRamp)
 
-    timeAllSamp = arange(0, nTot) #time array not scaled by fs
-    time1 = timeAllSamp[0:fmStartPnt]
-    time2 = timeAllSamp[fmStartPnt:fmStartPnt+nFMSamples]
-    time3 = timeAllSamp[fmStartPnt+nFMSamples:nTot]
     fmTime = arange(0, nFMSamples)
 
     fmDepthHz = fmDepth*midF0/100 #convert from % to Hz
@@ -1696,13 +2607,6 @@ def fm_complex2(midF0, harmPhase, lowHarm, highHarm, level, duration, ramp, fmFr
     startF0 = midF0 + fmDepthHz*sin(fmStartPhase)
     endF0 = midF0 + fmDepthHz*sin(fmStartPhase + nFMSamples*fmRadFreq)
     
-    if channel == "Right" or channel == "Left" or channel == "Both":
-        tone = zeros(nTot)
-    elif channel == "Odd Left" or channel == "Odd Right":
-        toneOdd = zeros(nTot)
-        toneEven = zeros(nTot)
-    snd = zeros((nTot, 2))
-
     #from Hartmann, WM (1997) Signals, sound, and sensation. New York: AIP Press
     #angular frequency is the time derivative of the instantaneous phase
     #if the angular frequency is given by a constant carrier `wc`, plus a
@@ -1718,114 +2622,38 @@ def fm_complex2(midF0, harmPhase, lowHarm, highHarm, level, duration, ramp, fmFr
     #eq.4: PHI(t) = wc*t - (dw/wm)*cos(wm*t+phi)
     #this is what we're actually using below
     
-    for i in range(lowHarm, highHarm+1):
-            fArr = zeros(nTot)
-            fArr[0:fmStartPnt] = startF0*i
-            fArr[fmStartPnt:fmStartPnt+nFMSamples] = (midF0*i + fmDepthHz*i*sin(2*pi*fmFreq*fmTime/fs+fmStartPhase))
-            fArr[fmStartPnt+nFMSamples:nTot] = endF0*i
-            if harmPhase == "Sine":
-                ang = cumsum(2*pi*fArr/fs)
-                if channel == "Right" or channel == "Left" or channel == "Both":
-                    tone = tone + sin(ang)
-                elif channel == "Odd Left" or channel == "Odd Right":
-                    if i%2 > 0: #odd harmonic
-                        toneOdd = toneOdd + sin(ang)
-                    else:
-                        toneEven = toneEven + sin(ang)
-            elif harmPhase == "Cosine":
-                ang = cumsum(2*pi*fArr/fs)
-                if channel == "Right" or channel == "Left" or channel == "Both":
-                    tone = tone + cos(ang)
-                elif channel == "Odd Left" or channel == "Odd Right":
-                    if i%2 > 0: #odd harmonic
-                        toneOdd = toneOdd + cos(ang)
-                    else:
-                        toneEven = toneEven + cos(ang)
-
-            elif harmPhase == "Alternating":
-                ang = cumsum(2*pi*fArr/fs)
-                if i%2 > 0: #odd harmonic
-                    if channel == "Right" or channel == "Left" or channel == "Both":
-                        tone = tone + cos(ang)
-                    elif channel == "Odd Left" or channel == "Odd Right":
-                        toneOdd = toneOdd + cos(ang)
-                else: #even harmonic
-                    if channel == "Right" or channel == "Left" or channel == "Both":
-                        tone = tone + sin(ang)
-                    elif channel == "Odd Left" or channel == "Odd Right":
-                        toneEven = toneEven + sin(ang)
-            elif harmPhase == "Schroeder":
-                phase = -pi * i * (i - 1) / highHarm
-                ang = cumsum(2*pi*fArr/fs + phase)
-                if channel == "Right" or channel == "Left" or channel == "Both":
-                    tone = tone + sin(ang)
-                elif channel == "Odd Left" or channel == "Odd Right":
-                    if i%2 > 0: #odd harmonic
-                        toneOdd = toneOdd + sin(ang)
-                    else:
-                        toneEven = toneEven + sin(ang)
-            elif harmPhase == "Random":
-                phase = numpy.random.random() * 2 * pi
-                ang = cumsum(2*pi*fArr/fs + phase)
-                if channel == "Right" or channel == "Left" or channel == "Both":
-                    tone = tone + sin(ang)
-                elif channel == "Odd Left" or channel == "Odd Right":
-                    if i%2 > 0: #odd harmonic
-                        toneOdd = toneOdd + sin(ang)
-                    else:
-                        toneEven = toneEven + sin(ang)
-
+    def f0RadFreq(n):
+        f0Arr = numpy.full(len(n), startF0)
+        during = (n >= fmStartPnt) & (n < fmStartPnt+nFMSamples)
+        f0Arr[during] = (midF0 + fmDepthHz*sin(2*pi*fmFreq*(n[during]-fmStartPnt)/fs+fmStartPhase))
+        f0Arr[n >= fmStartPnt+nFMSamples] = endF0
+        return 2*pi*f0Arr/fs
+    f0Ang = _oscPhase(nTot, f0RadFreq, integrate=True)
+
+    harms = arange(lowHarm, highHarm+1)
+    phases = _harmPhases(harmPhase, harms, highHarm)
+    if harmPhase == "Schroeder" or harmPhase == "Random":
+        #the starting phase is integrated together with the frequency
+        phaseWeights = arange(1, nTot+1)
+    else:
+        phaseWeights = None
+    tone = _synthHarmonics(f0Ang, harms, harms, phases, channel, phaseWeights, dtype=dtype)
 
     #level correction --------------
     if levelAdj == True:
-        if channel == "Right" or channel == "Left" or channel == "Both":
-            tone[0:fmStartPnt] = tone[0:fmStartPnt] * sqrt(((startF0Rad / (2*pi)) * (fs))/ midF0)
-            tone[fmStartPnt:fmStartPnt+nFMSamples] = tone[fmStartPnt:fmStartPnt+nFMSamples] * sqrt((midF0 + (fmDepthHz * sin (fmStartPhase + (fmTime * fmRadFreq)))) / midF0)
-            tone[fmStartPnt+nFMSamples:nTot] = tone[fmStartPnt+nFMSamples:nTot] * sqrt( ((endF0Rad / (2*pi)) * (fs))/ midF0)
-        else:
-            toneEven[0:fmStartPnt] = toneEven[0:fmStartPnt] * sqrt(((startF0Rad / (2*pi)) * (fs))/ midF0)
-            toneEven[fmStartPnt:fmStartPnt+nFMSamples] = toneEven[fmStartPnt:fmStartPnt+nFMSamples]  * sqrt((midF0 + (fmDepthHz * sin (fmStartPhase + (fmTime * fmRadFreq)))) / midF0)
-            toneEven[fmStartPnt+nFMSamples:nTot] = toneEven[fmStartPnt+nFMSamples:nTot] * sqrt(((endF0Rad / (2*pi)) * (fs))/ midF0)
-
-            toneOdd[0:fmStartPnt] = toneOdd[0:fmStartPnt] * sqrt(((startF0Rad / (2*pi)) * (fs))/ midF0)
-            toneOdd[fmStartPnt:fmStartPnt+nFMSamples] = toneOdd[fmStartPnt:fmStartPnt+nFMSamples] * sqrt((midF0 + (fmDepthHz * sin (fmStartPhase + (fmTime * fmRadFreq)))) / midF0)
-            toneOdd[fmStartPnt+nFMSamples:nTot] = toneOdd[fmStartPnt+nFMSamples:nTot] * sqrt(((endF0Rad / (2*pi)) * (fs))/ midF0)
-
+        levelCorr = ones(nTot)
+        levelCorr[0:fmStartPnt] = sqrt(((startF0Rad / (2*pi)) * (fs))/ midF0)
+        levelCorr[fmStartPnt:fmStartPnt+nFMSamples] = sqrt((midF0 + (fmDepthHz * sin (fmStartPhase + (fmTime * fmRadFreq)))) / midF0)
+        levelCorr[fmStartPnt+nFMSamples:nTot] = sqrt(((endF0Rad / (2*pi)) * (fs))/ midF0)
+        tone *= levelCorr[:, numpy.newaxis]
     #end of level correction -----------    
-    
-    if channel == "Right":
-        snd[0:nRamp, 1]                     = amp * ((1-cos(pi * timeRamp/nRamp))/2) * tone[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 1]        = amp * tone[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:nTot, 1] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * tone[nRamp+nSamples:nTot]
-    elif channel == "Left":
-        snd[0:nRamp, 0]                     = amp * ((1-cos(pi * timeRamp/nRamp))/2) *  tone[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 0]        = amp * tone[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:nTot, 0] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * tone[nRamp+nSamples:nTot]
-    elif channel == "Both":
-        snd[0:nRamp, 0]                     = amp * ((1-cos(pi * timeRamp/nRamp))/2) *  tone[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 0]        = amp * tone[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:nTot, 0] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * tone[nRamp+nSamples:nTot]
-        snd[:, 1] = snd[:, 0]
-    elif channel == "Odd Left":
-        snd[0:nRamp, 0]                     = amp * ((1-cos(pi * timeRamp/nRamp))/2) *  toneOdd[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 0]        = amp * toneOdd[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:nTot, 0] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * toneOdd[nRamp+nSamples:nTot]
-        snd[0:nRamp, 1]                     = amp * ((1-cos(pi * timeRamp/nRamp))/2) * toneEven[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 1]        = amp * toneEven[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:nTot, 1] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * toneEven[nRamp+nSamples:nTot]
-    elif channel == "Odd Right":
-        snd[0:nRamp, 1]                     = amp * ((1-cos(pi * timeRamp/nRamp))/2) *  toneOdd[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 1]        = amp * toneOdd[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:nTot, 1] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * toneOdd[nRamp+nSamples:nTot]
-        snd[0:nRamp, 0]                     = amp * ((1-cos(pi * timeRamp/nRamp))/2) * toneEven[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 0]        = amp * toneEven[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:nTot, 0] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * toneEven[nRamp+nSamples:nTot]
-        
 
-    return snd
+    snd = gate(ramp, amp * tone, fs)
 
+    return snd
 
-def FMTone(fc, fm, mi, phase, level, duration, ramp, channel, fs, maxLevel):
+@_cachedSnd()
+def FMTone(fc, fm, mi, phase, level, duration, ramp, channel, fs, maxLevel, dtype=None):
     """
     Generate a frequency modulated tone.
 
@@ -1855,6 +2683,9 @@ def FMTone(fc, fm, mi, phase, level, duration, ramp, channel, fs, maxLevel):
     maxLevel : float
         Level in dB SPL output by the soundcard for a sinusoid of
         amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
 
     Returns
     -------
@@ -1875,28 +2706,86 @@ def FMTone(fc, fm, mi, phase, level, duration, ramp, channel, fs, maxLevel):
     nRamp = int(round(ramp * fs))
     nTot = nSamples + (nRamp * 2)
 
-    timeAll = arange(0, nTot) / fs
-    timeRamp = arange(0, nRamp) 
+    def phaseFunc(n):
+        timeAll = n / fs
+        return 2*pi*fc*timeAll + mi*sin(2*pi*fm * timeAll + phase)
 
-    snd = zeros((nTot, 2))
-    if channel == "Right":
-        snd[0:nRamp, 1] = amp * ((1-cos(pi * timeRamp/nRamp))/2) * sin(2*pi*fc*timeAll[0:nRamp] + mi*sin(2*pi*fm * timeAll[0:nRamp] + phase))
-        snd[nRamp:nRamp+nSamples, 1] = amp* sin(2*pi*fc * timeAll[nRamp:nRamp+nSamples] +mi*sin(2*pi*fm * timeAll[nRamp:nRamp+nSamples] + phase))
-        snd[nRamp+nSamples:len(timeAll), 1] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * sin(2*pi*fc * timeAll[nRamp+nSamples:len(timeAll)]+mi*sin(2*pi*fm * timeAll[nRamp+nSamples:len(timeAll)] + phase))
-    elif channel == "Left":
-        snd[0:nRamp, 0] = amp * ((1-cos(pi * timeRamp/nRamp))/2) * sin(2*pi*fc*timeAll[0:nRamp] + mi*sin(2*pi*fm * timeAll[0:nRamp] + phase))
-        snd[nRamp:nRamp+nSamples, 0] = amp* sin(2*pi*fc * timeAll[nRamp:nRamp+nSamples] +mi*sin(2*pi*fm * timeAll[nRamp:nRamp+nSamples] + phase))
-        snd[nRamp+nSamples:len(timeAll), 0] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * sin(2*pi*fc * timeAll[nRamp+nSamples:len(timeAll)]+mi*sin(2*pi*fm * timeAll[nRamp+nSamples:len(timeAll)] + phase))
-    elif channel == "Both":
-        snd[0:nRamp, 0] = amp * ((1-cos(pi * timeRamp/nRamp))/2) * sin(2*pi*fc*timeAll[0:nRamp] + mi*sin(2*pi*fm * timeAll[0:nRamp] + phase))
-        snd[nRamp:nRamp+nSamples, 0] = amp* sin(2*pi*fc * timeAll[nRamp:nRamp+nSamples] +mi*sin(2*pi*fm * timeAll[nRamp:nRamp+nSamples] + phase))
-        snd[nRamp+nSamples:len(timeAll), 0] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * sin(2*pi*fc * timeAll[nRamp+nSamples:len(timeAll)]+mi*sin(2*pi*fm * timeAll[nRamp+nSamples:len(timeAll)] + phase))
-        snd[:, 1] = snd[:, 0]
+    tone = _oscillator(nTot, phaseFunc, amp)
+    _applyRamps(tone, nRamp)
+    snd = _makeSnd(tone, channel, dtype)
        
 
     return snd
 
 
+def FMToneStream(fc, fm, mi, phase, level, duration, ramp, channel, fs, maxLevel, blockSize=None, dtype=None):
+    """
+    Generate a frequency modulated tone block by block.
+
+    Instead of returning the whole sound, the generator yields it in
+    consecutive stereo blocks as it is synthetised, so that memory
+    usage does not grow with the duration of the sound and playback
+    (see `audioManager.playStream`) can start as soon as the first
+    block is ready. The phase of the signal is continuous across
+    blocks, the samples are the same as those of `FMTone`.
+
+    Parameters
+    ----------
+    fc : float
+        Carrier frequency in hertz. This is the frequency of the tone at fm zero crossing.
+    fm : float
+        Modulation frequency in Hz.
+    mi : float
+        Modulation index, see `FMTone`.
+    phase : float
+        Starting phase in radians.
+    level : float
+        Tone level in dB SPL. 
+    duration : float
+        Sound duration (excluding ramps) in milliseconds.
+    ramp : float
+        Duration of the onset and offset ramps in milliseconds.
+        The total duration of the sound will be duration+ramp*2.
+    channel : string ('Right', 'Left' or 'Both')
+        Channel in which the sound will be generated.
+    fs : int
+        Samplig frequency in Hz.
+    maxLevel : float
+        Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+    blockSize : int or None
+        Number of samples of each block. If None, the module-level
+        `streamBlockSize` setting is used.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
+
+    Returns
+    -------
+    blocks : generator
+        Generator of 2-dimensional arrays of floats with dimensions
+        (blockSize, 2). The last block can be shorter.
+
+    Examples
+    --------
+    >>> blocks = FMToneStream(fc=1000, fm=40, mi=1, phase=0, level=55,
+    ...     duration=60000, ramp=10, channel='Both', fs=48000, maxLevel=100)
+    
+    """
+    amp = 10**((level - maxLevel) / 20)
+    duration = duration / 1000 #convert from ms to sec
+    ramp = ramp / 1000
+
+    nSamples = int(round(duration * fs))
+    nRamp = int(round(ramp * fs))
+    nTot = nSamples + (nRamp * 2)
+
+    def blockFunc(n):
+        timeAll = n / fs
+        return amp * sin(2*pi*fc*timeAll + mi*sin(2*pi*fm * timeAll + phase))
+
+    return _streamBlocks(nTot, nRamp, channel, blockFunc, blockSize, dtype)
+
+
 def fir2Filt(f1, f2, f3, f4, snd, fs):
     """
     Filter signal with a fir2 filter.
@@ -1938,7 +2827,11 @@ def fir2Filt(f1, f2, f3, f4, snd, fs):
     In the other cases the filter will be bandpass.
 
     The order of the filter (number of taps) is fixed at 256.
-    This function uses internally 'scipy.signal.firwin2'.
+    This function uses internally 'scipy.signal.firwin2'. The filter
+    coefficients are cached, so that filtering several sounds with the
+    same cutoffs designs the filter only once. Sounds of at least
+    `fir2FFTMinSamples` samples are filtered with an FFT-based
+    overlap-add convolution applied to both channels at once.
        
     Examples
     --------
@@ -1952,13 +2845,39 @@ def fir2Filt(f1, f2, f3, f4, snd, fs):
     ...     snd=noise, fs=48000) #bandpass filter
     """
 
+    n = 256
+    b = _fir2Design(f1, f2, f3, f4, n, fs)
+
+    if isinstance(snd, monoSound): #filter only the mono signal
+        if oaconvolve is not None and len(snd) >= fir2FFTMinSamples:
+            y = oaconvolve(snd.sig, b, mode='same')
+        else:
+            y = convolve(snd.sig, b, 1)
+        return monoSound(y.astype(snd.dtype, copy=False), snd.channel)
+    x = copy.copy(snd)
+    if oaconvolve is not None and snd.shape[0] >= fir2FFTMinSamples:
+        x[:] = oaconvolve(snd, b[:, numpy.newaxis], mode='same', axes=0)
+    else:
+        x[:, 0] = convolve(snd[:,0], b, 1)
+        x[:, 1] = convolve(snd[:,1], b, 1)
+    
+    return x
+
+
+@functools.lru_cache(maxsize=64)
+def _fir2Design(f1, f2, f3, f4, n, fs):
+    """
+    Design the fir2Filt filter for the given band edges in hertz,
+    number of taps and sampling frequency.
+
+    The coefficients are cached, the returned array is read-only.
+
+    """
     f1 = (f1 * 2) / fs
     f2 = (f2 * 2) / fs
     f3 = (f3 * 2) / fs
     f4 = (f4 * 2) / fs
 
-    n = 256
-
     if f2 == 0: #low pass
         f = [0, f3, f4, 1]
         m = [1, 1, 0.00003, 0]
@@ -1971,13 +2890,10 @@ def fir2Filt(f1, f2, f3, f4, snd, fs):
         f = [0, f1, f2, 0.999999, 1] #scipy wants that gain at the Nyquist is 0
         m = [0, 0.00003, 1, 1, 0]
         
-        
     b = firwin2 (n,f,m);
-    x = copy.copy(snd)
-    x[:, 0] = convolve(snd[:,0], b, 1)
-    x[:, 1] = convolve(snd[:,1], b, 1)
-    
-    return x
+    b.setflags(write=False)
+
+    return b
 
 
 def freqFromERBInterval(f1, deltaERB):
@@ -2040,7 +2956,12 @@ def getRms(sig):
 
     """
 
-    rms = sqrt(mean(sig*sig))
+    if isinstance(sig, monoSound):
+        rms = sqrt(mean(sig.sig*sig.sig))
+        if sig.channel != "Both": #the other channel is silent
+            rms = rms / sqrt(2)
+    else:
+        rms = sqrt(mean(sig*sig))
     return rms
 
 
@@ -2055,36 +2976,71 @@ def gate(ramps, sig, fs):
     sig : array of floats    
         The signal on which the ramps should be imposed.
     fs : int
-        The sampling frequency os 'sig'
+        The sampling frequency os 'sig'
+
+    Returns
+    -------
+    sig : array of floats
+       The ramped signal.
+
+    Examples
+    --------
+    >>> noise = broadbandNoise(spectrumLevel=40, duration=200, ramp=0,
+    ...     channel='Both', fs=48000, maxLevel=100)
+    >>> gate(ramps=10, sig=noise, fs=48000)
+
+    """
+    
+    ramps = ramps / 1000.
+    nRamp = int(round(ramps * fs))
+    if isinstance(sig, monoSound):
+        _applyRamps(sig.sig, nRamp)
+    else:
+        _applyRamps(sig, nRamp)
+
+    return sig
+
+
+def gateStream(ramps, blocks, nSamples, fs):
+    """
+    Impose onset and offset ramps to a sound that is generated
+    block by block.
+
+    Parameters
+    ----------
+    ramps : float
+        The duration of the ramps.
+    blocks : iterable of arrays of floats
+        The consecutive blocks of the signal on which the ramps
+        should be imposed.
+    nSamples : int
+        The total number of samples of the signal.
+    fs : int
+        The sampling frequency of the signal.
 
     Returns
     -------
-    sig : array of floats
-       The ramped signal.
+    blocks : generator
+        Generator of the ramped blocks.
 
     Examples
     --------
-    >>> noise = broadbandNoise(spectrumLevel=40, duration=200, ramp=0,
+    >>> blocks = broadbandNoiseStream(spectrumLevel=40, duration=60000, ramp=0,
     ...     channel='Both', fs=48000, maxLevel=100)
-    >>> gate(ramps=10, sig=noise, fs=48000)
+    >>> blocks = gateStream(ramps=10, blocks=blocks, nSamples=2880000, fs=48000)
 
     """
     
     ramps = ramps / 1000.
     nRamp = int(round(ramps * fs))
-    timeRamp = arange(0., nRamp)
-    nTot = len(sig[:,1])
-    nStartSecondRamp = nTot - nRamp
-    
-    sig[0:nRamp, 0] = sig[0:nRamp, 0] *  ((1-cos(pi * timeRamp/nRamp))/2)
-    sig[0:nRamp, 1] = sig[0:nRamp, 1] *  ((1-cos(pi * timeRamp/nRamp))/2)
-    sig[nStartSecondRamp:nTot, 0] = sig[nStartSecondRamp:nTot, 0] * ((1+cos(pi * timeRamp/nRamp))/2)
-    sig[nStartSecondRamp:nTot, 1] = sig[nStartSecondRamp:nTot, 1] * ((1+cos(pi * timeRamp/nRamp))/2)
-
-    return sig
+    start = 0
+    for block in blocks:
+        yield _rampBlock(asarray(block), start, nRamp, nSamples)
+        start = start + len(block)
 
 
-def glide(freqStart, ftype, excursion, level, duration, phase, ramp, channel, fs, maxLevel):
+@_cachedSnd()
+def glide(freqStart, ftype, excursion, level, duration, phase, ramp, channel, fs, maxLevel, dtype=None):
     """
     Synthetize a rising or falling tone glide with frequency changing
     linearly or exponentially. 
@@ -2115,6 +3071,9 @@ def glide(freqStart, ftype, excursion, level, duration, phase, ramp, channel, fs
         Samplig frequency in Hz.
     maxLevel : float
         Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
 
     Returns
     -------
@@ -2131,12 +3090,12 @@ def glide(freqStart, ftype, excursion, level, duration, phase, ramp, channel, fs
 
     totDur = duration/1000+ramp/1000*2
     rate = excursion / totDur
-    snd = chirp(freqStart, ftype, rate, level, duration, phase, ramp, channel, fs, maxLevel)
+    snd = chirp(freqStart, ftype, rate, level, duration, phase, ramp, channel, fs, maxLevel, dtype)
     
     return snd
 
 
-def harmComplFromNarrowbandNoise(F0, lowHarm, highHarm, level, bandwidth, bandwidthUnit, stretch, duration, ramp, channel, fs, maxLevel):
+def harmComplFromNarrowbandNoise(F0, lowHarm, highHarm, level, bandwidth, bandwidthUnit, stretch, duration, ramp, channel, fs, maxLevel, dtype=None):
     """
     Generate an harmonic complex tone from narrow noise bands.
 
@@ -2173,6 +3132,9 @@ def harmComplFromNarrowbandNoise(F0, lowHarm, highHarm, level, bandwidth, bandwi
         Samplig frequency in Hz.
     maxLevel : float
         Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
 
     Returns
     -------
@@ -2192,13 +3154,6 @@ def harmComplFromNarrowbandNoise(F0, lowHarm, highHarm, level, bandwidth, bandwi
     nSamples = int(round(sDuration * fs))
     nRamp = int(round(sRamp * fs))
     nTot = nSamples + (nRamp * 2)
-    snd = zeros((nTot, 2))
-    
-    if channel == "Right" or channel == "Left" or channel == "Both":
-        tone = zeros((nTot, 2))
-    elif channel == "Odd Left" or channel == "Odd Right":
-        toneOdd = zeros((nTot, 2))
-        toneEven = zeros((nTot, 2))
 
     cfs = arange(lowHarm, highHarm+1)*F0 #center frequencies
     cfs = cfs + stretchHz
@@ -2212,25 +3167,33 @@ def harmComplFromNarrowbandNoise(F0, lowHarm, highHarm, level, bandwidth, bandwi
         fLo = freqFromERBInterval(cfs, -bandwidth/2)
         fHi = freqFromERBInterval(cfs, bandwidth/2)
 
+    #collect the random-phase components of all bands, and render
+    #them with a single inverse FFT per channel
+    bins = []; phases = []; amps = []; isOdd = []
     for i in range(len(fLo)):
-        if channel == "Right" or channel == "Left" or channel == "Both":
-            tone =  tone + steepNoise(fLo[i], fHi[i], level, duration, ramp, channel, fs, maxLevel)
-        elif channel == "Odd Left" or channel == "Odd Right":
-            if i%2 > 0: #odd harmonic
-                        #make the tone in the left channel, then move it where needed
-                toneOdd = toneOdd + steepNoise(fLo[i], fHi[i], level, duration, ramp, "Left", fs, maxLevel)
-            else:
-                toneEven = toneEven + steepNoise(fLo[i], fHi[i], level, duration, ramp, "Left", fs, maxLevel)
-  
+        thisAmp, thisBins = _steepNoiseComponents(fLo[i], fHi[i], level, totDur, nTot, fs, maxLevel)
+        bins.append(thisBins)
+        phases.append(numpy.random.random(len(thisBins)) * 2 * pi)
+        amps.append(repeat(thisAmp, len(thisBins)))
+        isOdd.append(repeat(i%2 > 0, len(thisBins)))
+    bins = concatenate(bins); phases = concatenate(phases); amps = concatenate(amps); isOdd = concatenate(isOdd)
 
     if channel == "Right" or channel == "Left" or channel == "Both":
-        snd = tone
-    elif channel == "Odd Left":
-        snd[:,0] = toneOdd[:,0]
-        snd[:,1] = toneEven[:,0]
-    elif channel == "Odd Right":
-     snd[:,1] = toneOdd[:,0]
-     snd[:,0] = toneEven[:,0]
+        tone = _sinesFromSpectrum(nTot, bins, phases, amps)
+        _applyRamps(tone, nRamp)
+        snd = _makeSnd(tone, channel, dtype)
+    elif channel == "Odd Left" or channel == "Odd Right":
+        #odd and even refer to the position of the band, starting from zero
+        toneOdd = _sinesFromSpectrum(nTot, bins[isOdd], phases[isOdd], amps[isOdd])
+        toneEven = _sinesFromSpectrum(nTot, bins[~isOdd], phases[~isOdd], amps[~isOdd])
+        snd = zeros((nTot, 2), dtype=_sndDtype(dtype))
+        if channel == "Odd Left":
+            snd[:,0] = toneOdd
+            snd[:,1] = toneEven
+        elif channel == "Odd Right":
+            snd[:,1] = toneOdd
+            snd[:,0] = toneEven
+        _applyRamps(snd, nRamp)
     
     return snd
 
@@ -2329,7 +3292,7 @@ def imposeLevelGlide(sig, deltaL, startTime, endTime, channel, fs):
         ampArray[endPnt:len(ampArray)] = repeat(endAmp, len(ampArray[endPnt:len(ampArray)]))
 
     
-        snd = zeros((nSamples,2))
+        snd = zeros((nSamples,2), dtype=_floatDtype(sig))
         if channel == "Right":
             snd[:,1] = sig[:,1] * ampArray
         elif channel == "Left":
@@ -2352,15 +3315,16 @@ def ITDShift(sig, f1, f2, ITD, channel, fs):
     ----------
     sig : array of floats
         Input signal.
-    f1 : float
+    f1 : float or array of floats
         The start point of the frequency region to be
-        phase-shifted in hertz.
-    f2 : float
+        phase-shifted in hertz. If an array is given, several
+        regions are shifted at once.
+    f2 : float or array of floats
         The end point of the frequency region to be
         phase-shifted in hertz.
     ITD : float
         The amount of ITD shift in microseconds
-    channel : string ('Right' or 'Left')
+    channel : string ('Right', 'Left' or 'Both')
         The channel in which to apply the shift.
     fs : float
         The sampling frequency of the sound.
@@ -2380,47 +3344,16 @@ def ITDShift(sig, f1, f2, ITD, channel, fs):
     
     nSamples = len(sig[:,0])
     fftPoints = 2**nextpow2(nSamples)
-    snd = zeros((nSamples, 2))
-    nUniquePnts = ceil((fftPoints+1)/2)
-    #compute the frequencies of the first half of the FFT
-    freqArray1 = arange(0, nUniquePnts, 1) * (fs / fftPoints)
-    #remove DC offset and nyquist for the second half of the FFT
-    freqArray2 = -arange(1, (nUniquePnts-1), 1)[::-1] * (fs / fftPoints) 
-    #find the indexes of the frequencies for which to set the ITD for the first half of the FFT
-    sh1 = where((freqArray1>f1) & (freqArray1<f2))
-    #same as above for the second half of the FFT
-    sh2 = where((freqArray2<-f1) & (freqArray2>-f2))
-    #compute IPSs for the first half of the FFT
-    phaseShiftArray1 = itdtoipd(ITD/1000000, freqArray1[sh1])
-    #same as above for the second half of the FFT
-    phaseShiftArray2 = itdtoipd(ITD/1000000, freqArray2[sh2])
-    #get the indexes of the first half of the FFT
-    p1Start = 0; p1End = len(freqArray1)
-    #get the indexes of the second half of the FFT
-    p2Start = len(freqArray1); p2End = fftPoints 
+    snd = array(sig, dtype=_floatDtype(sig))
+    #IPDs corresponding to the ITD in the frequency region(s) to shift
+    mask = _dichoticPhaseMask(_rfftFreqs(fftPoints, fs), numpy.atleast_1d(f1), numpy.atleast_1d(f2), "ITD", ITD)
         
     if channel == "Left":
-        x = fft(sig[:,0], fftPoints)
+        snd[:,0] = _rotatePhases(sig[:,0], mask, fftPoints)
     elif channel == "Right":
-        x = fft(sig[:,1], fftPoints)
-    
-    x1 = x[p1Start:p1End] #first half of the FFT
-    x2 = x[p2Start:p2End] #second half of the FFT
-    x1mag = abs(x1); x2mag = abs(x2) 
-    x1Phase =  angle(x1); x2Phase =  angle(x2);
-    x1Phase[sh1] = x1Phase[sh1] + phaseShiftArray1 #change phases
-    x2Phase[sh2] = x2Phase[sh2] + phaseShiftArray2
-    x1 = x1mag * (cos(x1Phase) + (1j * sin(x1Phase))) #rebuild FFTs
-    x2 = x2mag * (cos(x2Phase) + (1j * sin(x2Phase)))
-    x = concatenate((x1, x2))
-    x = real(ifft(x)) #inverse transform to get the sound back
-    
-    if channel == "Left":
-        snd[:,0] = x[0:nSamples]
-        snd[:,1] = sig[:,1]
-    elif channel == "Right":
-        snd[:,1] = x[0:nSamples]
-        snd[:,0] = sig[:,0]
+        snd[:,1] = _rotatePhases(sig[:,1], mask, fftPoints)
+    elif channel == "Both":
+        snd = _rotatePhases(snd, mask, fftPoints)
 
     return snd
 
@@ -2483,20 +3416,17 @@ def joinSndISI(sndList, ISIList, fs):
     >>> tone_seq = joinSndISI([pt1, pt2], [500], 48000)
     
     """
-    snd = sndList[0]
+    tl = soundTimeline(fs)
+    tl.addAtSample(sndList[0], 0)
     for i in range(len(sndList)-1):
-        if ISIList[i] >= 0:
-            thisSilence = makeSilence(ISIList[i], fs)
-            snd = concatenate((snd, thisSilence), axis=0)
-            snd = concatenate((snd, sndList[i+1]), axis=0)
-        else:
-            delay = (snd.shape[0]/fs)*1000 + ISIList[i]
-            snd = addSounds(snd, sndList[i+1], delay, fs)
+        #a negative ISI overlaps the sound with the end of the sequence
+        tl.addAtSample(sndList[i+1], tl.nSamples + int(round(ISIList[i] / 1000 * fs)))
+    snd = tl.mix()
             
     return snd
 
 
-def makeAsynchChord(freqs, levels, phases, tonesDuration, tonesRamps, tonesChannel, SOA, fs, maxLevel):
+def makeAsynchChord(freqs, levels, phases, tonesDuration, tonesRamps, tonesChannel, SOA, fs, maxLevel, dtype=None):
     """
     Generate an asynchronous chord.
 
@@ -2526,6 +3456,9 @@ def makeAsynchChord(freqs, levels, phases, tonesDuration, tonesRamps, tonesChann
         Samplig frequency in Hz.
     maxLevel : float
         Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
 
     Returns
     -------
@@ -2545,17 +3478,16 @@ def makeAsynchChord(freqs, levels, phases, tonesDuration, tonesRamps, tonesChann
     seq = numpy.arange(len(freqs))
     numpy.random.shuffle(seq)
 
+    tl = soundTimeline(fs)
     for i in range(len(freqs)):
         thisFreq = freqs[seq[i]]; thisLev = levels[seq[i]]; thisPhase = phases[seq[i]]
-        thisTone = pureTone(thisFreq, thisPhase, thisLev, tonesDuration, tonesRamps, tonesChannel, fs, maxLevel)
-        if i == 0:
-            snd = thisTone
-        else:
-            snd = addSounds(snd, thisTone, SOA*i, fs)
+        thisTone = pureTone(thisFreq, thisPhase, thisLev, tonesDuration, tonesRamps, tonesChannel, fs, maxLevel, dtype)
+        tl.add(thisTone, SOA*i)
+    snd = tl.mix()
     return snd
 
 
-def makeHuggins(F0, lowHarm, highHarm, spectrumLevel, bandwidth, phaseRelationship, noiseType, duration, ramp, fs, maxLevel):
+def makeHuggins(F0, lowHarm, highHarm, spectrumLevel, bandwidth, phaseRelationship, noiseType, duration, ramp, fs, maxLevel, dtype=None):
     """
     Synthetise a complex Huggings Pitch.
 
@@ -2588,6 +3520,9 @@ def makeHuggins(F0, lowHarm, highHarm, spectrumLevel, bandwidth, phaseRelationsh
         Samplig frequency in Hz.
     maxLevel : float
         Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
 
     Returns
     -------
@@ -2610,20 +3545,28 @@ def makeHuggins(F0, lowHarm, highHarm, spectrumLevel, bandwidth, phaseRelationsh
     nTot = nSamples + (nRamp * 2)
     snd = zeros((nTot, 2))
 
-    tone = broadbandNoise(spectrumLevel, duration+(ramp*2), 0, "Both", fs, maxLevel)
+    #the phases of one channel are shifted below, so the noise
+    #is needed as a stereo array also when monoFirst is True
+    tone = asarray(broadbandNoise(spectrumLevel, duration+(ramp*2), 0, "Both", fs, maxLevel, dtype))
     if noiseType == "Pink":
         makePink(tone, fs)
+    shiftLo = []; shiftHi = []
     for i in range(lowHarm, highHarm+1):
         if phaseRelationship == "NoSpi":
-            tone = phaseShift(tone, ((i*F0) - (bandwidth/2)), ((i*F0) + (bandwidth/2)), pi, "Left", fs)
+            shiftLo.append((i*F0) - (bandwidth/2)); shiftHi.append((i*F0) + (bandwidth/2))
         elif phaseRelationship == "NpiSo":
             if i == lowHarm:
-                tone = phaseShift(tone, 10, (i*F0) - (bandwidth/2), pi, "Left", fs)
+                shiftLo.append(10); shiftHi.append((i*F0) - (bandwidth/2))
             elif i == highHarm:
-                tone = phaseShift(tone, ((i-1)*F0) + (bandwidth/2), (i*F0) - (bandwidth/2), pi, "Left", fs)
-                tone = phaseShift(tone, (i*F0) + (bandwidth/2), fs/2, pi, "Left", fs)
+                shiftLo.append(((i-1)*F0) + (bandwidth/2)); shiftHi.append((i*F0) - (bandwidth/2))
+                shiftLo.append((i*F0) + (bandwidth/2)); shiftHi.append(fs/2)
             else:
-                tone = phaseShift(tone, ((i-1)*F0) + (bandwidth/2), (i*F0) - (bandwidth/2), pi, "Left", fs)
+                shiftLo.append(((i-1)*F0) + (bandwidth/2)); shiftHi.append((i*F0) - (bandwidth/2))
+
+    #apply the phase shifts of all regions to the left channel at once
+    fftPoints = len(tone[:,0])
+    mask = _dichoticPhaseMask(_rfftFreqs(fftPoints, fs), shiftLo, shiftHi, "IPD Stepped", pi)
+    tone[:,0] = _rotatePhases(tone[:,0], mask, fftPoints)
     
     tone = gate(ramp, tone, fs)    
     snd = tone
@@ -2634,7 +3577,7 @@ def makeHuggins(F0, lowHarm, highHarm, spectrumLevel, bandwidth, phaseRelationsh
 def makeHugginsPitch(F0, lowHarm, highHarm, spectrumLevel, bandwidth,
                      bandwidthUnit, dichoticDifference,
                      dichoticDifferenceValue, phaseRelationship, stretch,
-                     noiseType, duration, ramp, fs, maxLevel):
+                     noiseType, duration, ramp, fs, maxLevel, dtype=None):
     """
     Synthetise a complex Huggings Pitch.
 
@@ -2687,6 +3630,9 @@ def makeHugginsPitch(F0, lowHarm, highHarm, spectrumLevel, bandwidth,
         Samplig frequency in Hz.
     maxLevel : float
         Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
 
     Returns
     -------
@@ -2717,7 +3663,9 @@ def makeHugginsPitch(F0, lowHarm, highHarm, spectrumLevel, bandwidth,
     nTot = nSamples + (nRamp * 2)
     snd = zeros((nTot, 2))
 
-    tone = broadbandNoise(spectrumLevel, duration+(ramp*2), 0, "Both", fs, maxLevel)
+    #the phases of one channel are shifted below, so the noise
+    #is needed as a stereo array also when monoFirst is True
+    tone = asarray(broadbandNoise(spectrumLevel, duration+(ramp*2), 0, "Both", fs, maxLevel, dtype))
     if noiseType == "Pink":
         makePink(tone, fs)
 
@@ -2750,15 +3698,12 @@ def makeHugginsPitch(F0, lowHarm, highHarm, spectrumLevel, bandwidth,
             shiftLo[1:len(shiftLo)] = freqFromERBInterval(cfs, bandwidth/2)
             shiftHi[0:len(shiftHi)-1] = freqFromERBInterval(cfs, -bandwidth/2)
 
-    for i in range(len(shiftLo)):
-        if dichoticDifference == "IPD Linear":
-            tone = phaseShift(tone, shiftLo[i], shiftHi[i], dichoticDifferenceValue, 'Linear', "Left", fs)
-        elif dichoticDifference == "IPD Stepped":
-            tone = phaseShift(tone, shiftLo[i], shiftHi[i], dichoticDifferenceValue, 'Step', "Left", fs)
-        elif dichoticDifference == "IPD Random":
-            tone = phaseShift(tone, shiftLo[i], shiftHi[i], dichoticDifferenceValue, 'Random', "Left", fs)
-        elif dichoticDifference == "ITD":
-            tone = ITDShift(tone, shiftLo[i], shiftHi[i], dichoticDifferenceValue, "Left", fs)
+    #apply the phase shifts of all regions to the left channel at once;
+    #the FFT is not zero-padded, so that the level is preserved
+    #also when the phases are randomised on a bin-by-bin basis
+    fftPoints = len(tone[:,0])
+    mask = _dichoticPhaseMask(_rfftFreqs(fftPoints, fs), shiftLo, shiftHi, dichoticDifference, dichoticDifferenceValue)
+    tone[:,0] = _rotatePhases(tone[:,0], mask, fftPoints)
     
     tone = gate(ramp, tone, fs)    
     snd = tone
@@ -2766,7 +3711,7 @@ def makeHugginsPitch(F0, lowHarm, highHarm, spectrumLevel, bandwidth,
     return snd
 
 
-def makeIRN(delay, gain, iterations, configuration, spectrumLevel, duration, ramp, channel, fs, maxLevel):
+def makeIRN(delay, gain, iterations, configuration, spectrumLevel, duration, ramp, channel, fs, maxLevel, dtype=None):
     """
     Synthetise a iterated rippled noise
 
@@ -2794,6 +3739,9 @@ def makeIRN(delay, gain, iterations, configuration, spectrumLevel, duration, ram
         Sampling frequency in Hz.
     maxLevel : float
         Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
 
     Returns
     -------
@@ -2808,7 +3756,7 @@ def makeIRN(delay, gain, iterations, configuration, spectrumLevel, duration, ram
 
     """
     
-    snd = broadbandNoise(spectrumLevel, duration+(ramp*2), 0, channel, fs, maxLevel) 
+    snd = broadbandNoise(spectrumLevel, duration+(ramp*2), 0, channel, fs, maxLevel, dtype)
     if configuration == "Add Same":
         snd = delayAdd(snd, delay, gain, iterations, configuration, fs)
     elif configuration == "Add Original":
@@ -2819,7 +3767,7 @@ def makeIRN(delay, gain, iterations, configuration, spectrumLevel, duration, ram
     return snd
 
 
-def makePink(sig, fs):
+def makePink(sig, fs, inPlace=True):
     """
     Convert a white noise into a pink noise.
 
@@ -2832,6 +3780,9 @@ def makePink(sig, fs):
         The white noise to be turned into a pink noise.
     fs : int
         Sampling frequency of the sound.
+    inPlace : bool
+        If True, the pink noise is written in 'sig' and 'sig' is returned,
+        otherwise 'sig' is left unchanged and a new array is returned.
 
     Returns
     -------
@@ -2845,39 +3796,12 @@ def makePink(sig, fs):
      >>> noise = makePink(sig=noise, fs=48000)
     
     """
-    nSamples = len(sig[:,0])
-    if nSamples < 2:
-        pass
-    else:
-        ref = 1 + (1000 * nSamples/fs)
-        x = rfft(sig[:,0], nSamples)
-        idx = arange(1, len(x))
-        mag = zeros(len(x))
-        mag[1:len(x)] = abs(x[1:len(x)]) * sqrt(ref/idx)
-        mag[0] = abs(x[0])
-        ph = angle(x)
-        x = mag * (cos(ph) + 1j * sin(ph))
-    
-        sig0 = irfft(x, nSamples)
-
-
-        x = rfft(sig[:,1], nSamples)
-        idx = arange(1, len(x))
-        mag = zeros(len(x))
-        mag[1:len(x)] = abs(x[1:len(x)]) * sqrt(ref/idx)
-        mag[0] = abs(x[0])
-        ph = angle(x)
-        x = mag * (cos(ph) + 1j * sin(ph))
-
-        sig1 = irfft(x, nSamples)
-
-        sig[:, 0] = sig0
-        sig[:, 1] = sig1
+    snd = makePinkRef(sig, fs, 1000, inPlace)
     
-    return sig
+    return snd
 
 
-def makePinkRef(sig, fs, refHz):
+def makePinkRef(sig, fs, refHz, inPlace=True):
     """
     Convert a white noise into a pink noise.
 
@@ -2895,6 +3819,9 @@ def makePinkRef(sig, fs, refHz):
         Reference frequency in Hz. The amplitude of the other
         frequencies will be scaled with respect to the amplitude
         of this frequency.
+    inPlace : bool
+        If True, the pink noise is written in 'sig' and 'sig' is returned,
+        otherwise 'sig' is left unchanged and a new array is returned.
 
     Returns
     -------
@@ -2905,41 +3832,31 @@ def makePinkRef(sig, fs, refHz):
     --------
      >>> noise = broadbandNoise(spectrumLevel=40, duration=180, ramp=10,
      ...     channel='Both', fs=48000, maxLevel=100)
-     >>> noise = makePink(sig=noise, fs=48000, refHz=1000)
+     >>> noise = makePinkRef(sig=noise, fs=48000, refHz=1000)
     
     """
     
+    if isinstance(sig, monoSound): #weight only the mono signal
+        x = makePinkRef(sig.sig[:, numpy.newaxis], fs, refHz, inPlace)
+        if inPlace == False:
+            sig = monoSound(x[:,0], sig.channel)
+        return sig
     nSamples = len(sig[:,0])
-    ref = 1 + (refHz * nSamples/fs)
-
-    x = rfft(sig[:,0])
-    idx = arange(1, len(x))
-    mag = zeros(len(x))
-    mag[1:len(x)] = abs(x[1:len(x)]) * sqrt(ref/idx)
-    mag[0] = abs(x[0])
-    ph = angle(x)
-    x = mag * (cos(ph) + 1j * sin(ph))
-    
-    sig0 = irfft(x)
-
-
-    x = rfft(sig[:,1])
-    idx = arange(1, len(x))
-    mag = zeros(len(x))
-    mag[1:len(x)] = abs(x[1:len(x)]) * sqrt(ref/idx)
-    mag[0] = abs(x[0])
-    ph = angle(x)
-    x = mag * (cos(ph) + 1j * sin(ph))
-
-    sig1 = irfft(x)
-
-    sig[:, 0] = sig0
-    sig[:, 1] = sig1
+    if inPlace == False:
+        sig = array(sig, dtype=_floatDtype(sig))
+    if nSamples < 2:
+        pass
+    else:
+        #weight both channels with a single transform
+        x = rfft(sig, nSamples, axis=0)
+        x *= _pinkWeights(nSamples, fs, refHz)[:, numpy.newaxis]
+        sig[:] = irfft(x, nSamples, axis=0)
     
     return sig
 
 
-def makeSilence(duration, fs):
+@_cachedSnd()
+def makeSilence(duration, fs, dtype=None):
     """
     Generate a silence.
 
@@ -2952,6 +3869,9 @@ def makeSilence(duration, fs):
         Duration of the silence in milliseconds.
     fs : int
         Samplig frequency in Hz.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
 
     Returns
     -------
@@ -2967,11 +3887,168 @@ def makeSilence(duration, fs):
     #duration in ms
     duration = duration / 1000 #convert from ms to sec
     nSamples = int(round(duration * fs))
-    snd = zeros((nSamples, 2))
+    snd = zeros((nSamples, 2), dtype=_sndDtype(dtype))
     
     return snd
 
 
+class monoSound():
+    """
+    A 1-dimensional signal together with the channel(s) in which it
+    is to be played.
+
+    Sounds that are played in one ear only, or that are identical in
+    the two ears, can be stored as a single channel, so that they take
+    half the memory and half the processing time of the equivalent
+    (nSamples, 2) array. `gate`, `scale`, `fir2Filt`, `getRms`, `makePink`,
+    `makePinkRef` and `soundTimeline` work directly on the single channel.
+    The (nSamples, 2) array is built only when it is needed: explicitly
+    with `toStereo`, or implicitly when the sound is indexed or converted
+    to an array (e.g. by numpy functions or by the audio backend).
+
+    Indexing returns a copy, but assignments to items of the sound
+    (e.g. ``snd[:,1] *= 0.5``) are written through to the signal, as
+    long as the sound is still played in the same channel(s) afterwards:
+    silent in the other channel, or identical in the two channels if
+    `channel` is 'Both'. Other assignments raise a TypeError, the sound
+    must then be converted with `toStereo` first.
+
+    Parameters
+    ----------
+    sig : 1-dimensional array of floats
+        The signal.
+    channel : string ('Right', 'Left' or 'Both')
+        Channel in which the signal will be played.
+
+    Examples
+    --------
+    >>> import sndlib
+    >>> sndlib.monoFirst = True
+    >>> pt = sndlib.pureTone(frequency=440, phase=0, level=65, duration=180,
+    ...     ramp=10, channel='Right', fs=48000, maxLevel=100)
+    >>> pt.shape
+    (9600, 2)
+    >>> snd = pt.toStereo()
+    
+    """
+    #let numpy defer to the arithmetic methods below instead of
+    #converting the sound to a stereo array
+    __array_ufunc__ = None
+
+    def __init__(self, sig, channel):
+        if channel not in ["Right", "Left", "Both"]:
+            raise TypeError("Invalid channel argument. Channel must be one of 'Right', 'Left' or 'Both'")
+        self.sig = sig
+        self.channel = channel
+
+    @property
+    def shape(self):
+        return (len(self.sig), 2)
+
+    @property
+    def ndim(self):
+        return 2
+
+    @property
+    def dtype(self):
+        return self.sig.dtype
+
+    def __len__(self):
+        return len(self.sig)
+
+    def toStereo(self, dtype=None):
+        """
+        Return the sound as a (nSamples, 2) array.
+
+        """
+        if dtype is None:
+            dtype = self.sig.dtype
+        return _monoToStereo(self.sig, self.channel, dtype)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.toStereo(dtype)
+
+    def __getitem__(self, key):
+        return self.toStereo()[key]
+
+    def __setitem__(self, key, value):
+        snd = self.toStereo()
+        snd[key] = value
+        #write through only if the sound is still a monoSound of the same channel
+        if self.channel == "Left":
+            isMono = not snd[:,1].any()
+            sig = snd[:,0]
+        elif self.channel == "Right":
+            isMono = not snd[:,0].any()
+            sig = snd[:,1]
+        else:
+            isMono = numpy.array_equal(snd[:,0], snd[:,1])
+            sig = snd[:,0]
+        if isMono == False:
+            raise TypeError("This assignment would make the monoSound differ from a sound played in the '" + self.channel + "' channel(s), convert it with toStereo first")
+        self.sig[:] = sig
+
+    def copy(self):
+        return monoSound(self.sig.copy(), self.channel)
+
+    def _monoFactor(self, other):
+        #return 'other' in a form that can be applied to the mono signal,
+        #or None if it is not the same for the two channels
+        #(the shapes accepted are those that broadcast against the
+        #(nSamples, 2) array)
+        if isinstance(other, monoSound):
+            return None
+        other = asarray(other)
+        if other.ndim == 0:
+            return other
+        elif other.ndim == 1 and len(other) == 1:
+            return other[0]
+        elif other.ndim == 1 and len(other) == 2:
+            #only the factor of the channel(s) in which the sound is played matters
+            if self.channel == "Left":
+                return other[0]
+            elif self.channel == "Right":
+                return other[1]
+            elif other[0] == other[1]:
+                return other[0]
+        elif other.ndim == 2 and other.shape[1] == 1 and other.shape[0] in [1, len(self.sig)]:
+            return other[:,0]
+        return None
+
+    def __mul__(self, other):
+        factor = self._monoFactor(other)
+        if factor is None:
+            return self.toStereo() * asarray(other)
+        return monoSound(self.sig * factor, self.channel)
+
+    __rmul__ = __mul__
+
+    def __imul__(self, other):
+        factor = self._monoFactor(other)
+        if factor is None:
+            raise TypeError("A monoSound cannot be multiplied in place by a factor that differs between the two channels, convert it with toStereo first")
+        self.sig *= factor
+        return self
+
+    def __add__(self, other):
+        if isinstance(other, monoSound) and other.channel == self.channel:
+            return monoSound(self.sig + other.sig, self.channel)
+        return self.toStereo() + asarray(other)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, monoSound) and other.channel == self.channel:
+            return monoSound(self.sig - other.sig, self.channel)
+        return self.toStereo() - asarray(other)
+
+    def __rsub__(self, other):
+        return asarray(other) - self.toStereo()
+
+    def __neg__(self):
+        return monoSound(-self.sig, self.channel)
+
+
 def nextpow2(x):
     """
     Next power of two.
@@ -3003,6 +4080,125 @@ def nextpow2(x):
 #    return n
 
 
+class noiseTokenPool():
+    """
+    A pool of pre-generated running noise that is refilled in the background.
+
+    A worker thread keeps at least 'poolSize' seconds of running noise
+    ready, so that noise tokens of any duration can be drawn without
+    generating them on the trial's critical path. Each token is made of
+    fresh samples that are never handed out again, unless 'frozen' is
+    True. If the pool runs dry the missing samples are generated in the
+    calling thread. Set the module-level `noisePool` variable to a pool
+    to have `broadbandNoise` and `expAMNoise` draw their noise from it.
+
+    Parameters
+    ----------
+    fs : int
+        Sampling frequency in Hz of the sounds that will use the noise.
+    poolSize : float
+        Duration in seconds of the noise kept ready in the pool.
+    frozen : logical
+        If True, every token is drawn from the start of the same
+        stretch of noise ("frozen noise"), so that tokens of the
+        same duration are identical.
+    seed : int or None
+        Seed of the random number generator of the pool.
+
+    Examples
+    --------
+    >>> import sndlib
+    >>> sndlib.noisePool = sndlib.noiseTokenPool(fs=48000, poolSize=10)
+    >>> noise = sndlib.broadbandNoise(spectrumLevel=40, duration=180, ramp=10,
+    ...     channel='Both', fs=48000, maxLevel=100)
+    >>> sndlib.noisePool.close()
+    >>> sndlib.noisePool = None
+
+    """
+    def __init__(self, fs, poolSize=10, frozen=False, seed=None):
+        self.fs = fs
+        self.frozen = frozen
+        self.poolSamples = int(round(poolSize * fs))
+        self.chunkSamples = max(1, min(self.poolSamples, 2**16))
+        self.rng = numpy.random.default_rng(seed)
+        self.rngLock = threading.Lock()
+        self.chunks = collections.deque()
+        self.nAvailable = 0
+        self.frozenNoise = zeros(0)
+        self.cond = threading.Condition()
+        self.running = True
+        if frozen == False:
+            self.worker = threading.Thread(target=self._refill, daemon=True)
+            self.worker.start()
+        else:
+            self.worker = None
+
+    def _generate(self, nSamples):
+        with self.rngLock:
+            return _runningNoise(nSamples, self.rng)
+
+    def _refill(self):
+        while True:
+            with self.cond:
+                while self.running == True and self.nAvailable >= self.poolSamples:
+                    self.cond.wait()
+                if self.running == False:
+                    return
+            chunk = self._generate(self.chunkSamples)
+            with self.cond:
+                self.chunks.append(chunk)
+                self.nAvailable += len(chunk)
+
+    def getNoise(self, nSamples):
+        """
+        Draw a noise token.
+
+        Parameters
+        ----------
+        nSamples : int
+            Number of samples of the token.
+
+        Returns
+        -------
+        noise : 1-dimensional array of floats
+            The noise token, scaled to a peak-equivalent amplitude
+            of 1, like the noise of `broadbandNoise`.
+
+        """
+        if self.frozen == True:
+            if len(self.frozenNoise) < nSamples:
+                self.frozenNoise = concatenate((self.frozenNoise, self._generate(nSamples - len(self.frozenNoise))))
+            return _normalizeNoise(self.frozenNoise[0:nSamples].copy())
+        noise = zeros(nSamples)
+        n = 0
+        with self.cond:
+            while n < nSamples and len(self.chunks) > 0:
+                chunk = self.chunks.popleft()
+                nTaken = min(len(chunk), nSamples - n)
+                noise[n:n+nTaken] = chunk[0:nTaken]
+                if nTaken < len(chunk):
+                    self.chunks.appendleft(chunk[nTaken:])
+                self.nAvailable -= nTaken
+                n += nTaken
+            self.cond.notify()
+        if n < nSamples: #the pool ran dry
+            noise[n:nSamples] = self._generate(nSamples - n)
+        return _normalizeNoise(noise)
+
+    def close(self):
+        """
+        Stop the refilling thread and empty the pool.
+
+        """
+        with self.cond:
+            self.running = False
+            self.chunks.clear()
+            self.nAvailable = 0
+            self.cond.notify()
+        if self.worker is not None:
+            self.worker.join()
+
+
 def phaseShift(sig, f1, f2, phaseShift, phaseShiftType, channel, fs):
     """
     Shift the interaural phases of a sound within a given frequency region.
@@ -3011,15 +4207,16 @@ def phaseShift(sig, f1, f2, phaseShift, phaseShiftType, channel, fs):
     ----------
     sig : array of floats
         Input signal.
-    f1 : float
+    f1 : float or array of floats
         The start point of the frequency region to be
-        phase-shifted in hertz.
-    f2 : float
+        phase-shifted in hertz. If an array is given, several
+        regions are shifted at once.
+    f2 : float or array of floats
         The end point of the frequency region to be
         phase-shifted in hertz.
     phaseShift : float
         The amount of phase shift in radians. 
-    phaseShiftType : string ('Linear', 'Step')
+    phaseShiftType : string ('Linear', 'Step', 'Random')
         If 'Linear' the phase changes progressively
         on a linear Hz scale from X to X+'phaseShift' from f1 to f2.
         If 'Stepped' 'phaseShift' is added as a constant to the
@@ -3035,95 +4232,48 @@ def phaseShift(sig, f1, f2, phaseShift, phaseShiftType, channel, fs):
     -------
     out : 2-dimensional array of floats
 
+    Notes
+    -----
+    The 'Linear' and 'Random' shifts are applied to each frequency
+    component between f1 and f2 as described above. Earlier versions
+    applied a single value to the whole region instead: no shift at
+    all for 'Linear', and one random shift shared by all components
+    for 'Random', so the output of these two types differs from that
+    of earlier versions. The output of 'Step' is unchanged.
+
     Examples
     --------
     >>> noise = broadbandNoise(spectrumLevel=40, duration=180, ramp=10,
     ...     channel='Both', fs=48000, maxLevel=100)
     >>> hp = phaseShift(sig=noise, f1=500, f2=600, phaseShift=3.14,
-            channel='Left', fs=48000) #this generates a Dichotic Pitch
+            phaseShiftType='Step', channel='Left', fs=48000) #this generates a Dichotic Pitch
     
     """
 
     nSamples = len(sig[:,0])
     fftPoints = 2**nextpow2(nSamples)
-    snd = zeros((nSamples, 2))
-    nUniquePnts = ceil((fftPoints+1)/2)
-    freqArray1 = arange(0, nUniquePnts, 1) * (fs / fftPoints)
-    freqArray2 = -arange(1, (nUniquePnts-1), 1)[::-1] * (fs / fftPoints) #remove DC offset and nyquist
-    sh1 = where((freqArray1>f1) & (freqArray1<f2))
-    sh2 = where((freqArray2<-f1) & (freqArray2>-f2))
-    p1Start = 0; p1End = len(freqArray1)
-    p2Start = len(freqArray1); p2End = fftPoints
-
+    snd = array(sig, dtype=_floatDtype(sig))
     if phaseShiftType == "Linear":
-        phaseShiftArray1 = linspace(0, phaseShift, len(sh1))
-        phaseShiftArray2 = - linspace(phaseShift, 0, len(sh2))
+        dichoticDifference = "IPD Linear"
     elif phaseShiftType == "Step":
-        phaseShiftArray1 = repeat(phaseShift, len(sh1))
-        phaseShiftArray2 = - repeat(phaseShift, len(sh1))
+        dichoticDifference = "IPD Stepped"
     elif phaseShiftType == "Random":
-        phaseShiftArray1 = numpy.random.uniform(0, phaseShift, len(sh1))
-        phaseShiftArray2 = -phaseShiftArray1[::-1]
+        dichoticDifference = "IPD Random"
+    else:
+        raise TypeError("Invalid 'phaseShiftType' argument. 'phaseShiftType' must be one of 'Linear', 'Step' or 'Random'")
+    mask = _dichoticPhaseMask(_rfftFreqs(fftPoints, fs), numpy.atleast_1d(f1), numpy.atleast_1d(f2), dichoticDifference, phaseShift)
 
     if channel == "Left":
-        x = fft(sig[:,0], fftPoints)
-        x1 = x[p1Start:p1End]
-        x2 = x[p2Start:p2End]
-        x1mag = abs(x1); x2mag = abs(x2)
-        x1Phase =  angle(x1); x2Phase =  angle(x2);
-        x1Phase[sh1] = x1Phase[sh1] + phaseShiftArray1
-        x2Phase[sh2] =  x2Phase[sh2] + phaseShiftArray2
-        x1 = x1mag * (cos(x1Phase) + (1j * sin(x1Phase)))
-        x2 = x2mag * (cos(x2Phase) + (1j * sin(x2Phase)))
-        x = concatenate((x1, x2))
-        x = real(ifft(x))
-        snd[:,0] = x[0:nSamples]
-        snd[:,1] = sig[:,1]
+        snd[:,0] = _rotatePhases(sig[:,0], mask, fftPoints)
     elif channel == "Right":
-        x = fft(sig[:,1], fftPoints)
-        x1 = x[p1Start:p1End]
-        x2 = x[p2Start:p2End]
-        x1mag = abs(x1); x2mag = abs(x2)
-        x1Phase =  angle(x1); x2Phase =  angle(x2);
-        x1Phase[sh1] = x1Phase[sh1] + phaseShiftArray1
-        x2Phase[sh2] = x2Phase[sh2] + phaseShiftArray2
-        x1 = x1mag * (cos(x1Phase) + (1j * sin(x1Phase)))
-        x2 = x2mag * (cos(x2Phase) + (1j * sin(x2Phase)))
-        x = concatenate((x1, x2))
-        x = real(ifft(x))
-        snd[:,1] = x[0:nSamples]
-        snd[:,0] = sig[:,0]
+        snd[:,1] = _rotatePhases(sig[:,1], mask, fftPoints)
     elif channel == "Both":
-        x = fft(sig[:,0], fftPoints)
-        x1 = x[p1Start:p1End]
-        x2 = x[p2Start:p2End]
-        x1mag = abs(x1); x2mag = abs(x2)
-        x1Phase =  angle(x1); x2Phase =  angle(x2);
-        x1Phase[sh1] = x1Phase[sh1] + phaseShiftArray1
-        x2Phase[sh2] = x2Phase[sh2] + phaseShiftArray2
-        x1 = x1mag * (cos(x1Phase) + (1j * sin(x1Phase)))
-        x2 = x2mag * (cos(x2Phase) + (1j * sin(x2Phase)))
-        x = concatenate((x1, x2))
-        x = real(ifft(x))
-        snd[:,0] = x[0:nSamples]
-
-        x = fft(sig[:,1], fftPoints)
-        x1 = x[p1Start:p1End]
-        x2 = x[p2Start:p2End]
-        x1mag = abs(x1); x2mag = abs(x2)
-        x1Phase =  angle(x1); x2Phase =  angle(x2);
-        x1Phase[sh1] = x1Phase[sh1] + phaseShiftArray1
-        x2Phase[sh2] = x2Phase[sh2] + phaseShiftArray2
-        x1 = x1mag * (cos(x1Phase) + (1j * sin(x1Phase)))
-        x2 = x2mag * (cos(x2Phase) + (1j * sin(x2Phase)))
-        x = concatenate((x1, x2))
-        x = real(ifft(x))
-        snd[:,1] = x[0:nSamples]
+        snd = _rotatePhases(snd, mask, fftPoints)
 
     return snd
 
 
-def pinkNoiseFromSin(compLevel, lowCmp, highCmp, spacing, duration, ramp, channel, fs, maxLevel):
+def pinkNoiseFromSin(compLevel, lowCmp, highCmp, spacing, duration, ramp, channel, fs, maxLevel, dtype=None):
     """
     Generate a pink noise by adding sinusoids spaced by a fixed
     interval in cents.
@@ -3150,6 +4300,9 @@ def pinkNoiseFromSin(compLevel, lowCmp, highCmp, spacing, duration, ramp, channe
         Samplig frequency in Hz.
     maxLevel : float
         Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
 
     Returns
     -------
@@ -3172,7 +4325,7 @@ def pinkNoiseFromSin(compLevel, lowCmp, highCmp, spacing, duration, ramp, channe
     nTot = nSamples + (nRamp * 2)
     timeAll = arange(0, nTot) / fs
     timeRamp = arange(0, nRamp) 
-    snd = zeros((nTot, 2))
+    snd = zeros((nTot, 2), dtype=_sndDtype(dtype))
     noisBandwidth = 1200*log2(highCmp/lowCmp) #in cents
     nComponents = int(floor(noisBandwidth/spacing))
     amp = 10**((compLevel - maxLevel) / 20)
@@ -3182,30 +4335,28 @@ def pinkNoiseFromSin(compLevel, lowCmp, highCmp, spacing, duration, ramp, channe
         freqs[i] = freqs[i-1]*(2**(spacing/1200.))
 
     phasesR = numpy.random.uniform(0, 2*pi, nComponents)
-    sinArray = zeros((nComponents, nTot))
-
-    for i in range(0, nComponents):
-        sinArray[i,] = amp* sin(2*pi*freqs[i] * timeAll + phasesR[i])
+    noise = amp * _sumPartials(timeAll, 2*pi*freqs, phasesR)
+    _applyRamps(noise, nRamp)
     
     if channel == "Right":
-        snd[:,1] = sum(sinArray,0)
+        snd[:,1] = noise
     elif channel == "Left":
-        snd[:,0] = sum(sinArray,0)
+        snd[:,0] = noise
     elif channel == "Both":
-        snd[:,1] = sum(sinArray,0)
+        snd[:,1] = noise
         snd[:,0] = snd[:,1]
-    snd = gate(ramp, snd, fs)    
     return snd
 
 
-def pinkNoiseFromSin2(compLevel, lowCmp, highCmp, spacing, duration, ramp, channel, fs, maxLevel):
+def pinkNoiseFromSin2(compLevel, lowCmp, highCmp, spacing, duration, ramp, channel, fs, maxLevel, dtype=None):
     """
     Generate a pink noise by adding sinusoids spaced by a fixed
     interval in cents.
 
-    This function should produce the same output of pinkNoiseFromSin,
-    it simply uses a different algorithm that uses matrix operations
-    instead of a for loop. It doesn't seem to be much faster though.
+    This function produces the same output of pinkNoiseFromSin.
+    It was originally an alternative implementation based on matrix
+    operations; both functions now sum the sinusoids in blocks of
+    bounded size.
 
     Parameters
     ----------
@@ -3229,6 +4380,9 @@ def pinkNoiseFromSin2(compLevel, lowCmp, highCmp, spacing, duration, ramp, chann
         Samplig frequency in Hz.
     maxLevel : float
         Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
 
     Returns
     -------
@@ -3250,38 +4404,30 @@ def pinkNoiseFromSin2(compLevel, lowCmp, highCmp, spacing, duration, ramp, chann
     nRamp = int(round(sRamp * fs))
     nTot = nSamples + (nRamp * 2)
     timeAll = arange(0, nTot) / fs
-    snd = zeros((nTot, 2))
+    snd = zeros((nTot, 2), dtype=_sndDtype(dtype))
     noisBandwidth = 1200*log2(highCmp/lowCmp) #in cents
     nComponents = int(floor(noisBandwidth/spacing))
     amp = 10**((compLevel - maxLevel) / 20)
-    freqs = zeros((nComponents,1))
+    freqs = zeros(nComponents)
     freqs[0] = lowCmp
     for i in range(1, nComponents): #indexing starts from 1
         freqs[i] = freqs[i-1]*(2**(spacing/1200.))
-    #freqs = freqs.reshape(nComponents,1)
-    phasesR = numpy.random.uniform(0, 2*pi, (nComponents,1))
-    #phasesR = phasesR.reshape(nComponents,1)
-    sinMatrix = zeros((nComponents, nTot))
-    timeMatrix = zeros((nComponents, nTot))
-    timeMatrix[:] = timeAll
-
-    #for i in range(0, nComponents):
-    #    sinMatrix[i,] = amp* sin(2*pi*freqs[i] * timeAll + phasesR[i])
-
-    sinMatrix = amp*sin(2*pi*freqs*timeMatrix+phasesR)
+    phasesR = numpy.random.uniform(0, 2*pi, nComponents)
+    noise = amp * _sumPartials(timeAll, 2*pi*freqs, phasesR)
+    _applyRamps(noise, nRamp)
     
     if channel == "Right":
-        snd[:,1] = sum(sinMatrix,0)
+        snd[:,1] = noise
     elif channel == "Left":
-        snd[:,0] = sum(sinMatrix,0)
+        snd[:,0] = noise
     elif channel == "Both":
-        snd[:,1] = sum(sinMatrix,0)
+        snd[:,1] = noise
         snd[:,0] = snd[:,1]
-    snd = gate(ramp, snd, fs)    
     return snd
 
 
-def pureTone(frequency, phase, level, duration, ramp, channel, fs, maxLevel):
+@_cachedSnd()
+def pureTone(frequency, phase, level, duration, ramp, channel, fs, maxLevel, dtype=None):
     """
     Synthetise a pure tone.
 
@@ -3304,6 +4450,9 @@ def pureTone(frequency, phase, level, duration, ramp, channel, fs, maxLevel):
         Samplig frequency in Hz.
     maxLevel : float
         Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
 
     Returns
     -------
@@ -3332,27 +4481,146 @@ def pureTone(frequency, phase, level, duration, ramp, channel, fs, maxLevel):
     nTot = nSamples + (nRamp * 2)
 
     timeAll = arange(0, nTot) / fs
-    timeRamp = arange(0, nRamp) 
 
-    snd = zeros((nTot, 2))
-    if channel == "Right":
-        snd[0:nRamp, 1] = amp * ((1-cos(pi * timeRamp/nRamp))/2) * sin(2*pi*frequency * timeAll[0:nRamp] + phase)
-        snd[nRamp:nRamp+nSamples, 1] = amp* sin(2*pi*frequency * timeAll[nRamp:nRamp+nSamples] + phase)
-        snd[nRamp+nSamples:len(timeAll), 1] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * sin(2*pi*frequency * timeAll[nRamp+nSamples:len(timeAll)] + phase)
-    elif channel == "Left":
-        snd[0:nRamp, 0] = amp * ((1-cos(pi * timeRamp/nRamp))/2) * sin(2*pi*frequency * timeAll[0:nRamp] + phase)
-        snd[nRamp:nRamp+nSamples, 0] = amp* sin(2*pi*frequency * timeAll[nRamp:nRamp+nSamples] + phase)
-        snd[nRamp+nSamples:len(timeAll), 0] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * sin(2*pi*frequency * timeAll[nRamp+nSamples:len(timeAll)] + phase)
-    elif channel == "Both":
-        snd[0:nRamp, 0] = amp * ((1-cos(pi * timeRamp/nRamp))/2) * sin(2*pi*frequency * timeAll[0:nRamp] + phase)
-        snd[nRamp:nRamp+nSamples, 0] = amp* sin(2*pi*frequency * timeAll[nRamp:nRamp+nSamples] + phase)
-        snd[nRamp+nSamples:len(timeAll), 0] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * sin(2*pi*frequency * timeAll[nRamp+nSamples:len(timeAll)] + phase)
-        snd[:, 1] = snd[:, 0]
+    tone = amp * sin(2*pi*frequency * timeAll + phase)
+    _applyRamps(tone, nRamp)
+    snd = _makeSnd(tone, channel, dtype)
        
 
     return snd
 
 
+def pureToneBatch(frequency, phase, level, duration, ramp, channel, fs, maxLevel, dtype=None):
+    """
+    Synthetise a batch of pure tones differing in frequency, phase
+    and/or level, see `pureTone`.
+
+    All the stimuli share the same duration, ramps and channel, so
+    that the time vector and the ramps are computed only once, and
+    the stimuli are synthetised together in blocks of at most
+    `synthBlockSize` elements.
+
+    Parameters
+    ----------
+    frequency : float or array of floats
+        Tone frequencies in hertz.
+    phase : float or array of floats
+        Starting phases in radians.
+    level : float or array of floats
+        Tone levels in dB SPL.
+    duration : float
+        Tone duration (excluding ramps) in milliseconds.
+    ramp : float
+        Duration of the onset and offset ramps in milliseconds.
+        The total duration of the sound will be duration+ramp*2.
+    channel : string ('Right', 'Left' or 'Both')
+        Channel in which the tones will be generated.
+    fs : int
+        Samplig frequency in Hz.
+    maxLevel : float
+        Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
+
+    Returns
+    -------
+    snd : 3-dimensional array of floats
+        The array has dimensions (nStim, nSamples, 2), where nStim is
+        the length of the broadcast per-stimulus parameters.
+
+    Examples
+    --------
+    >>> pts = pureToneBatch(frequency=numpy.linspace(250, 8000, 500),
+    ...     phase=0, level=65, duration=180, ramp=10, channel='Right',
+    ...     fs=48000, maxLevel=100)
+    >>> pts.shape
+    (500, 9600, 2)
+    
+    """
+    frequency, phase, level = _batchParams(frequency, phase, level)
+    nRamp, timeAll = _batchTimes(duration, ramp, fs)
+    nTot = len(timeAll)
+    amp = 10**((level - maxLevel) / 20.)
+
+    tones = zeros((len(frequency), nTot))
+    stimStep = max(1, synthBlockSize // max(1, nTot))
+    for i in range(0, len(frequency), stimStep):
+        block = tones[i:i+stimStep]
+        numpy.multiply.outer(2*pi*frequency[i:i+stimStep], timeAll, out=block)
+        block += phase[i:i+stimStep, numpy.newaxis]
+        sin(block, out=block)
+        block *= amp[i:i+stimStep, numpy.newaxis]
+    _applyRamps(tones.T, nRamp)
+    snd = _batchToStereo(tones, channel, dtype)
+
+    return snd
+
+
+def pureToneStream(frequency, phase, level, duration, ramp, channel, fs, maxLevel, blockSize=None, dtype=None):
+    """
+    Synthetise a pure tone block by block.
+
+    Instead of returning the whole sound, the generator yields it in
+    consecutive stereo blocks as it is synthetised, so that memory
+    usage does not grow with the duration of the sound and playback
+    (see `audioManager.playStream`) can start as soon as the first
+    block is ready. The phase of the signal is continuous across
+    blocks, the samples are the same as those of `pureTone`.
+
+    Parameters
+    ----------
+    frequency : float
+        Tone frequency in hertz.
+    phase : float
+        Starting phase in radians.
+    level : float
+        Tone level in dB SPL.
+    duration : float
+        Sound duration (excluding ramps) in milliseconds.
+    ramp : float
+        Duration of the onset and offset ramps in milliseconds.
+        The total duration of the sound will be duration+ramp*2.
+    channel : string ('Right', 'Left' or 'Both')
+        Channel in which the sound will be generated.
+    fs : int
+        Samplig frequency in Hz.
+    maxLevel : float
+        Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+    blockSize : int or None
+        Number of samples of each block. If None, the module-level
+        `streamBlockSize` setting is used.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
+
+    Returns
+    -------
+    blocks : generator
+        Generator of 2-dimensional arrays of floats with dimensions
+        (blockSize, 2). The last block can be shorter.
+
+    Examples
+    --------
+    >>> for block in pureToneStream(frequency=440, phase=0, level=65,
+    ...     duration=60000, ramp=10, channel='Right', fs=96000, maxLevel=100):
+    ...     pass
+    
+    """
+    amp = 10**((level - maxLevel) / 20.)
+    duration = duration / 1000 #convert from ms to sec
+    ramp = ramp / 1000
+
+    nSamples = int(round(duration * fs))
+    nRamp = int(round(ramp * fs))
+    nTot = nSamples + (nRamp * 2)
+
+    def blockFunc(n):
+        return amp * sin(2*pi*frequency * (n / fs) + phase)
+
+    return _streamBlocks(nTot, nRamp, channel, blockFunc, blockSize, dtype)
+
+
 def scale(level, sig):
     """
     Increase or decrease the amplitude of a sound signal.
@@ -3382,11 +4650,376 @@ def scale(level, sig):
     return sig
 
 
-def steepNoise(frequency1, frequency2, level, duration, ramp, channel, fs, maxLevel):
+def sndCacheInfo():
+    """
+    Return the state of the cache of the deterministic generators.
+
+    The cache is disabled by default, it can be enabled by setting
+    the module-level `sndCacheSize` variable to the maximum number of
+    bytes of sounds to keep in the cache. The cached generators are
+    `AMTone`, `binauralPureTone`, `camSinFMComplex`, `camSinFMTone`,
+    `chirp`, `complexTone`, `complexToneParallel`, `expSinFMComplex`,
+    `expSinFMTone`, `fm_complex1`, `fm_complex2`, `FMTone`, `glide`,
+    `makeSilence` and `pureTone`; calls with random harmonic phases are
+    not cached. The sounds returned while the cache is enabled are
+    read-only, they must be copied before being modified in place.
+
+    Returns
+    -------
+    info : dict
+        A dictionary with the number of cache 'hits', 'misses' and
+        'evictions', the number of sounds ('entries') and of 'bytes'
+        currently in the cache, and the cache size ('maxBytes').
+
+    Examples
+    --------
+    >>> import sndlib
+    >>> sndlib.sndCacheSize = 2**28
+    >>> pt = sndlib.pureTone(frequency=440, phase=0, level=65, duration=180,
+    ...     ramp=10, channel='Right', fs=48000, maxLevel=100)
+    >>> pt = sndlib.pureTone(frequency=440, phase=0, level=65, duration=180,
+    ...     ramp=10, channel='Right', fs=48000, maxLevel=100)
+    >>> sndlib.sndCacheInfo()["hits"]
+    1
+
+    """
+    with _sndCacheLock:
+        info = dict(_sndCacheStats)
+        info["entries"] = len(_sndCache)
+    info["maxBytes"] = sndCacheSize
+
+    return info
+
+
+class soundTimeline():
+    """
+    Mix a set of sounds, each starting at a given time, into a single sound.
+
+    The sounds are only scheduled by `add` and `addAtSample`, the output
+    buffer is allocated once by `mix`, with the length needed to hold all
+    the sounds, and each sound is then added in place at its offset. This
+    avoids copying a growing array every time a sound is appended.
+
+    Parameters
+    ----------
+    fs : int
+        Sampling frequency of the sounds in Hz.
+
+    Attributes
+    ----------
+    nSamples : int
+        Current length of the timeline in samples, that is
+        the offset of the last sample of the latest ending sound, plus one.
+
+    Examples
+    --------
+    >>> pt1 = pureTone(frequency=440, phase=0, level=65, duration=180,
+    ...       ramp=10, channel='Right', fs=48000, maxLevel=100)
+    >>> pt2 = pureTone(frequency=880, phase=0, level=65, duration=180,
+    ...       ramp=10, channel='Right', fs=48000, maxLevel=100)
+    >>> tl = soundTimeline(fs=48000)
+    >>> tl.add(pt1, onset=0)
+    >>> tl.add(pt2, onset=100)
+    >>> snd = tl.mix()
+    
+    """
+    def __init__(self, fs):
+        self.fs = fs
+        self.sounds = []
+        self.offsets = []
+        self.nSamples = 0
+
+    def add(self, snd, onset):
+        """
+        Schedule a sound at a given onset time.
+
+        Parameters
+        ----------
+        snd : array of floats
+            The sound to add.
+        onset : float
+            Onset of the sound in milliseconds from the start of the timeline.
+
+        """
+        self.addAtSample(snd, int(round(onset / 1000 * self.fs)))
+
+    def addAtSample(self, snd, offset):
+        """
+        Schedule a sound at a given sample offset.
+
+        Parameters
+        ----------
+        snd : array of floats
+            The sound to add.
+        offset : int
+            Sample number of the timeline at which the sound starts.
+
+        """
+        self.sounds.append(snd)
+        self.offsets.append(offset)
+        self.nSamples = max(self.nSamples, offset + snd.shape[0])
+
+    def mix(self):
+        """
+        Mix the scheduled sounds.
+
+        Returns
+        -------
+        snd : array of floats
+            The array has dimensions (nSamples, nChannels).
+
+        """
+        if len(self.sounds) == 0:
+            return zeros((0, 2))
+        snd = zeros((self.nSamples,) + self.sounds[0].shape[1:], dtype=numpy.result_type(*[s.dtype for s in self.sounds]))
+        for i in range(len(self.sounds)):
+            thisSnd = self.sounds[i]
+            thisSeg = snd[self.offsets[i]:self.offsets[i]+thisSnd.shape[0]]
+            if isinstance(thisSnd, monoSound):
+                if thisSnd.channel in ["Left", "Both"]:
+                    thisSeg[:,0] += thisSnd.sig
+                if thisSnd.channel in ["Right", "Both"]:
+                    thisSeg[:,1] += thisSnd.sig
+            else:
+                thisSeg += thisSnd
+
+        return snd
+
+
+class spectrumBuilder():
+    """
+    Compose a stimulus in the frequency domain and render it with a
+    single inverse FFT per ear.
+
+    The spectrum lies on the frequency grid of an FFT as long as the
+    sound (i.e. the components are spaced by 1/(duration+ramp*2) Hz),
+    so that bands of noise made of random-phase components can be
+    shaped, routed and shifted interaurally without any zero padding,
+    and without a forward FFT. The frequency axis is cached and shared
+    with the other spectral functions of the module. The methods that
+    modify the spectrum return the builder itself, so that calls can be
+    chained.
+
+    Parameters
+    ----------
+    duration : float
+        Sound duration (excluding ramps) in milliseconds.
+    ramp : float
+        Duration of the onset and offset ramps in milliseconds.
+        The total duration of the sound will be duration+ramp*2.
+    fs : int
+        Samplig frequency in Hz.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
+
+    Examples
+    --------
+    >>> sb = spectrumBuilder(duration=480, ramp=10, fs=48000)
+    >>> sb = sb.addBand(frequency1=200, frequency2=4000, level=40,
+    ...     maxLevel=100, slope=-3)
+    >>> sb = sb.shiftPhase(frequency1=500, frequency2=550, phaseShift=pi,
+    ...     phaseShiftType='Step', channel='Left') #Huggins pitch
+    >>> snd = sb.render()
+
+    """
+    def __init__(self, duration, ramp, fs, dtype=None):
+        self.fs = fs
+        self.dtype = _sndDtype(dtype)
+        duration = duration/1000 #convert from ms to sec
+        ramp = ramp/1000
+        self.totDur = duration + (2 * ramp)
+        self.nRamp = int(round(ramp * fs))
+        self.nTot = int(round(duration * fs)) + (self.nRamp * 2)
+        self.freqs = _rfftFreqs(self.nTot, fs)
+        #complex amplitude (the sum of those of the bands added to
+        #each bin) and interaural phase shift of each component in
+        #the left (0) and right (1) ear
+        self.components = zeros((2, len(self.freqs)), dtype=complex)
+        self.earPhases = zeros((2, len(self.freqs)))
+
+    def _earIdx(self, channel):
+        if channel == "Left":
+            return [0]
+        elif channel == "Right":
+            return [1]
+        elif channel == "Both":
+            return [0, 1]
+        else:
+            raise TypeError("Invalid channel argument. Channel must be one of 'Right', 'Left' or 'Both'")
+
+    def addBand(self, frequency1, frequency2, level, maxLevel, slope=0, phase="Random", channel="Both"):
+        """
+        Add a band of sinusoidal components, one on each FFT bin
+        from 'frequency1' to 'frequency2'.
+
+        The components are summed with those of the bands already
+        added. Random phases are drawn independently for each call,
+        so two noise bands added to the same bins, or to different
+        ears with separate calls, are uncorrelated.
+
+        Parameters
+        ----------
+        frequency1 : float
+            Start frequency of the band in hertz.
+        frequency2 : float
+            End frequency of the band in hertz.
+        level : float
+            Spectrum level of the band at 'frequency1' in dB SPL.
+        maxLevel : float
+            Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+        slope : float
+            Spectral slope of the band in dB/octave.
+        phase : 'Random' or float
+            Starting phase of the components in radians. If 'Random'
+            each component gets a random phase, giving a noise band
+            like that of `steepNoise`.
+        channel : string ('Right', 'Left' or 'Both')
+            Channel in which the band will be played.
+
+        Returns
+        -------
+        self : spectrumBuilder
+
+        """
+        ears = self._earIdx(channel)
+        amp, bins = _steepNoiseComponents(frequency1, frequency2, level, self.totDur, self.nTot, self.fs, maxLevel)
+        if phase == "Random":
+            phases = numpy.random.random(len(bins)) * 2 * pi
+        else:
+            phases = phase
+        if slope != 0:
+            #the slope is referenced to the first component above DC
+            fRef = max(frequency1, self.fs/self.nTot)
+            amp = amp * 10**((slope * log2(numpy.maximum(self.freqs[bins], fRef) / fRef)) / 20)
+        for ear in ears:
+            self.components[ear, bins] += amp * exp(1j*phases)
+
+        return self
+
+    def shiftPhase(self, frequency1, frequency2, phaseShift, phaseShiftType, channel):
+        """
+        Shift the phases of the components in one or both ears
+        within a frequency region, see `phaseShift`.
+
+        Parameters
+        ----------
+        frequency1 : float or array of floats
+            Start frequency of the region(s) in hertz.
+        frequency2 : float or array of floats
+            End frequency of the region(s) in hertz.
+        phaseShift : float
+            The amount of phase shift in radians.
+        phaseShiftType : string ('Linear', 'Step', 'Random')
+            Type of phase shift, see `phaseShift`.
+        channel : string ('Right', 'Left' or 'Both')
+            The channel in which to apply the phase shift.
+
+        Returns
+        -------
+        self : spectrumBuilder
+
+        """
+        if phaseShiftType == "Linear":
+            dichoticDifference = "IPD Linear"
+        elif phaseShiftType == "Step":
+            dichoticDifference = "IPD Stepped"
+        elif phaseShiftType == "Random":
+            dichoticDifference = "IPD Random"
+        else:
+            raise TypeError("Invalid 'phaseShiftType' argument. 'phaseShiftType' must be one of 'Linear', 'Step' or 'Random'")
+        mask = _dichoticPhaseMask(self.freqs, numpy.atleast_1d(frequency1), numpy.atleast_1d(frequency2), dichoticDifference, phaseShift)
+        for ear in self._earIdx(channel):
+            self.earPhases[ear] += mask
+
+        return self
+
+    def shiftITD(self, frequency1, frequency2, ITD, channel):
+        """
+        Delay the components in one or both ears within a frequency
+        region, see `ITDShift`.
+
+        Parameters
+        ----------
+        frequency1 : float or array of floats
+            Start frequency of the region(s) in hertz.
+        frequency2 : float or array of floats
+            End frequency of the region(s) in hertz.
+        ITD : float
+            The amount of ITD shift in microseconds.
+        channel : string ('Right', 'Left' or 'Both')
+            The channel in which to apply the shift.
+
+        Returns
+        -------
+        self : spectrumBuilder
+
+        """
+        mask = _dichoticPhaseMask(self.freqs, numpy.atleast_1d(frequency1), numpy.atleast_1d(frequency2), "ITD", ITD)
+        for ear in self._earIdx(channel):
+            self.earPhases[ear] += mask
+
+        return self
+
+    def _spectrum(self, ear):
+        #same scaling as _sinesFromSpectrum, the DC and Nyquist bins are real
+        nTot = self.nTot
+        bins = numpy.flatnonzero(self.components[ear])
+        components = self.components[ear, bins] * exp(1j*self.earPhases[ear, bins])
+        spectrum = zeros(len(self.freqs), dtype=complex)
+        spectrum[bins] = components * (nTot/2) * exp(-1j*pi/2)
+        edge = (bins == 0) | (2*bins == nTot)
+        spectrum[bins[edge]] = nTot * components[edge].imag
+        return spectrum
+
+    def render(self):
+        """
+        Render the sound with one inverse FFT per ear, and gate it.
+
+        Returns
+        -------
+        snd : 2-dimensional array of floats
+            The array has dimensions (nSamples, 2). Sounds that are
+            silent in one ear, or identical in the two ears, are
+            computed only once (and returned as a monoSound if the
+            module-level `monoFirst` setting is True).
+
+        """
+        silent = [not self.components[ear].any() for ear in [0, 1]]
+        sameEars = numpy.array_equal(self.components[0], self.components[1]) and numpy.array_equal(self.earPhases[0], self.earPhases[1])
+        if sameEars == True or silent[0] == True or silent[1] == True:
+            if sameEars == True:
+                ear = 0; channel = "Both"
+            elif silent[0] == True:
+                ear = 1; channel = "Right"
+            else:
+                ear = 0; channel = "Left"
+            sig = irfft(self._spectrum(ear), self.nTot)
+            _applyRamps(sig, self.nRamp)
+            snd = _makeSnd(sig, channel, self.dtype)
+        else:
+            spectrum = numpy.stack((self._spectrum(0), self._spectrum(1)), axis=1)
+            snd = irfft(spectrum, self.nTot, axis=0)
+            _applyRamps(snd, self.nRamp)
+            snd = snd.astype(self.dtype, copy=False)
+
+        return snd
+
+
+def steepNoise(frequency1, frequency2, level, duration, ramp, channel, fs, maxLevel, method="FFT", dtype=None):
     """
     Synthetise band-limited noise from the addition of random-phase
     sinusoids.
 
+    The sinusoids are spaced by 1/D Hz, where D is the total duration of
+    the sound. By default, they are synthetised at once by filling the
+    corresponding bins of a random-phase spectrum and performing a single
+    inverse FFT. In this case the frequency of each sinusoid is rounded
+    to the closest FFT bin (the bin spacing is fs/nSamples, which differs
+    from 1/D only for the rounding of the duration to an integer number of
+    samples). The original algorithm, summing one sinusoid at a time, can
+    be selected with method='Sinusoids'.
+
     Parameters
     ----------
     frequency1 : float
@@ -3406,6 +5039,13 @@ def steepNoise(frequency1, frequency2, level, duration, ramp, channel, fs, maxLe
         Samplig frequency in Hz.
     maxLevel : float
         Level in dB SPL output by the soundcard for a sinusoid of amplitude 1.
+    method : string ('FFT' or 'Sinusoids')
+        Synthesis method. 'FFT' builds the noise spectrum and performs
+        one inverse FFT. 'Sinusoids' adds the random-phase sinusoids
+        in the time domain.
+    dtype : numpy dtype or None
+        Floating point type of the output. If None, the
+        module-level `sndDtype` setting is used.
 
     Returns
     -------
@@ -3419,6 +5059,11 @@ def steepNoise(frequency1, frequency2, level, duration, ramp, channel, fs, maxLe
     
     """
 
+    if method == "FFT":
+        sb = spectrumBuilder(duration, ramp, fs, dtype)
+        sb.addBand(frequency1, frequency2, level, maxLevel, channel=channel)
+        return sb.render()
+
     duration = duration/1000 #convert from ms to sec
     ramp = ramp/1000
 
@@ -3429,45 +5074,18 @@ def steepNoise(frequency1, frequency2, level, duration, ramp, channel, fs, maxLe
 
     spacing = 1 / totDur
     components = 1 + floor((frequency2 - frequency1) / spacing)
-    # SL = 10*log10(A^2/NHz) 
-    # SL/10 = log10(A^2/NHz)
-    # 10^(SL/10) = A^2/NHz
-    # A^2 = 10^(SL/10) * NHz
-    # RMS = 10^(SL/20) * sqrt(NHz) where NHz is the spacing between harmonics
     amp =  10**((level - maxLevel) / 20) * sqrt((frequency2 - frequency1) / components)
     
-    timeAll = arange(0, nTot) / fs
-    timeRamp = arange(0, nRamp)
-    snd = zeros((nTot, 2))
-
-    noise= zeros(nTot)
-    for f in arange(frequency1, frequency2+spacing, spacing):
-        radFreq = 2 * pi * f 
-        phase = numpy.random.random(1) * 2 * pi
-        noise = noise + sin(phase + (radFreq * timeAll))
+    if method == "Sinusoids":
+        timeAll = arange(0, nTot) / fs
+        freqs = arange(frequency1, frequency2+spacing, spacing)
+        phases = numpy.random.random(len(freqs)) * 2 * pi
+        noise = _sumPartials(timeAll, 2 * pi * freqs, phases)
+    else:
+        raise TypeError("Invalid 'method' argument. 'method' must be one of 'FFT' or 'Sinusoids'")
 
-    if channel == "Right":
-        snd[0:nRamp, 1] = amp * ((1-cos(pi * timeRamp/nRamp))/2) * noise[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 1] = amp * noise[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:len(timeAll), 1] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * noise[nRamp+nSamples:len(timeAll)]
-    elif channel == "Left":
-        snd[0:nRamp, 0] = amp * ((1-cos(pi * timeRamp/nRamp))/2) * noise[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 0] = amp * noise[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:len(timeAll), 0] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * noise[nRamp+nSamples:len(timeAll)]
-    elif channel == "Both":
-        snd[0:nRamp, 1] = amp * ((1-cos(pi * timeRamp/nRamp))/2) * noise[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 1] = amp * noise[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:len(timeAll), 1] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * noise[nRamp+nSamples:len(timeAll)]
-        snd[0:nRamp, 0] = amp * ((1-cos(pi * timeRamp/nRamp))/2) * noise[0:nRamp]
-        snd[nRamp:nRamp+nSamples, 0] = amp * noise[nRamp:nRamp+nSamples]
-        snd[nRamp+nSamples:len(timeAll), 0] = amp * ((1+cos(pi * timeRamp/nRamp))/2) * noise[nRamp+nSamples:len(timeAll)]
+    noise = amp * noise
+    _applyRamps(noise, nRamp)
+    snd = _makeSnd(noise, channel, dtype)
 
     return snd
-
- 
-   
-
-
-
-
-
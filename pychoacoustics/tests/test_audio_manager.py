@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2008-2014 Samuele Carcagno <sam.carcagno@gmail.com>
+#   This file is part of pychoacoustics
+
+#   pychoacoustics is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+
+#   pychoacoustics is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+
+#   You should have received a copy of the GNU General Public License
+#   along with pychoacoustics.  If not, see <http://www.gnu.org/licenses/>.
+
+#Timing of the events of audioManager.writeWithEvents, on a stub stream
+#whose writer, like that of outputStream, takes whole periods only, and
+#whose device plays them instantly.
+
+import types
+import numpy
+import pytest
+from pychoacoustics.pyqtver import pyqtversion
+
+pytest.importorskip({4: "PyQt4.QtCore", -4: "PySide.QtCore", 5: "PyQt5.QtCore"}[pyqtversion])
+from pychoacoustics import audio_manager
+
+class stubStream():
+    periodSize = 1024
+    def __init__(self):
+        self.nSubmitted = 0
+        self.nQueued = 0
+        self.nWritten = 0
+    def _writePeriods(self):
+        nFrames = (self.nQueued // self.periodSize) * self.periodSize
+        self.nQueued -= nFrames
+        self.nWritten += nFrames
+    def framesSubmitted(self):
+        return self.nSubmitted
+    def framesWritten(self):
+        return self.nWritten
+    def framesPlayed(self):
+        return self.nWritten
+    def writeSound(self, snd, dither=False, nDiscards=None):
+        self.nSubmitted += snd.shape[0]
+        self.nQueued += snd.shape[0]
+        self._writePeriods()
+    def writeSilence(self, nFrames, nDiscards=None):
+        self.writeSound(numpy.zeros((nFrames, 2)))
+    def endSound(self, nDiscards=None):
+        self.writeSilence((-self.nQueued) % self.periodSize)
+    def waitPlayed(self, nFrames, nDiscards=None):
+        if self.nWritten < nFrames:
+            raise AssertionError("waitPlayed would block forever")
+
+@pytest.mark.parametrize("nSamples", [48100, 48128, 1000])
+def test_writeWithEvents_last_period(nSamples):
+    prm = {"pref": {"sound": {"wavmanager": "scipy", "playCommand": "pyaudio", "dither": False}}}
+    manager = audio_manager.audioManager(types.SimpleNamespace(prm=prm))
+    stream = stubStream()
+    stream.writeSound(numpy.zeros((500, 2))) #a previous sound
+    fired = []
+    events = [(nSamples, lambda: fired.append("end")),
+              (0, lambda: fired.append("on")),
+              (nSamples-10, lambda: fired.append("off"))]
+    manager.writeWithEvents(stream, numpy.zeros((nSamples, 2)), events)
+    assert fired == ["on", "off", "end"]
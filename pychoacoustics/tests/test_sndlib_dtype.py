@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2008-2014 Samuele Carcagno <sam.carcagno@gmail.com>
+#   This file is part of pychoacoustics
+
+#   pychoacoustics is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+
+#   pychoacoustics is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+
+#   You should have received a copy of the GNU General Public License
+#   along with pychoacoustics.  If not, see <http://www.gnu.org/licenses/>.
+
+#The generators must give the same calibrated levels in single and in
+#double precision: each sound is generated in float32 and in float64 from
+#the same seed, and the RMS levels of its channels must agree within 0.01 dB.
+
+import numpy
+import pytest
+from pychoacoustics import sndlib
+
+fs = 48000
+maxLevel = 100
+
+generators = {
+    "pureTone": lambda dtype: sndlib.pureTone(440, 0, 60, 200, 10, "Both", fs, maxLevel, dtype=dtype),
+    "binauralPureTone": lambda dtype: sndlib.binauralPureTone(440, 0, 60, 200, 10, "Both", 300, "Right", 6, "Left", fs, maxLevel, dtype=dtype),
+    "complexTone": lambda dtype: sndlib.complexTone(200, "Random", 1, 10, 0, 60, 200, 10, "Odd Left", fs, maxLevel, dtype=dtype),
+    "AMTone": lambda dtype: sndlib.AMTone(1000, 20, 1, 0, 0, 60, 200, 10, "Both", fs, maxLevel, dtype=dtype),
+    "FMTone": lambda dtype: sndlib.FMTone(1000, 40, 1, 0, 60, 200, 10, "Both", fs, maxLevel, dtype=dtype),
+    "chirp": lambda dtype: sndlib.chirp(440, "linear", 1000, 60, 200, 0, 10, "Both", fs, maxLevel, dtype=dtype),
+    "glide": lambda dtype: sndlib.glide(440, "exponential", 1200, 60, 200, 0, 10, "Both", fs, maxLevel, dtype=dtype),
+    "expSinFMTone": lambda dtype: sndlib.expSinFMTone(1000, 40, 1200, 0, 0, 60, 200, 10, "Both", fs, maxLevel, dtype=dtype),
+    "expSinFMComplex": lambda dtype: sndlib.expSinFMComplex(200, 1, 8, "Sine", 5, 1200, 0, 60, 200, 10, "Both", fs, maxLevel, dtype=dtype),
+    "camSinFMTone": lambda dtype: sndlib.camSinFMTone(1000, 5, 1, 0, 0, 60, 200, 10, "Both", fs, maxLevel, dtype=dtype),
+    "camSinFMComplex": lambda dtype: sndlib.camSinFMComplex(200, 1, 8, "Sine", 5, 1, 0, 60, 200, 10, "Both", fs, maxLevel, dtype=dtype),
+    "fm_complex1": lambda dtype: sndlib.fm_complex1(200, "Sine", 1, 8, 60, 400, 10, 5, 0.1, 0, 100, 200, False, "Both", fs, maxLevel, dtype=dtype),
+    "fm_complex2": lambda dtype: sndlib.fm_complex2(200, "Sine", 1, 8, 60, 400, 10, 5, 0.1, 0, 100, 200, False, "Both", fs, maxLevel, dtype=dtype),
+    "broadbandNoise": lambda dtype: sndlib.broadbandNoise(30, 200, 10, "Both", fs, maxLevel, dtype=dtype),
+    "steepNoise": lambda dtype: sndlib.steepNoise(200, 4000, 30, 200, 10, "Both", fs, maxLevel, dtype=dtype),
+    "expAMNoise": lambda dtype: sndlib.expAMNoise(150, 2.4, 1200, 3.14, 1, 24, 380, 10, "Both", fs, maxLevel, dtype=dtype),
+    "harmComplFromNarrowbandNoise": lambda dtype: sndlib.harmComplFromNarrowbandNoise(200, 1, 8, 40, 10, "Hz", 0, 200, 10, "Odd Right", fs, maxLevel, dtype=dtype),
+    "pinkNoiseFromSin": lambda dtype: sndlib.pinkNoiseFromSin(23, 100, 1000, 20, 180, 10, "Both", fs, maxLevel, dtype=dtype),
+    "pinkNoiseFromSin2": lambda dtype: sndlib.pinkNoiseFromSin2(23, 100, 1000, 20, 180, 10, "Both", fs, maxLevel, dtype=dtype),
+    "dichoticNoiseFromSin": lambda dtype: sndlib.dichoticNoiseFromSin(300, 1, 3, 30, 30, 40, 2000, 10, 100, "Cent", "NoSpi", "IPD Stepped", numpy.pi, 380, 10, fs, maxLevel, dtype=dtype),
+    "makeHuggins": lambda dtype: sndlib.makeHuggins(300, 1, 3, 40, 40, "NoSpi", "Pink", 200, 10, fs, maxLevel, dtype=dtype),
+    "makeHugginsPitch": lambda dtype: sndlib.makeHugginsPitch(300, 1, 3, 40, 10, "Hz", "IPD Stepped", numpy.pi, "NoSpi", 0, "White", 200, 10, fs, maxLevel, dtype=dtype),
+    "makeIRN": lambda dtype: sndlib.makeIRN(1/440, 1, 6, "Add Same", 40, 200, 10, "Both", fs, maxLevel, dtype=dtype),
+    "makeAsynchChord": lambda dtype: sndlib.makeAsynchChord([200, 300, 400], [60, 60, 60], [0, 0, 0], 100, 10, "Both", 50, fs, maxLevel, dtype=dtype),
+}
+
+def _channelLevels(snd):
+    snd = numpy.asarray(snd, dtype=numpy.float64)
+    return [10*numpy.log10(numpy.mean(snd[:,ch]**2)) for ch in range(snd.shape[1]) if numpy.any(snd[:,ch] != 0)]
+
+@pytest.mark.parametrize("name", sorted(generators.keys()))
+def test_float32_levels(name):
+    numpy.random.seed(1)
+    snd64 = generators[name](numpy.float64)
+    numpy.random.seed(1)
+    snd32 = generators[name](numpy.float32)
+    assert numpy.asarray(snd32).dtype == numpy.float32
+    levels64 = _channelLevels(snd64)
+    levels32 = _channelLevels(snd32)
+    assert len(levels64) > 0 and len(levels32) == len(levels64)
+    numpy.testing.assert_allclose(levels32, levels64, atol=0.01)
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2008-2014 Samuele Carcagno <sam.carcagno@gmail.com>
+#   This file is part of pychoacoustics
+
+#   pychoacoustics is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+
+#   pychoacoustics is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+
+#   You should have received a copy of the GNU General Public License
+#   along with pychoacoustics.  If not, see <http://www.gnu.org/licenses/>.
+
+#The FM complex tones must be equal to the sum of the corresponding
+#FM tones, one for each harmonic.
+
+import numpy
+import pytest
+from pychoacoustics import sndlib
+
+F0 = 150
+lowHarm = 2
+highHarm = 15
+fm = 5
+deltaCams = 0.7
+fmPhase = 0.3
+level = 50
+duration = 180
+ramp = 10
+fs = 48000
+maxLevel = 100
+
+def _startPhases(harmPhase, harms):
+    if harmPhase == "Sine":
+        return numpy.zeros(len(harms))
+    elif harmPhase == "Cosine":
+        return numpy.repeat(numpy.pi/2, len(harms))
+    elif harmPhase == "Alternating": #odd harmonics in sine phase
+        return numpy.where(harms%2 > 0, 0, numpy.pi/2)
+    elif harmPhase == "Schroeder":
+        return -numpy.pi * harms * (harms - 1) / highHarm
+    elif harmPhase == "Random":
+        return numpy.random.random(len(harms)) * 2 * numpy.pi
+
+def _harmChannel(channel, harm):
+    if channel == "Odd Left":
+        return "Left" if harm%2 > 0 else "Right"
+    elif channel == "Odd Right":
+        return "Right" if harm%2 > 0 else "Left"
+    return channel
+
+@pytest.mark.parametrize("channel", ["Right", "Left", "Both", "Odd Right", "Odd Left"])
+@pytest.mark.parametrize("harmPhase", ["Sine", "Cosine", "Alternating", "Random", "Schroeder"])
+def test_camSinFMComplex(harmPhase, channel):
+    numpy.random.seed(1)
+    snd = sndlib.camSinFMComplex(F0, lowHarm, highHarm, harmPhase, fm, deltaCams, fmPhase, level, duration, ramp, channel, fs, maxLevel)
+    numpy.random.seed(1)
+    harms = numpy.arange(lowHarm, highHarm+1)
+    phases = _startPhases(harmPhase, harms)
+    ref = 0
+    for harm, phase in zip(harms, phases):
+        ref = ref + numpy.asarray(sndlib.camSinFMTone(F0*harm, fm, deltaCams, fmPhase, phase, level, duration, ramp, _harmChannel(channel, harm), fs, maxLevel))
+    numpy.testing.assert_allclose(numpy.asarray(snd), ref, rtol=0, atol=1e-9)
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2008-2014 Samuele Carcagno <sam.carcagno@gmail.com>
+#   This file is part of pychoacoustics
+
+#   pychoacoustics is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+
+#   pychoacoustics is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+
+#   You should have received a copy of the GNU General Public License
+#   along with pychoacoustics.  If not, see <http://www.gnu.org/licenses/>.
+
+#Spectrum-level calibration of the noise generators. Without ramps the
+#random-phase components lie on the FFT grid and are orthogonal over the
+#sound, so the power of a noise band is the same for any seed. The bands
+#include edges for which rounding to the FFT grid adds a component.
+
+import numpy
+import pytest
+from pychoacoustics import sndlib
+
+fs = 48000
+maxLevel = 100
+level = 30
+
+def _levelDB(sig):
+    return 10*numpy.log10(numpy.mean(sig**2))
+
+def _bandLevelDB(bandwidth):
+    #level of a band with the given spectrum level, for sinusoids
+    #whose peak amplitude is 1 at maxLevel
+    return level - maxLevel + 10*numpy.log10(bandwidth/2)
+
+@pytest.mark.parametrize("frequency1, frequency2, duration", [
+    (191, 209, 320),
+    (195, 210, 320),
+    (503.3, 711.7, 480),
+    (200, 4000, 480),
+])
+def test_steepNoise_spectrum_level(frequency1, frequency2, duration):
+    numpy.random.seed(1)
+    snd = sndlib.steepNoise(frequency1, frequency2, level, duration, 0, "Both", fs, maxLevel)
+    assert abs(_levelDB(snd[:,0]) - _bandLevelDB(frequency2-frequency1)) < 0.01
+
+@pytest.mark.parametrize("bandwidth, bandwidthUnit", [
+    (10, "Hz"),
+    (100, "Cent"),
+    (0.5, "ERB"),
+])
+def test_harmComplFromNarrowbandNoise_spectrum_level(bandwidth, bandwidthUnit):
+    F0 = 200; lowHarm = 3; highHarm = 8
+    cfs = numpy.arange(lowHarm, highHarm+1)*F0
+    if bandwidthUnit == "Hz":
+        fLo = cfs - bandwidth/2; fHi = cfs + bandwidth/2
+    elif bandwidthUnit == "Cent":
+        fLo = cfs*2**(-(bandwidth/2)/1200); fHi = cfs*2**((bandwidth/2)/1200)
+    elif bandwidthUnit == "ERB":
+        fLo = sndlib.freqFromERBInterval(cfs, -bandwidth/2); fHi = sndlib.freqFromERBInterval(cfs, bandwidth/2)
+    numpy.random.seed(1)
+    snd = sndlib.harmComplFromNarrowbandNoise(F0, lowHarm, highHarm, level, bandwidth, bandwidthUnit, 0, 330, 0, "Both", fs, maxLevel)
+    expected = 10*numpy.log10(numpy.sum(10**(_bandLevelDB(fHi-fLo)/10)))
+    assert abs(_levelDB(snd[:,0]) - expected) < 0.01
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2008-2014 Samuele Carcagno <sam.carcagno@gmail.com>
+#   This file is part of pychoacoustics
+
+#   pychoacoustics is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+
+#   pychoacoustics is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+
+#   You should have received a copy of the GNU General Public License
+#   along with pychoacoustics.  If not, see <http://www.gnu.org/licenses/>.
+
+#Item assignment on the sounds returned with monoFirst on must either
+#give the same result as on the stereo arrays returned with monoFirst
+#off, or raise a TypeError.
+
+import numpy
+import pytest
+from pychoacoustics import sndlib
+
+@pytest.fixture
+def monoFirst():
+    sndlib.monoFirst = True
+    yield
+    sndlib.monoFirst = False
+
+def _pureTone(channel):
+    return sndlib.pureTone(frequency=440, phase=0, level=65, duration=20,
+                           ramp=5, channel=channel, fs=48000, maxLevel=100)
+
+@pytest.mark.parametrize("channel, key", [
+    ("Right", (slice(None), 1)),
+    ("Left", (slice(None), 0)),
+    ("Both", slice(None)),
+    ("Right", slice(100, 200)),
+    ("Both", (slice(100, 200), slice(None))),
+])
+def test_setitem_write_through(monoFirst, channel, key):
+    snd = _pureTone(channel)
+    assert isinstance(snd, sndlib.monoSound)
+    ref = snd.toStereo()
+    snd[key] *= 0.5
+    ref[key] *= 0.5
+    assert isinstance(snd, sndlib.monoSound)
+    numpy.testing.assert_array_equal(numpy.asarray(snd), ref)
+    snd[key] = 0
+    ref[key] = 0
+    numpy.testing.assert_array_equal(numpy.asarray(snd), ref)
+
+@pytest.mark.parametrize("channel, key", [
+    ("Right", (slice(None), 0)),
+    ("Left", (slice(None), 1)),
+    ("Both", (slice(None), 1)),
+    ("Both", (0, 0)),
+])
+def test_setitem_other_channel(monoFirst, channel, key):
+    snd = _pureTone(channel)
+    before = snd.toStereo()
+    with pytest.raises(TypeError):
+        snd[key] = 1
+    with pytest.raises(TypeError):
+        snd[key] += 1
+    numpy.testing.assert_array_equal(numpy.asarray(snd), before)
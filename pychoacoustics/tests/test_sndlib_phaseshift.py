@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2008-2014 Samuele Carcagno <sam.carcagno@gmail.com>
+#   This file is part of pychoacoustics
+
+#   pychoacoustics is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+
+#   pychoacoustics is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+
+#   You should have received a copy of the GNU General Public License
+#   along with pychoacoustics.  If not, see <http://www.gnu.org/licenses/>.
+
+#Phase shifts applied by phaseShift. The signal length is a power of two,
+#so the FFT is not padded and the shift of each bin can be read back
+#from the spectra of the input and output.
+
+import numpy
+import pytest
+from pychoacoustics import sndlib
+
+fs = 48000
+nSamples = 4096
+f1 = 500
+f2 = 1500
+shift = numpy.pi/2
+
+def _shifts(sig, phaseShiftType, channel):
+    out = sndlib.phaseShift(sig, f1, f2, shift, phaseShiftType, channel, fs)
+    freqs = numpy.fft.rfftfreq(nSamples, 1/fs)
+    band = (freqs > f1) & (freqs < f2)
+    x = numpy.fft.rfft(sig, axis=0)
+    y = numpy.fft.rfft(out, axis=0)
+    return numpy.angle(y/x), numpy.abs(y)/numpy.abs(x), band
+
+@pytest.mark.parametrize("channel", ["Left", "Right", "Both"])
+@pytest.mark.parametrize("phaseShiftType", ["Linear", "Step", "Random"])
+def test_phaseShift_band(phaseShiftType, channel):
+    numpy.random.seed(1)
+    sig = numpy.random.standard_normal((nSamples, 2))
+    dPhase, gain, band = _shifts(sig, phaseShiftType, channel)
+    shifted = {"Left": [0], "Right": [1], "Both": [0, 1]}[channel]
+    nBand = numpy.sum(band)
+
+    numpy.testing.assert_allclose(gain, 1, atol=1e-9)
+    numpy.testing.assert_allclose(dPhase[~band,:], 0, atol=1e-9)
+    for c in range(2):
+        if c not in shifted:
+            numpy.testing.assert_allclose(dPhase[:,c], 0, atol=1e-9)
+            continue
+        inBand = dPhase[band,c]
+        if phaseShiftType == "Linear":
+            numpy.testing.assert_allclose(inBand, numpy.linspace(0, shift, nBand), atol=1e-9)
+        elif phaseShiftType == "Step":
+            numpy.testing.assert_allclose(inBand, shift, atol=1e-9)
+        elif phaseShiftType == "Random":
+            #an independent draw for each bin
+            assert numpy.all((inBand >= -1e-9) & (inBand <= shift+1e-9))
+            assert len(numpy.unique(numpy.round(inBand, 6))) == nBand